@@ -0,0 +1,58 @@
+"""withdrawal payout columns
+
+Revision ID: 3f2a9c1d7b01
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c1d7b01"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _new_columns() -> list:
+    return [
+        sa.Column("approved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("approved_by", sa.BigInteger(), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O lifespan pode já ter criado colunas/índice via create_all
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("withdrawals"):
+        # Banco novo: create_all cria a tabela já completa
+        return
+
+    columns = {col["name"] for col in inspector.get_columns("withdrawals")}
+    indexes = {idx["name"] for idx in inspector.get_indexes("withdrawals")}
+
+    for column in _new_columns():
+        if column.name not in columns:
+            op.add_column("withdrawals", column)
+
+    if "ix_withdrawals_payout_queue" not in indexes:
+        op.create_index(
+            "ix_withdrawals_payout_queue",
+            "withdrawals",
+            ["status", "approved_at"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_withdrawals_payout_queue", table_name="withdrawals")
+    for column in reversed(_new_columns()):
+        op.drop_column("withdrawals", column.name)
@@ -0,0 +1,147 @@
+"""partition leads and transactions by month
+
+Revision ID: 7c41e0b9a2d4
+Revises: 3f2a9c1d7b01
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.partitioning import (
+    add_months,
+    create_archive_tables,
+    create_default_partition,
+    create_month_partition,
+    month_start,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c41e0b9a2d4"
+down_revision: Union[str, Sequence[str], None] = "3f2a9c1d7b01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = {
+    "transactions": [("user_id", "users"), ("bot_id", "bots")],
+    "leads": [("user_id", "subscribers"), ("bot_id", "bots")],
+}
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    result = bind.execute(
+        sa.text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+        ),
+        {"table": table},
+    )
+    return result.first() is not None
+
+
+def _partition_table(bind, table: str):
+    """Recria a tabela como particionada por mês e copia as linhas existentes."""
+    legacy = f"{table}_legacy"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"UPDATE {legacy} SET created_at = now() WHERE created_at IS NULL")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    # A sequence do id passa a pertencer à nova tabela
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL")
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey_p "
+        "PRIMARY KEY (id, created_at)"
+    )
+    for column, target in FOREIGN_KEYS[table]:
+        op.execute(
+            f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {target} (id)"
+        )
+
+    oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {legacy}")).scalar()
+    current = month_start(date.today())
+    start = month_start(oldest) if oldest else current
+
+    create_default_partition(bind, table)
+    while start <= add_months(current, MONTHS_AHEAD):
+        create_month_partition(bind, table, start)
+        start = add_months(start, 1)
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy}")
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_pkey_p TO {table}_pkey")
+
+
+def _unpartition_table(table: str):
+    """Volta a tabela para o formato simples (sem partições)."""
+    partitioned = f"{table}_partitioned"
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+    op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+    op.execute(f"DROP TABLE {partitioned} CASCADE")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+    for column, target in FOREIGN_KEYS[table]:
+        op.execute(
+            f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {target} (id)"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("transactions"):
+        # Banco novo: create_all cria as tabelas já no formato final
+        return
+
+    if "ledger_snapshots" not in inspector.get_table_names():
+        op.create_table(
+            "ledger_snapshots",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column(
+                "user_id", sa.BigInteger(), sa.ForeignKey("users.id"), nullable=False
+            ),
+            sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("period_end", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("balance", sa.Float(), nullable=False),
+            sa.Column(
+                "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+            ),
+            sa.UniqueConstraint("user_id", "period_start"),
+        )
+
+    # Particionamento declarativo só existe no Postgres
+    if bind.dialect.name != "postgresql":
+        return
+
+    for table in ("transactions", "leads"):
+        if not _is_partitioned(bind, table):
+            _partition_table(bind, table)
+
+    create_archive_tables(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP TABLE IF EXISTS leads_archive")
+        op.execute("DROP TABLE IF EXISTS transactions_archive CASCADE")
+        for table in ("transactions", "leads"):
+            if _is_partitioned(bind, table):
+                _unpartition_table(table)
+
+    op.drop_table("ledger_snapshots")
@@ -0,0 +1,41 @@
+"""suppressions
+
+Revision ID: a2c4e6b8d0f3
+Revises: f1a3c5e7b9d2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2c4e6b8d0f3"
+down_revision: Union[str, Sequence[str], None] = "f1a3c5e7b9d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("suppressions") or not inspector.has_table("bots"):
+        return
+
+    op.create_table(
+        "suppressions",
+        sa.Column("bot_id", sa.BigInteger(), sa.ForeignKey("bots.id"), primary_key=True),
+        sa.Column("user_id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("suppressions")
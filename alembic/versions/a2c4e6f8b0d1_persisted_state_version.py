@@ -0,0 +1,37 @@
+"""persisted_state version
+
+Revision ID: a2c4e6f8b0d1
+Revises: e9a1b3c5d7f0
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2c4e6f8b0d1"
+down_revision: Union[str, Sequence[str], None] = "e9a1b3c5d7f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("persisted_state"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("persisted_state")}
+    if "version" not in columns:
+        op.add_column(
+            "persisted_state",
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("persisted_state"):
+        op.drop_column("persisted_state", "version")
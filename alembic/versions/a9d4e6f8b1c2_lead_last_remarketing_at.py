@@ -0,0 +1,46 @@
+"""lead last_remarketing_at
+
+Revision ID: a9d4e6f8b1c2
+Revises: f5c8a2e4d6b7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d4e6f8b1c2"
+down_revision: Union[str, Sequence[str], None] = "f5c8a2e4d6b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# leads_archive (Postgres) acompanha as colunas de leads
+TABLES = ("leads", "leads_archive")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "last_remarketing_at" not in columns:
+            op.add_column(
+                table,
+                sa.Column("last_remarketing_at", sa.DateTime(timezone=True), nullable=True),
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if inspector.has_table(table):
+            op.drop_column(table, "last_remarketing_at")
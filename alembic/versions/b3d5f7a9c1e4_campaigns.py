@@ -0,0 +1,99 @@
+"""campaigns
+
+Revision ID: b3d5f7a9c1e4
+Revises: a2c4e6b8d0f3
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d5f7a9c1e4"
+down_revision: Union[str, Sequence[str], None] = "a2c4e6b8d0f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (bot_id, user_id) cobre também a exclusão em lotes por bot_id
+OLD_LEADS_INDEX = "ix_leads_bot_id"
+LEADS_INDEX = "ix_leads_bot_id_user_id"
+SUBSCRIPTIONS_INDEX = "ix_subscriptions_bot_active_subscriber"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("bots"):
+        # Banco novo: create_all cria as tabelas já completas
+        return
+
+    if not inspector.has_table("campaigns"):
+        op.create_table(
+            "campaigns",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("bot_id", sa.BigInteger(), sa.ForeignKey("bots.id")),
+            sa.Column(
+                "owner_id", sa.BigInteger(), sa.ForeignKey("users.id"), nullable=False
+            ),
+            sa.Column("audience", sa.String(), nullable=False),
+            sa.Column("text", sa.String(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column(
+                "last_user_id", sa.BigInteger(), nullable=False, server_default="0"
+            ),
+            sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("sent", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("skipped", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("progress_message_id", sa.BigInteger(), nullable=True),
+            sa.Column(
+                "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+            ),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_campaigns_bot_id", "campaigns", ["bot_id"])
+
+    is_postgres = bind.dialect.name == "postgresql"
+
+    if inspector.has_table("leads"):
+        existing = {idx["name"] for idx in inspector.get_indexes("leads")}
+        # leads é particionada: sem CREATE INDEX CONCURRENTLY no pai
+        if LEADS_INDEX not in existing:
+            op.create_index(LEADS_INDEX, "leads", ["bot_id", "user_id"])
+        if OLD_LEADS_INDEX in existing:
+            op.drop_index(OLD_LEADS_INDEX, table_name="leads")
+
+    if inspector.has_table("subscriptions"):
+        existing = {idx["name"] for idx in inspector.get_indexes("subscriptions")}
+        if SUBSCRIPTIONS_INDEX not in existing:
+            where = sa.text("is_active")
+            if is_postgres:
+                with op.get_context().autocommit_block():
+                    op.create_index(
+                        SUBSCRIPTIONS_INDEX,
+                        "subscriptions",
+                        ["bot_id", "subscriber_id"],
+                        postgresql_where=where,
+                        postgresql_concurrently=True,
+                    )
+            else:
+                op.create_index(
+                    SUBSCRIPTIONS_INDEX,
+                    "subscriptions",
+                    ["bot_id", "subscriber_id"],
+                    sqlite_where=where,
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(SUBSCRIPTIONS_INDEX, table_name="subscriptions")
+    op.create_index(OLD_LEADS_INDEX, "leads", ["bot_id"])
+    op.drop_index(LEADS_INDEX, table_name="leads")
+    op.drop_index("ix_campaigns_bot_id", table_name="campaigns")
+    op.drop_table("campaigns")
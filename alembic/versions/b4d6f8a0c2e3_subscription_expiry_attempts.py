@@ -0,0 +1,39 @@
+"""subscription expiry_attempts
+
+Revision ID: b4d6f8a0c2e3
+Revises: a2c4e6f8b0d1
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4d6f8a0c2e3"
+down_revision: Union[str, Sequence[str], None] = "a2c4e6f8b0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("subscriptions"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("subscriptions")}
+    if "expiry_attempts" not in columns:
+        op.add_column(
+            "subscriptions",
+            sa.Column(
+                "expiry_attempts", sa.Integer(), nullable=True, server_default="0"
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("subscriptions"):
+        op.drop_column("subscriptions", "expiry_attempts")
@@ -0,0 +1,82 @@
+"""hot query indexes
+
+Revision ID: b8d2f6a1c3e5
+Revises: 7c41e0b9a2d4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d2f6a1c3e5"
+down_revision: Union[str, Sequence[str], None] = "7c41e0b9a2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nome, tabela, colunas, predicado do índice parcial)
+INDEXES = [
+    ("ix_transactions_external_id", "transactions", ["external_id"], None),
+    (
+        "ix_transactions_user_id_created_at",
+        "transactions",
+        ["user_id", "created_at"],
+        None,
+    ),
+    ("ix_leads_user_id_bot_id", "leads", ["user_id", "bot_id"], None),
+    (
+        "ix_leads_followup_due",
+        "leads",
+        ["last_interaction"],
+        "NOT is_converted AND NOT followup_sent",
+    ),
+    (
+        "ix_subscriptions_active_end_date",
+        "subscriptions",
+        ["end_date"],
+        "is_active",
+    ),
+    ("ix_plans_bot_id_is_active", "plans", ["bot_id", "is_active"], None),
+    ("ix_bots_owner_id", "bots", ["owner_id"], None),
+]
+
+# Tabelas particionadas não aceitam CREATE INDEX CONCURRENTLY no pai
+PARTITIONED = {"transactions", "leads"}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    is_postgres = bind.dialect.name == "postgresql"
+
+    for name, table, columns, where in INDEXES:
+        if not inspector.has_table(table):
+            continue
+        existing = {idx["name"] for idx in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+
+        kwargs = {}
+        if where:
+            kwargs["postgresql_where"] = sa.text(where)
+            kwargs["sqlite_where"] = sa.text(where)
+
+        if is_postgres and table not in PARTITIONED:
+            # Evita bloquear escritas em tabelas grandes durante o deploy
+            with op.get_context().autocommit_block():
+                op.create_index(
+                    name, table, columns, postgresql_concurrently=True, **kwargs
+                )
+        else:
+            op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,42 @@
+"""persisted state
+
+Revision ID: c4e6a8b0d2f5
+Revises: b3d5f7a9c1e4
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e6a8b0d2f5"
+down_revision: Union[str, Sequence[str], None] = "b3d5f7a9c1e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("persisted_state") or not inspector.has_table("bots"):
+        return
+
+    op.create_table(
+        "persisted_state",
+        sa.Column("kind", sa.String(), primary_key=True),
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("data", sa.String(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("persisted_state")
@@ -0,0 +1,45 @@
+"""job runs
+
+Revision ID: c6e1b3d5f7a9
+Revises: a9d4e6f8b1c2
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c6e1b3d5f7a9"
+down_revision: Union[str, Sequence[str], None] = "a9d4e6f8b1c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("job_runs"):
+        return
+
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("job", sa.String(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("interval", sa.Integer(), nullable=False),
+        sa.Column("items", sa.Integer(), nullable=True),
+        sa.Column("errors", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+    )
+    op.create_index("ix_job_runs_job_started_at", "job_runs", ["job", "started_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_runs_job_started_at", table_name="job_runs")
+    op.drop_table("job_runs")
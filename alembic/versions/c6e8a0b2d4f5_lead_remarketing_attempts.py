@@ -0,0 +1,46 @@
+"""lead remarketing_attempts
+
+Revision ID: c6e8a0b2d4f5
+Revises: b4d6f8a0c2e3
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c6e8a0b2d4f5"
+down_revision: Union[str, Sequence[str], None] = "b4d6f8a0c2e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# leads_archive (Postgres) acompanha as colunas de leads
+TABLES = ("leads", "leads_archive")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "remarketing_attempts" not in columns:
+            op.add_column(
+                table,
+                sa.Column("remarketing_attempts", sa.Integer(), server_default="0"),
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if inspector.has_table(table):
+            op.drop_column(table, "remarketing_attempts")
@@ -0,0 +1,107 @@
+"""lead followup queue
+
+Revision ID: d2f4a6c8e0b3
+Revises: c6e1b3d5f7a9
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2f4a6c8e0b3"
+down_revision: Union[str, Sequence[str], None] = "c6e1b3d5f7a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# leads_archive (Postgres) acompanha as colunas de leads
+TABLES = ("leads", "leads_archive")
+
+OLD_INDEX = "ix_leads_followup_due"
+NEW_INDEX = "ix_leads_followup_due_at"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "followup_step" not in columns:
+            op.add_column(
+                table,
+                sa.Column("followup_step", sa.Integer(), server_default="0"),
+            )
+        if "followup_due_at" not in columns:
+            op.add_column(
+                table,
+                sa.Column("followup_due_at", sa.DateTime(timezone=True), nullable=True),
+            )
+
+    if not inspector.has_table("leads"):
+        return
+
+    # Leads que o scanner antigo ainda atenderia entram na fila com a espera
+    # do primeiro passo contada da última interação (como followup_due_at(0));
+    # quem já recebeu o follow-up único não recebe mais. Só os que ainda
+    # estão dentro da janela da sequência: os mais antigos ficam no passo 0
+    # sem vencimento e só entram na fila se voltarem a interagir.
+    delays = settings.followup_step_delays
+    if delays:
+        window = sum(delays)
+        if op.get_bind().dialect.name == "sqlite":
+            due = (
+                "strftime('%Y-%m-%d %H:%M:%f000', last_interaction, "
+                f"'+{delays[0]} minutes')"
+            )
+            since = f"datetime('now', '-{window} minutes')"
+        else:
+            due = f"last_interaction + interval '{delays[0]} minutes'"
+            since = f"now() - interval '{window} minutes'"
+        op.execute(
+            f"UPDATE leads SET followup_due_at = {due} "
+            "WHERE NOT is_converted AND NOT followup_sent AND followup_due_at IS NULL "
+            f"AND last_interaction >= {since}"
+        )
+    op.execute("UPDATE leads SET followup_step = 1 WHERE followup_sent")
+
+    indexes = {idx["name"] for idx in inspector.get_indexes("leads")}
+    if OLD_INDEX in indexes:
+        op.drop_index(OLD_INDEX, table_name="leads")
+    if NEW_INDEX not in indexes:
+        where = sa.text("followup_due_at IS NOT NULL")
+        op.create_index(
+            NEW_INDEX,
+            "leads",
+            ["followup_due_at"],
+            postgresql_where=where,
+            sqlite_where=where,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    op.drop_index(NEW_INDEX, table_name="leads")
+    where = sa.text("NOT is_converted AND NOT followup_sent")
+    op.create_index(
+        OLD_INDEX,
+        "leads",
+        ["last_interaction"],
+        postgresql_where=where,
+        sqlite_where=where,
+    )
+
+    for table in TABLES:
+        if inspector.has_table(table):
+            op.drop_column(table, "followup_due_at")
+            op.drop_column(table, "followup_step")
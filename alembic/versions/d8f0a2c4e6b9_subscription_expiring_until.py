@@ -0,0 +1,37 @@
+"""subscription expiring_until
+
+Revision ID: d8f0a2c4e6b9
+Revises: c4e6a8b0d2f5
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d8f0a2c4e6b9"
+down_revision: Union[str, Sequence[str], None] = "c4e6a8b0d2f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("subscriptions"):
+        return
+    columns = {col["name"] for col in inspector.get_columns("subscriptions")}
+    if "expiring_until" not in columns:
+        op.add_column(
+            "subscriptions",
+            sa.Column("expiring_until", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("subscriptions"):
+        op.drop_column("subscriptions", "expiring_until")
@@ -0,0 +1,36 @@
+"""cache invalidation triggers
+
+Revision ID: e3a7c5d9f2b4
+Revises: b8d2f6a1c3e5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.invalidation import ensure_invalidation_triggers
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a7c5d9f2b4"
+down_revision: Union[str, Sequence[str], None] = "b8d2f6a1c3e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("bots"):
+        ensure_invalidation_triggers(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP TRIGGER IF EXISTS plans_cache_invalidation ON plans")
+    op.execute("DROP TRIGGER IF EXISTS bots_cache_invalidation ON bots")
+    op.execute("DROP FUNCTION IF EXISTS notify_cache_invalidation()")
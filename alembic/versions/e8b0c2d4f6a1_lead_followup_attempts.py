@@ -0,0 +1,46 @@
+"""lead followup attempts
+
+Revision ID: e8b0c2d4f6a1
+Revises: d2f4a6c8e0b3
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b0c2d4f6a1"
+down_revision: Union[str, Sequence[str], None] = "d2f4a6c8e0b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# leads_archive (Postgres) acompanha as colunas de leads
+TABLES = ("leads", "leads_archive")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if not inspector.has_table(table):
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        if "followup_attempts" not in columns:
+            op.add_column(
+                table,
+                sa.Column("followup_attempts", sa.Integer(), server_default="0"),
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if inspector.has_table(table):
+            op.drop_column(table, "followup_attempts")
@@ -0,0 +1,54 @@
+"""campaign running unique
+
+Revision ID: e9a1b3c5d7f0
+Revises: d8f0a2c4e6b9
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9a1b3c5d7f0"
+down_revision: Union[str, Sequence[str], None] = "d8f0a2c4e6b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = "ux_campaigns_bot_running"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("campaigns"):
+        return
+    if INDEX in {idx["name"] for idx in inspector.get_indexes("campaigns")}:
+        return
+
+    # Duplicatas criadas antes do índice: fica só a mais antiga de cada bot
+    op.execute(
+        "UPDATE campaigns SET status = 'cancelled' "
+        "WHERE status = 'running' AND id NOT IN ("
+        "  SELECT MIN(id) FROM campaigns WHERE status = 'running' GROUP BY bot_id"
+        ")"
+    )
+
+    where = sa.text("status = 'running'")
+    op.create_index(
+        INDEX,
+        "campaigns",
+        ["bot_id"],
+        unique=True,
+        postgresql_where=where,
+        sqlite_where=where,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("campaigns"):
+        op.drop_index(INDEX, table_name="campaigns")
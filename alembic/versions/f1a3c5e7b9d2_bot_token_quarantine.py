@@ -0,0 +1,37 @@
+"""bot token quarantine
+
+Revision ID: f1a3c5e7b9d2
+Revises: e8b0c2d4f6a1
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a3c5e7b9d2"
+down_revision: Union[str, Sequence[str], None] = "e8b0c2d4f6a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("bots"):
+        return
+
+    columns = {col["name"] for col in inspector.get_columns("bots")}
+    if "token_invalid_at" not in columns:
+        op.add_column(
+            "bots",
+            sa.Column("token_invalid_at", sa.DateTime(timezone=True), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("bots", "token_invalid_at")
@@ -0,0 +1,63 @@
+"""bot soft delete
+
+Revision ID: f5c8a2e4d6b7
+Revises: e3a7c5d9f2b4
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5c8a2e4d6b7"
+down_revision: Union[str, Sequence[str], None] = "e3a7c5d9f2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Índices por bot_id usados na exclusão em lotes (nome, tabela)
+INDEXES = [
+    ("ix_leads_bot_id", "leads"),
+    ("ix_subscriptions_bot_id", "subscriptions"),
+    ("ix_transactions_bot_id", "transactions"),
+]
+
+# Tabelas particionadas não aceitam CREATE INDEX CONCURRENTLY no pai
+PARTITIONED = {"transactions", "leads"}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("bots"):
+        # Banco novo: create_all cria as tabelas já completas
+        return
+
+    columns = {col["name"] for col in inspector.get_columns("bots")}
+    if "deleted_at" not in columns:
+        op.add_column(
+            "bots", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+        )
+
+    is_postgres = bind.dialect.name == "postgresql"
+    for name, table in INDEXES:
+        existing = {idx["name"] for idx in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+
+        if is_postgres and table not in PARTITIONED:
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, ["bot_id"], postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, ["bot_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_column("bots", "deleted_at")
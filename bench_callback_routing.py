@@ -0,0 +1,196 @@
+import sys
+import time
+import warnings
+
+from telegram import CallbackQuery, Chat, Message, Update, User
+from telegram.ext import CallbackQueryHandler, CommandHandler, ConversationHandler
+
+import src.bot.callbacks as callbacks
+from src.bot.callbacks import BACK_TO_MAIN, CallbackRouter, Route
+from src.bot.handlers.start import start_command
+from src.bot.handlers.creation_wizard import creation_handler
+from src.bot.handlers.plan_wizard import plan_wizard_handler
+from src.bot.handlers.plan_editor import plan_edit_conversation, plan_action_routes
+from src.bot.handlers.bot_editor import change_group_handler, bot_action_routes
+from src.bot.handlers.settings_wizard import settings_wizard_handler
+from src.bot.handlers.followup_wizard import followup_wizard_handler
+from src.bot.handlers.campaign_wizard import campaign_wizard_handler, campaign_routes
+from src.bot.handlers.dashboard import dashboard_routes
+from src.bot.handlers.wallet import withdrawal_wizard, wallet_routes
+from src.bot.handlers.support import support_routes
+from src.bot.handlers.admin_withdrawal import admin_handlers, admin_routes
+
+# CONFIGURAÇÕES DO BENCHMARK
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+SAMPLE_ARGS = {int: 123456789, str: "price"}
+
+USER = User(1, "Bench", False)
+MESSAGE = Message(1, None, Chat(1, "private"), from_user=USER)
+
+
+async def noop(update, context):
+    pass
+
+
+def legacy_int(index: int):
+    """Parse antigo dos handlers: posição fixa no split("_")."""
+    return lambda data: (int(data.split("_")[index]),)
+
+
+def regex_chain() -> list:
+    """
+    Cadeia antiga do grupo 0, na ordem do main.lifespan: entry points das
+    conversas e depois os CallbackQueryHandler com regex, cada um com o parse
+    que o handler fazia sobre query.data.
+    """
+
+    def conversation(*patterns):
+        with warnings.catch_warnings():
+            # Aviso de per_message do PTB, o mesmo que o código antigo emitia
+            warnings.simplefilter("ignore")
+            handler = ConversationHandler(
+                entry_points=[CallbackQueryHandler(noop, pattern=p) for p in patterns],
+                states={},
+                fallbacks=[],
+            )
+        return handler, lambda data: ()
+
+    def regex(pattern, parse=lambda data: ()):
+        return CallbackQueryHandler(noop, pattern=pattern), parse
+
+    return [
+        conversation("^wizard_new_bot$"),
+        conversation("^new_plan_"),
+        conversation("^edit_plan_"),
+        conversation("^change_group_"),
+        conversation("^edit_desc_", "^edit_welcome_"),
+        conversation("^edit_followups_"),
+        conversation("^new_campaign_"),
+        regex("^cancel_campaign_", legacy_int(2)),
+        regex("^wallet_view$"),
+        regex("^wallet_extract$"),
+        conversation("^wallet_withdraw$"),
+        regex("^open_plan_", legacy_int(2)),
+        regex("^toggle_plan_", legacy_int(2)),
+        regex("^delete_plan_", legacy_int(2)),
+        regex("^confirm_delete_", legacy_int(2)),
+        regex("^toggle_bot_", legacy_int(2)),
+        regex("^delete_bot_", legacy_int(2)),
+        regex("^real_del_bot_", legacy_int(3)),
+        regex("^my_bots_list$"),
+        regex("^manage_bot_", legacy_int(2)),
+        regex("^manage_plans_", legacy_int(2)),
+        regex("^admin_pay_", legacy_int(2)),
+        regex("^admin_reject_", legacy_int(2)),
+        (CommandHandler("pagar_saques", noop), None),
+        regex("^support_view$"),
+        (CommandHandler("start", noop), None),
+        regex("^back_to_main$"),
+    ]
+
+
+def router_chain() -> list:
+    """Cadeia nova, montada como no main.lifespan."""
+    conversations = [
+        creation_handler,
+        plan_wizard_handler,
+        plan_edit_conversation,
+        change_group_handler,
+        settings_wizard_handler,
+        followup_wizard_handler,
+        campaign_wizard_handler,
+        withdrawal_wizard,
+        *admin_handlers,
+        CommandHandler("start", start_command),
+    ]
+    router = CallbackRouter(
+        *campaign_routes,
+        *wallet_routes,
+        *plan_action_routes,
+        *bot_action_routes,
+        *dashboard_routes,
+        *admin_routes,
+        *support_routes,
+        (BACK_TO_MAIN, start_command),
+    )
+    return [(handler, lambda data: ()) for handler in conversations] + [
+        (router, None)
+    ]
+
+
+def callback_update(data: str) -> Update:
+    query = CallbackQuery("1", USER, "bench", message=MESSAGE, data=data)
+    return Update(1, callback_query=query)
+
+
+def samples():
+    """Um callback de cada rota, no formato antigo e no novo."""
+    legacy, encoded = [], []
+    for route in vars(callbacks).values():
+        if not isinstance(route, Route):
+            continue
+        args = [SAMPLE_ARGS[kind] for kind in route.types]
+        legacy.append(callback_update(route.legacy + "_".join(map(str, args))))
+        encoded.append(callback_update(route(*args)))
+    return legacy, encoded
+
+
+def resolve(chain: list, update: Update):
+    """Primeiro handler que aceita o update (como a Application faz) e os args."""
+    for handler, parse in chain:
+        check = handler.check_update(update)
+        if check is None or check is False:
+            continue
+        if parse is None:
+            return check[1]
+        return parse(update.callback_query.data)
+    return None
+
+
+def run(label: str, chain: list, updates: list) -> float:
+    """Resolve todos os updates ITERATIONS vezes e retorna µs por callback."""
+    for update in updates:
+        resolve(chain, update)  # Aquecimento (cache de regex)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for update in updates:
+            resolve(chain, update)
+    elapsed = time.perf_counter() - start
+
+    per_call = elapsed / (ITERATIONS * len(updates)) * 1e6
+    print(
+        f"{label:<16} {ITERATIONS * len(updates)} callbacks em {elapsed:.2f}s "
+        f"({per_call:.2f} µs/callback)"
+    )
+    return per_call
+
+
+def without_conversations(chain: list) -> list:
+    """Só os handlers de botões soltos (sem os ConversationHandlers na frente)."""
+    return [entry for entry in chain if not isinstance(entry[0], ConversationHandler)]
+
+
+def main():
+    legacy, encoded = samples()
+    old_chain, new_chain = regex_chain(), router_chain()
+
+    # Mesmos handlers escolhidos e mesmos argumentos nos dois formatos
+    for old, new in zip(legacy, encoded):
+        assert resolve(old_chain, old) == resolve(new_chain, new), (
+            old.callback_query.data
+        )
+
+    print("Cadeia completa (conversas + botões):")
+    regex_cost = run("Regex (antigo)", old_chain, legacy)
+    router_cost = run("CallbackRouter", new_chain, encoded)
+    print(f"Ganho: {regex_cost / router_cost:.2f}x\n")
+
+    print("Só os botões fora de conversa:")
+    regex_cost = run("Regex (antigo)", without_conversations(old_chain), legacy)
+    router_cost = run("CallbackRouter", without_conversations(new_chain), encoded)
+    print(f"Ganho: {regex_cost / router_cost:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import asyncio
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+from sqlalchemy import delete
+from sqlalchemy.future import select
+
+from src.database.base import AsyncSessionLocal, Base, engine
+from src.database.models import (
+    User,
+    Bot,
+    Plan,
+    Subscriber,
+    Transaction,
+    TransactionType,
+    Lead,
+)
+from src.runner.logic import RunnerLogic
+from src.runner.queries import RunnerQueries
+
+# CONFIGURAÇÕES DO BENCHMARK
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+CONCURRENCY = 10
+BENCH_ID = 9_100_000_000_000
+BENCH_TOKEN = f"bench-{BENCH_ID}"
+USERS = 500
+
+
+def fake_user(i: int):
+    """Usuário Telegram simulado."""
+    return SimpleNamespace(
+        id=BENCH_ID + 1000 + (i % USERS),
+        full_name=f"Bench {i}",
+        username=None,
+        first_name="Bench",
+    )
+
+
+async def prepare_data():
+    """Cria dono, bot e planos usados no benchmark."""
+    # Permite rodar contra um banco vazio (ex: sqlite:///bench.db)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=BENCH_ID, full_name="Bench"))
+        session.add(Bot(id=BENCH_ID, owner_id=BENCH_ID, token=BENCH_TOKEN, name="Bench"))
+        await session.flush()
+        for i in range(5):
+            session.add(Plan(bot_id=BENCH_ID, name=f"Plano {i}", price=10 + i, days=30))
+        await session.commit()
+
+
+async def cleanup():
+    """Remove tudo que o benchmark criou."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Transaction).where(Transaction.bot_id == BENCH_ID))
+        await session.execute(delete(Lead).where(Lead.bot_id == BENCH_ID))
+        await session.execute(delete(Plan).where(Plan.bot_id == BENCH_ID))
+        await session.execute(delete(Bot).where(Bot.id == BENCH_ID))
+        await session.execute(
+            delete(Subscriber).where(
+                Subscriber.id.between(BENCH_ID + 1000, BENCH_ID + 1000 + USERS)
+            )
+        )
+        await session.execute(delete(User).where(User.id == BENCH_ID))
+        await session.commit()
+
+
+async def orm_iteration(i: int):
+    """Caminho antigo do runner: select() + Result do ORM em cada etapa."""
+    user = fake_user(i)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Bot).filter(Bot.token == BENCH_TOKEN))
+        db_bot = result.scalars().first()
+
+    async with AsyncSessionLocal() as session:
+        await RunnerLogic.register_interaction(session, user, db_bot.id)
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Plan).filter(Plan.bot_id == db_bot.id, Plan.is_active == True)
+        )
+        plans = result.scalars().all()
+
+    async with AsyncSessionLocal() as session:
+        session.add(
+            Transaction(
+                user_id=db_bot.owner_id,
+                bot_id=db_bot.id,
+                external_id=f"{uuid.uuid4()}|{plans[0].id}|{user.id}",
+                type=TransactionType.SALE,
+                description="(Pendente) Bench",
+                amount=0.0,
+            )
+        )
+        await session.commit()
+
+
+async def fast_iteration(i: int):
+    """Caminho novo: RunnerQueries (asyncpg direto no Postgres)."""
+    user = fake_user(i)
+    db_bot = await RunnerQueries.get_bot_by_token(BENCH_TOKEN)
+    await RunnerQueries.upsert_lead(user, db_bot.id)
+    plans = await RunnerQueries.get_active_plans(db_bot.id)
+    await RunnerQueries.insert_transaction(
+        user_id=db_bot.owner_id,
+        bot_id=db_bot.id,
+        external_id=f"{uuid.uuid4()}|{plans[0].id}|{user.id}",
+        type_name=TransactionType.SALE.name,
+        description="(Pendente) Bench",
+        amount=0.0,
+    )
+
+
+async def run(label: str, iteration) -> float:
+    """Executa as iterações com concorrência fixa e retorna iterações/s."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def guarded(i):
+        async with semaphore:
+            await iteration(i)
+
+    # Aquecimento (pool, cache de statements)
+    await asyncio.gather(*[guarded(i) for i in range(CONCURRENCY)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[guarded(i) for i in range(ITERATIONS)])
+    elapsed = time.perf_counter() - start
+
+    rate = ITERATIONS / elapsed
+    print(f"{label:<14} {ITERATIONS} iterações em {elapsed:.2f}s ({rate:.0f}/s)")
+    return rate
+
+
+async def main():
+    await prepare_data()
+    try:
+        orm_rate = await run("ORM", orm_iteration)
+        fast_rate = await run("RunnerQueries", fast_iteration)
+        print(f"Ganho: {fast_rate / orm_rate:.2f}x")
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
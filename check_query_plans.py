@@ -0,0 +1,242 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import text, func, desc, and_, or_
+from sqlalchemy.future import select
+
+from src.database.base import engine
+from src.database.partitioning import ensure_partitions
+from src.database.models import (
+    Bot,
+    Plan,
+    Subscription,
+    Transaction,
+    Lead,
+    Withdrawal,
+    WithdrawalStatus,
+)
+
+# Seq Scan só é aceito em relações pequenas (ex: partições vazias)
+SEQ_SCAN_MIN_ROWS = 1000
+
+# IDs altos para não colidir com dados reais (tudo roda em transação desfeita)
+BASE_ID = 9_000_000_000_000
+
+SEED_SQL = [
+    f"INSERT INTO users (id, full_name, is_admin) "
+    f"SELECT {BASE_ID} + g, 'explain', false FROM generate_series(1, 500) g",
+    f"INSERT INTO bots (id, owner_id, token, name, is_active, followups) "
+    f"SELECT {BASE_ID} + g, {BASE_ID} + (g % 500) + 1, 'explain-' || g, 'b', true, '[]' "
+    f"FROM generate_series(1, 5000) g",
+    f"INSERT INTO plans (bot_id, name, price, days, is_active) "
+    f"SELECT {BASE_ID} + (g % 5000) + 1, 'p', 10, 30, g % 4 <> 0 "
+    f"FROM generate_series(1, 20000) g",
+    f"INSERT INTO subscribers (id, name) "
+    f"SELECT {BASE_ID} + g, 's' FROM generate_series(1, 100000) g",
+    f"INSERT INTO subscriptions (bot_id, subscriber_id, start_date, end_date, is_active) "
+    f"SELECT {BASE_ID} + (g % 5000) + 1, {BASE_ID} + g, now(), "
+    f"now() + ((g % 365) - 3) * interval '1 day', g % 10 <> 0 "
+    f"FROM generate_series(1, 100000) g",
+    f"INSERT INTO leads (user_id, bot_id, first_name, created_at, last_interaction, "
+    f"followup_sent, is_converted, followup_due_at) "
+    f"SELECT {BASE_ID} + (g % 100000) + 1, {BASE_ID} + (g % 5000) + 1, 'l', now(), "
+    f"now() - (g % 1000) * interval '1 minute', g % 50 <> 0, g % 5 = 0, "
+    f"CASE WHEN g % 50 = 0 THEN now() + (g % 1000) * interval '1 minute' END "
+    f"FROM generate_series(1, 200000) g",
+    f"INSERT INTO transactions (user_id, bot_id, external_id, type, description, "
+    f"amount, created_at, followup_sent) "
+    f"SELECT {BASE_ID} + (g % 500) + 1, {BASE_ID} + (g % 5000) + 1, 'explain-' || g, "
+    f"'SALE', 'x', g % 7, now() - (g % 60) * interval '1 minute', false "
+    f"FROM generate_series(1, 200000) g",
+    f"INSERT INTO withdrawals (user_id, amount_requested, fee_total, amount_final, "
+    f"pix_key, status, attempts) "
+    f"SELECT {BASE_ID} + (g % 500) + 1, 10, 1, 11, 'k', "
+    f"CASE WHEN g % 100 = 0 THEN 'PENDING' ELSE 'PAID' END::withdrawalstatus, 0 "
+    f"FROM generate_series(1, 20000) g",
+]
+
+
+def hot_queries():
+    """
+    Consultas quentes dos serviços, montadas como no código de produção.
+
+    Returns:
+        Lista de (descrição, statement, relações onde Seq Scan é aceitável)
+    """
+    user_id = BASE_ID + 1
+    bot_id = BASE_ID + 1
+    now = datetime.now()
+
+    return [
+        (
+            "payment_webhook: transação por external_id",
+            select(Transaction).filter(Transaction.external_id == "explain-42"),
+            set(),
+        ),
+        (
+            "FinanceService.get_balance",
+            select(func.sum(Transaction.amount)).filter(
+                Transaction.user_id == user_id
+            ),
+            set(),
+        ),
+        (
+            "FinanceService.get_extract",
+            select(Transaction)
+            .filter(Transaction.user_id == user_id)
+            .filter(Transaction.amount != 0)
+            .order_by(desc(Transaction.created_at))
+            .limit(15),
+            set(),
+        ),
+        (
+            "RunnerLogic.register_interaction: lead por usuário e bot",
+            select(Lead).filter(Lead.user_id == BASE_ID + 7, Lead.bot_id == bot_id),
+            set(),
+        ),
+        (
+            "DripEngine._refill: leads que vencem no horizonte",
+            select(Lead.id, Lead.followup_due_at)
+            .where(Lead.followup_due_at <= now + timedelta(minutes=10))
+            .order_by(Lead.followup_due_at)
+            .limit(50000),
+            set(),
+        ),
+        (
+            "ExpiryScheduler._refresh: próximas assinaturas a vencer",
+            select(Subscription.id, Subscription.end_date)
+            .where(Subscription.is_active == True, Subscription.end_date != None)
+            .order_by(Subscription.end_date)
+            .limit(1000),
+            set(),
+        ),
+        (
+            "CampaignService.next_chunk: leads do bot após o checkpoint",
+            select(Lead.user_id)
+            .where(Lead.bot_id == bot_id, Lead.user_id > BASE_ID + 500)
+            .distinct()
+            .order_by(Lead.user_id)
+            .limit(100),
+            set(),
+        ),
+        (
+            "CampaignService.next_chunk: assinantes ativos após o checkpoint",
+            select(Subscription.subscriber_id)
+            .where(
+                Subscription.bot_id == bot_id,
+                Subscription.is_active == True,
+                Subscription.subscriber_id > BASE_ID + 500,
+            )
+            .distinct()
+            .order_by(Subscription.subscriber_id)
+            .limit(100),
+            set(),
+        ),
+        (
+            "RunnerLogic.show_plans: planos ativos do bot",
+            select(Plan).filter(Plan.bot_id == bot_id, Plan.is_active == True),
+            set(),
+        ),
+        (
+            "dashboard.list_my_bots: bots do dono",
+            select(Bot).filter(Bot.owner_id == user_id),
+            set(),
+        ),
+        (
+            "router.process_update_task: bot por token",
+            select(Bot).filter(Bot.token == "explain-42"),
+            set(),
+        ),
+        (
+            "PayoutService._claim_batch: fila de saques",
+            select(Withdrawal)
+            .where(
+                or_(
+                    and_(
+                        Withdrawal.status == WithdrawalStatus.PENDING,
+                        Withdrawal.approved_at != None,
+                    ),
+                    and_(
+                        Withdrawal.status == WithdrawalStatus.PROCESSING,
+                        Withdrawal.claimed_at < now,
+                    ),
+                )
+            )
+            .order_by(Withdrawal.id)
+            .limit(100),
+            set(),
+        ),
+    ]
+
+
+def find_seq_scans(plan: dict) -> list:
+    """Percorre o plano (EXPLAIN FORMAT JSON) e retorna as relações com Seq Scan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def explain(conn, stmt) -> dict:
+    """Executa EXPLAIN (FORMAT JSON) no statement com os valores embutidos."""
+    sql = stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    raw = result.scalar()
+    data = json.loads(raw) if isinstance(raw, str) else raw
+    return data[0]["Plan"]
+
+
+async def relation_rows(conn, relation: str) -> float:
+    """Estimativa de linhas da relação segundo o ANALYZE."""
+    result = await conn.execute(
+        text("SELECT reltuples FROM pg_class WHERE relname = :name"),
+        {"name": relation},
+    )
+    return result.scalar() or 0
+
+
+async def check_query_plans() -> int:
+    """
+    Popula dados sintéticos, roda EXPLAIN em cada consulta quente e falha se
+    alguma recorrer a Seq Scan em tabela populada. Tudo é desfeito no final.
+    """
+    if engine.dialect.name != "postgresql":
+        print("⚠️ Verificação de planos disponível apenas no Postgres.")
+        return 0
+
+    failures = 0
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            await conn.run_sync(ensure_partitions)
+
+            print("🌱 Populando dados sintéticos...")
+            for sql in SEED_SQL:
+                await conn.execute(text(sql))
+            await conn.execute(text("ANALYZE"))
+
+            for label, stmt, allowed in hot_queries():
+                plan = await explain(conn, stmt)
+                offenders = []
+                for relation in find_seq_scans(plan):
+                    if relation in allowed:
+                        continue
+                    if await relation_rows(conn, relation) >= SEQ_SCAN_MIN_ROWS:
+                        offenders.append(relation)
+
+                if offenders:
+                    failures += 1
+                    print(f"❌ {label}: Seq Scan em {', '.join(offenders)}")
+                else:
+                    print(f"✅ {label}")
+        finally:
+            await trans.rollback()
+
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(check_query_plans()) else 0)
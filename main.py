@@ -1,24 +1,37 @@
 import uvicorn
 from fastapi import FastAPI, Request
 from telegram import Update
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler
+from telegram.ext import Application, CommandHandler
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from src.runner.scheduler import check_abandoned_carts
 from src.runner.router import runner_router
 from src.core.config import settings
-from src.database.base import engine, Base
+from src.database.base import engine, read_engine, warm_up_pool, Base
+from src.database.partitioning import ensure_partitions
+from src.database.invalidation import InvalidationBus, ensure_invalidation_triggers
+from src.database.leader import scheduler_leader
+from src.runner.scheduler import drip_engine
+from src.bot.update_processor import PerUserUpdateProcessor
+from src.bot.persistence import DatabasePersistence
+from src.bot.state_sweeper import state_sweeper
+from src.bot.callbacks import CallbackRouter, BACK_TO_MAIN
 from src.bot.handlers.start import start_command
 from src.bot.handlers.creation_wizard import creation_handler
 from src.bot.handlers.plan_wizard import plan_wizard_handler
-from src.bot.handlers.plan_editor import plan_edit_conversation, plan_action_handlers
-from src.bot.handlers.bot_editor import change_group_handler, bot_action_handlers
+from src.bot.handlers.plan_editor import plan_edit_conversation, plan_action_routes
+from src.bot.handlers.bot_editor import change_group_handler, bot_action_routes
 from src.bot.handlers.settings_wizard import settings_wizard_handler
 from src.bot.handlers.followup_wizard import followup_wizard_handler
-from src.bot.handlers.dashboard import dashboard_handlers
-from src.bot.handlers.wallet import wallet_handlers
-from src.bot.handlers.support import support_handler
-from src.bot.handlers.admin_withdrawal import admin_handlers
+from src.bot.handlers.campaign_wizard import campaign_wizard_handler, campaign_routes
+from src.bot.handlers.dashboard import dashboard_routes
+from src.bot.handlers.wallet import withdrawal_wizard, wallet_routes
+from src.bot.handlers.support import support_routes
+from src.bot.handlers.admin_withdrawal import admin_handlers, admin_routes
+from src.services.job_registry import JobRegistry
+from src.services.token_health_service import TokenHealthService
+from src.services.expiry_service import expiry_scheduler
+from src.services.campaign_service import campaign_runner
+from src.utils.rate_limit import outbound
 
 
 scheduler = AsyncIOScheduler()
@@ -32,8 +45,32 @@ async def lifespan(app: FastAPI):
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
-    bot_app = Application.builder().token(settings.TELEGRAM_BOT_TOKEN).build()
+        await conn.run_sync(ensure_partitions, settings.PARTITION_MONTHS_AHEAD)
+        await conn.run_sync(ensure_invalidation_triggers)
+
+    await warm_up_pool(engine)
+    if read_engine is not engine:
+        await warm_up_pool(read_engine)
+
+    await InvalidationBus.start()
+    await scheduler_leader.start()
+
+    # Estado compartilhado entre os workers: relido e gravado a cada update
+    persistence = DatabasePersistence()
+    bot_app = (
+        Application.builder()
+        .token(settings.TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(
+            PerUserUpdateProcessor(
+                settings.MAIN_BOT_CONCURRENT_UPDATES,
+                settings.MAIN_BOT_USER_BACKLOG,
+                state=persistence,
+            )
+        )
+        .persistence(persistence)
+        .build()
+    )
+    persistence.bind(bot_app)
 
     bot_app.add_handler(creation_handler)
     bot_app.add_handler(plan_wizard_handler)
@@ -41,25 +78,31 @@ async def lifespan(app: FastAPI):
     bot_app.add_handler(change_group_handler)
     bot_app.add_handler(settings_wizard_handler)
     bot_app.add_handler(followup_wizard_handler)
-
-    for handler in wallet_handlers:
-        bot_app.add_handler(handler)
-
-    for handler in plan_action_handlers:
-        bot_app.add_handler(handler)
-
-    for handler in bot_action_handlers:
-        bot_app.add_handler(handler)
-
-    for handler in dashboard_handlers:
-        bot_app.add_handler(handler)
+    bot_app.add_handler(campaign_wizard_handler)
+    bot_app.add_handler(withdrawal_wizard)
 
     for handler in admin_handlers:
         bot_app.add_handler(handler)
 
-    bot_app.add_handler(support_handler)
     bot_app.add_handler(CommandHandler("start", start_command))
-    bot_app.add_handler(CallbackQueryHandler(start_command, pattern="^back_to_main$"))
+
+    # Demais botões: um único roteador por prefixo (depois das conversas,
+    # para que os fallbacks delas tenham prioridade)
+    bot_app.add_handler(
+        CallbackRouter(
+            *campaign_routes,
+            *wallet_routes,
+            *plan_action_routes,
+            *bot_action_routes,
+            *dashboard_routes,
+            *admin_routes,
+            *support_routes,
+            (BACK_TO_MAIN, start_command),
+        )
+    )
+
+    # Atividade por usuário e varredura de rascunhos esquecidos no user_data
+    state_sweeper.start(bot_app)
 
     await bot_app.initialize()
 
@@ -76,13 +119,37 @@ async def lifespan(app: FastAPI):
 
     app.state.bot_app = bot_app
 
+    TokenHealthService.set_notifier(bot_app.bot)
+
+    # Jobs periódicos, follow-ups, expirações e campanhas: rodam em todos os
+    # processos, mas só executam no líder
+    JobRegistry.register(scheduler, bot_app.bot)
+    scheduler.start()
+    await drip_engine.start()
+    await expiry_scheduler.start()
+    await campaign_runner.start(bot_app.bot)
+
     yield
 
+    scheduler.shutdown(wait=False)
+    await drip_engine.stop()
+    await expiry_scheduler.stop()
+    await JobRegistry.flush_engines()
+    await campaign_runner.stop()
+    await outbound.stop()
+    await state_sweeper.stop()
+
     if bot_app.updater.running:
         await bot_app.updater.stop()
     await bot_app.stop()
     await bot_app.shutdown()
 
+    await scheduler_leader.stop()
+    await InvalidationBus.stop()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(runner_router)
@@ -94,13 +161,23 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/stats/bot-state")
+async def bot_state_stats():
+    """Contadores de memória do estado do bot principal (user_data e conversas)."""
+    return state_sweeper.stats()
+
+
 @app.post("/telegram-webhook")
 async def telegram_webhook(request: Request):
-    """Recebe e processa atualizações do Telegram via Webhook."""
+    """
+    Recebe atualizações do Telegram via Webhook e responde na hora: o update
+    vai para a fila da Application, processada em background (em paralelo
+    entre usuários, em ordem para cada usuário).
+    """
     bot_app = request.app.state.bot_app
     update_data = await request.json()
     update = Update.de_json(update_data, bot_app.bot)
-    await bot_app.process_update(update)
+    await bot_app.update_queue.put(update)
     return {"ok": True}
 
 
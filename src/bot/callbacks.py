@@ -0,0 +1,162 @@
+from telegram import Update
+from telegram.ext import BaseHandler
+
+# Formato do callback_data: "<versão>:<código>[:<arg>...]", ex: "1:mb:42".
+# Mudou o layout dos argumentos de alguma rota? Suba a versão e registre o
+# formato anterior como legado da rota.
+CALLBACK_VERSION = 1
+SEP = ":"
+
+
+class Route:
+    """
+    Rota de callback do bot principal: código curto, tipos dos argumentos e,
+    opcionalmente, o prefixo legado (botões antigos ainda visíveis nos chats,
+    no formato "manage_bot_42").
+    """
+
+    __slots__ = ("code", "types", "legacy")
+
+    def __init__(self, code: str, *types: type, legacy: str = None):
+        self.code = code
+        self.types = types
+        self.legacy = legacy
+
+    def __call__(self, *args) -> str:
+        """Monta o callback_data do botão."""
+        return SEP.join((str(CALLBACK_VERSION), self.code, *map(str, args)))
+
+    def __repr__(self) -> str:
+        return f"Route({self.code!r})"
+
+    def prefixes(self):
+        """(prefixo, separador dos argumentos) de cada formato aceito."""
+        head = f"{CALLBACK_VERSION}{SEP}{self.code}"
+        yield (head + SEP if self.types else head), SEP
+        if self.legacy:
+            yield self.legacy, "_"
+
+    def parse(self, rest: str, sep: str):
+        """
+        Converte o que sobra após o prefixo nos argumentos tipados.
+
+        Returns:
+            Tupla de argumentos, ou None se não casar com a rota
+        """
+        if not self.types:
+            return () if not rest else None
+
+        parts = rest.split(sep, len(self.types) - 1)
+        if len(parts) != len(self.types):
+            return None
+        try:
+            return tuple(kind(part) for kind, part in zip(self.types, parts))
+        except ValueError:
+            return None
+
+
+# Rotas do bot principal
+BACK_TO_MAIN = Route("bm", legacy="back_to_main")
+SUPPORT = Route("sv", legacy="support_view")
+
+NEW_BOT = Route("nb", legacy="wizard_new_bot")
+CHECK_GROUP = Route("cg", legacy="check_group_connection")
+CANCEL_WIZARD = Route("cw", legacy="cancel_wizard")
+
+MY_BOTS = Route("lb", legacy="my_bots_list")
+MANAGE_BOT = Route("mb", int, legacy="manage_bot_")
+TOGGLE_BOT = Route("tb", int, legacy="toggle_bot_")
+DELETE_BOT = Route("db", int, legacy="delete_bot_")
+CONFIRM_DELETE_BOT = Route("xb", int, legacy="real_del_bot_")
+CHANGE_GROUP = Route("gg", int, legacy="change_group_")
+CHECK_NEW_GROUP = Route("gc", legacy="check_new_group")
+
+EDIT_DESCRIPTION = Route("ed", int, legacy="edit_desc_")
+EDIT_WELCOME = Route("ew", int, legacy="edit_welcome_")
+EDIT_FOLLOWUPS = Route("ef", int, legacy="edit_followups_")
+SKIP_FOLLOWUP = Route("sf", legacy="skip_followup")
+
+MANAGE_PLANS = Route("mp", int, legacy="manage_plans_")
+NEW_PLAN = Route("np", int, legacy="new_plan_")
+OPEN_PLAN = Route("op", int, legacy="open_plan_")
+EDIT_PLAN = Route("ep", str, int, legacy="edit_plan_")  # campo, plano
+TOGGLE_PLAN = Route("tp", int, legacy="toggle_plan_")
+DELETE_PLAN = Route("dp", int, legacy="delete_plan_")
+CONFIRM_DELETE_PLAN = Route("xp", int, legacy="confirm_delete_")
+
+NEW_CAMPAIGN = Route("nc", int, legacy="new_campaign_")
+CAMPAIGN_AUDIENCE = Route("ca", str, legacy="campaign_aud_")
+CAMPAIGN_CONFIRM = Route("cc", legacy="campaign_confirm")
+CANCEL_CAMPAIGN = Route("xc", int, legacy="cancel_campaign_")
+
+WALLET = Route("wv", legacy="wallet_view")
+WALLET_EXTRACT = Route("wx", legacy="wallet_extract")
+WITHDRAW = Route("ww", legacy="wallet_withdraw")
+
+ADMIN_PAY = Route("ap", int, legacy="admin_pay_")
+ADMIN_REJECT = Route("ar", int, legacy="admin_reject_")
+
+
+class CallbackRouter(BaseHandler):
+    """
+    Um handler para várias rotas de callback, no lugar de um
+    CallbackQueryHandler com regex por rota.
+
+    Os prefixos ficam numa trie de caracteres: o roteamento percorre o
+    callback_data uma vez (custo do tamanho do prefixo, não do número de
+    rotas) e tenta as rotas encontradas da mais longa para a mais curta. O
+    handler da rota recebe os argumentos já convertidos em context.args.
+
+    Funciona também dentro de ConversationHandler (entry_points, states e
+    fallbacks): o retorno do handler é repassado como novo estado.
+    """
+
+    __slots__ = ("_trie",)
+
+    def __init__(self, *routes):
+        super().__init__(self.handle_update)
+        self._trie = {}
+        for route, callback in routes:
+            self.add(route, callback)
+
+    def add(self, route: Route, callback):
+        """Registra a rota (e o formato legado, se houver)."""
+        for prefix, sep in route.prefixes():
+            node = self._trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            if None in node:
+                raise ValueError(f"Prefixo de callback duplicado: {prefix!r}")
+            node[None] = (route, sep, callback)
+
+    def match(self, data: str):
+        """
+        Returns:
+            (callback, argumentos) da rota que casa com data, ou None
+        """
+        found = []
+        node = self._trie
+        for depth, char in enumerate(data, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found.append((depth, node[None]))
+
+        for depth, (route, sep, callback) in reversed(found):
+            args = route.parse(data[depth:], sep)
+            if args is not None:
+                return callback, args
+        return None
+
+    def check_update(self, update: object):
+        if isinstance(update, Update) and update.callback_query:
+            data = update.callback_query.data
+            if isinstance(data, str):
+                return self.match(data)
+        return None
+
+    async def handle_update(self, update, application, check_result, context):
+        callback, args = check_result
+        context.args = list(args)
+        return await callback(update, context)
@@ -1,5 +1,5 @@
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.ext import ContextTypes, CommandHandler
 from sqlalchemy.future import select
 from datetime import datetime
 
@@ -11,14 +11,18 @@ from src.database.models import (
     TransactionType,
 )
 from src.utils.formatters import TextUtils
+from src.utils.rate_limit import MAIN_BOT, outbound
+from src.services.payout_service import PayoutService
+from src.core.config import settings
+from src.bot.callbacks import ADMIN_PAY, ADMIN_REJECT
 
 
 async def approve_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    Aprova solicitação de saque, atualiza status e notifica o usuário.
+    Aprova solicitação de saque e dispara o pagamento automático via Pix.
     """
     query = update.callback_query
-    withdrawal_id = int(query.data.split("_")[2])
+    withdrawal_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -30,34 +34,89 @@ async def approve_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await query.answer("Saque não encontrado!", show_alert=True)
             return
 
-        if withdrawal.status != WithdrawalStatus.PENDING:
+        if withdrawal.status != WithdrawalStatus.PENDING or withdrawal.approved_at:
             await query.answer(
                 f"Este saque já está {withdrawal.status.value}", show_alert=True
             )
             return
 
-        withdrawal.status = WithdrawalStatus.PAID
-        withdrawal.processed_at = datetime.now()
-        await session.commit()
+    await PayoutService.approve([withdrawal_id], update.effective_user.id)
 
-        original_text = query.message.text_html
-        new_text = (
-            f"{original_text}\n\n✅ <b>PAGO por {update.effective_user.first_name}</b>"
+    original_text = query.message.text_html
+    new_text = (
+        f"{original_text}\n\n✅ <b>APROVADO por {update.effective_user.first_name}</b>"
+        "\n⏳ Pix em processamento..."
+    )
+    await outbound.send(
+        MAIN_BOT,
+        query.message.chat_id,
+        lambda: query.edit_message_text(
+            new_text, parse_mode="HTML", reply_markup=None
+        ),
+    )
+
+    context.application.create_task(
+        PayoutService.process_approved(notify_bot=context.bot)
+    )
+
+
+async def approve_all_withdrawals(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Aprova todos os saques pendentes de uma vez e processa os pagamentos em lote.
+    Uso: /pagar_saques (somente administradores).
+
+    O lote roda em segundo plano; o resumo é enviado quando terminar.
+    """
+    user = update.effective_user
+    if str(user.id) not in settings.ADMIN_USER_IDS:
+        return
+
+    if PayoutService.is_running():
+        await _reply(
+            update,
+            "⏳ Já existe um lote de saques em processamento. "
+            "Aguarde o resumo dele e tente novamente.",
         )
-        await query.edit_message_text(new_text, parse_mode="HTML", reply_markup=None)
+        return
 
-        try:
-            await context.bot.send_message(
-                chat_id=withdrawal.user_id,
-                text=(
-                    f"✅ <b>Saque Aprovado!</b>\n\n"
-                    f"Seu saque de <b>{TextUtils.currency(withdrawal.amount_requested)}</b> foi processado.\n"
-                    "O valor deve cair na sua conta em instantes."
-                ),
-                parse_mode="HTML",
-            )
-        except Exception:
-            pass
+    approved = await PayoutService.approve(None, user.id)
+    await _reply(
+        update, f"⏳ <b>{approved}</b> saque(s) aprovado(s). Processando pagamentos..."
+    )
+
+    context.application.create_task(_report_batch(update, context), update=update)
+
+
+async def _reply(update: Update, text: str):
+    """Responde ao comando do administrador pelo dispatcher do bot principal."""
+    await outbound.send(
+        MAIN_BOT,
+        update.effective_chat.id,
+        lambda: update.message.reply_text(text, parse_mode="HTML"),
+    )
+
+
+async def _report_batch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Executa o lote de pagamentos e envia o resumo ao administrador."""
+    summary = await PayoutService.process_approved(notify_bot=context.bot)
+
+    if summary is None:
+        # Outro lote começou antes deste: os aprovados entram nele
+        await _reply(
+            update,
+            "⏳ Já existe um lote de saques em processamento. "
+            "Os saques aprovados serão pagos por ele.",
+        )
+        return
+
+    await _reply(
+        update,
+        "<b>💸 Lote de Saques Finalizado</b>\n\n"
+        f"✅ Pagos: <b>{summary['paid']}</b>\n"
+        f"❌ Recusados (estornados): <b>{summary['failed']}</b>\n"
+        f"🔁 Reenfileirados: <b>{summary['retry']}</b>\n"
+        f"⚠️ Sem resposta (conferir manualmente): <b>{summary['stalled']}</b>",
+    )
 
 
 async def reject_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -65,7 +124,7 @@ async def reject_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
     Rejeita solicitação de saque e estorna o valor para o saldo do usuário.
     """
     query = update.callback_query
-    withdrawal_id = int(query.data.split("_")[2])
+    withdrawal_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -73,7 +132,11 @@ async def reject_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         withdrawal = result.scalars().first()
 
-        if not withdrawal or withdrawal.status != WithdrawalStatus.PENDING:
+        if (
+            not withdrawal
+            or withdrawal.status != WithdrawalStatus.PENDING
+            or withdrawal.approved_at
+        ):
             await query.answer("Saque inválido ou já processado.", show_alert=True)
             return
 
@@ -91,23 +154,37 @@ async def reject_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         original_text = query.message.text_html
         new_text = f"{original_text}\n\n❌ <b>REJEITADO por {update.effective_user.first_name}</b>"
-        await query.edit_message_text(new_text, parse_mode="HTML", reply_markup=None)
+        await outbound.send(
+            MAIN_BOT,
+            query.message.chat_id,
+            lambda: query.edit_message_text(
+                new_text, parse_mode="HTML", reply_markup=None
+            ),
+        )
 
         try:
-            await context.bot.send_message(
-                chat_id=withdrawal.user_id,
-                text=(
-                    f"❌ <b>Saque Rejeitado</b>\n\n"
-                    f"Seu saque de {TextUtils.currency(withdrawal.amount_requested)} foi rejeitado e o valor estornado para sua carteira.\n"
-                    "Entre em contato com o suporte se tiver dúvidas."
+            await outbound.send(
+                MAIN_BOT,
+                withdrawal.user_id,
+                lambda: context.bot.send_message(
+                    chat_id=withdrawal.user_id,
+                    text=(
+                        f"❌ <b>Saque Rejeitado</b>\n\n"
+                        f"Seu saque de {TextUtils.currency(withdrawal.amount_requested)} foi rejeitado e o valor estornado para sua carteira.\n"
+                        "Entre em contato com o suporte se tiver dúvidas."
+                    ),
+                    parse_mode="HTML",
                 ),
-                parse_mode="HTML",
             )
         except Exception:
             pass
 
 
+admin_routes = [
+    (ADMIN_PAY, approve_withdrawal),
+    (ADMIN_REJECT, reject_withdrawal),
+]
+
 admin_handlers = [
-    CallbackQueryHandler(approve_withdrawal, pattern="^admin_pay_"),
-    CallbackQueryHandler(reject_withdrawal, pattern="^admin_reject_"),
+    CommandHandler("pagar_saques", approve_all_withdrawals),
 ]
@@ -1,5 +1,5 @@
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler
+from telegram.ext import ContextTypes, ConversationHandler
 from sqlalchemy.future import select
 
 from src.database.base import AsyncSessionLocal
@@ -8,18 +8,31 @@ from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
 from src.utils.ui import UI
 from src.services.bot_service import BotService
+from src.services.bot_deletion_service import BotDeletionService
 from src.bot.keyboards.dashboard import bot_management_keyboard, my_bots_list_keyboard
+from src.bot.callbacks import (
+    CallbackRouter,
+    MANAGE_BOT,
+    TOGGLE_BOT,
+    DELETE_BOT,
+    CONFIRM_DELETE_BOT,
+    CHANGE_GROUP,
+    CHECK_NEW_GROUP,
+)
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
 
 WAITING_NEW_GROUP = 1
 
 
 async def toggle_bot_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Alterna o status ativo/inativo do bot."""
-    query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
+    bot_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Bot).filter(Bot.id == bot_id))
+        result = await session.execute(
+            select(Bot).filter(Bot.id == bot_id, Bot.deleted_at == None)
+        )
         bot = result.scalars().first()
 
         if bot:
@@ -41,13 +54,13 @@ async def toggle_bot_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def confirm_delete_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Exibe confirmação antes de excluir o bot."""
-    bot_id = int(update.callback_query.data.split("_")[2])
+    bot_id = context.args[0]
 
     text = TextUtils.pad_message(
         "<b>⚠️ ZONA DE PERIGO</b>\n\n"
         "Você tem certeza que deseja <b>EXCLUIR</b> este bot?\n"
         "• Todos os planos serão apagados.\n"
-        "• O histórico de vendas será perdido.\n"
+        "• Leads e assinaturas serão apagados (o saldo da carteira é mantido).\n"
         "• Essa ação não pode ser desfeita."
     )
 
@@ -56,10 +69,10 @@ async def confirm_delete_bot(update: Update, context: ContextTypes.DEFAULT_TYPE)
             [
                 InlineKeyboardButton(
                     "🔥 Sim, Excluir Definitivamente",
-                    callback_data=f"real_del_bot_{bot_id}",
+                    callback_data=CONFIRM_DELETE_BOT(bot_id),
                 )
             ],
-            [InlineKeyboardButton("� Cancelar", callback_data=f"manage_bot_{bot_id}")],
+            [InlineKeyboardButton("� Cancelar", callback_data=MANAGE_BOT(bot_id))],
         ]
     )
 
@@ -67,20 +80,27 @@ async def confirm_delete_bot(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 
 async def action_delete_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Executa a exclusão definitiva do bot."""
-    bot_id = int(update.callback_query.data.split("_")[3])
+    """
+    Exclui o bot: marca como excluído (sai do ar na hora) e agenda a remoção
+    dos dados em background, com o progresso enviado ao dono.
+    """
+    bot_id = context.args[0]
     user_id = update.effective_user.id
 
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Bot).filter(Bot.id == bot_id))
-        bot = result.scalars().first()
-
-        if bot:
-            await session.delete(bot)
-            await session.commit()
-            await UI.show_toast(update, "Bot excluído com sucesso!", alert=True)
+    if await BotDeletionService.soft_delete(bot_id, user_id):
+        await UI.show_toast(
+            update,
+            "Bot excluído! Os dados serão removidos em segundo plano.",
+            alert=True,
+        )
+        context.application.create_task(
+            BotDeletionService.purge_deleted_bots(notify_bot=context.bot)
+        )
 
-        result_list = await session.execute(select(Bot).filter(Bot.owner_id == user_id))
+    async with AsyncSessionLocal() as session:
+        result_list = await session.execute(
+            select(Bot).filter(Bot.owner_id == user_id, Bot.deleted_at == None)
+        )
         bots = result_list.scalars().all()
 
         text = TextUtils.pad_message("<b>🤖 Seus Bots</b>\n\nSelecione um bot abaixo.")
@@ -91,7 +111,7 @@ async def action_delete_bot(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def start_change_group(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Inicia o processo de troca de grupo vinculado ao bot."""
-    bot_id = int(update.callback_query.data.split("_")[2])
+    bot_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Bot).filter(Bot.id == bot_id))
@@ -120,12 +140,12 @@ async def start_change_group(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 [InlineKeyboardButton("➕ Add no Novo Grupo", url=add_group_url)],
                 [
                     InlineKeyboardButton(
-                        "🔄 Verificar Novo Grupo", callback_data="check_new_group"
+                        "🔄 Verificar Novo Grupo", callback_data=CHECK_NEW_GROUP()
                     )
                 ],
                 [
                     InlineKeyboardButton(
-                        "🔙 Cancelar", callback_data=f"manage_bot_{bot.id}"
+                        "🔙 Cancelar", callback_data=MANAGE_BOT(bot.id)
                     )
                 ],
             ]
@@ -175,8 +195,6 @@ async def cancel_change_group(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Cancela a troca de grupo e retorna ao menu do bot."""
     bot_id = context.user_data.get("edit_bot_id")
     if not bot_id:
-        query = update.callback_query
-        query.data = "my_bots_list"
         from src.bot.handlers.dashboard import list_my_bots
 
         await list_my_bots(update, context)
@@ -196,18 +214,24 @@ async def cancel_change_group(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 
 change_group_handler = ConversationHandler(
-    entry_points=[CallbackQueryHandler(start_change_group, pattern="^change_group_")],
+    entry_points=[CallbackRouter((CHANGE_GROUP, start_change_group))],
     states={
         WAITING_NEW_GROUP: [
-            CallbackQueryHandler(check_new_group_step, pattern="^check_new_group$"),
-            CallbackQueryHandler(cancel_change_group, pattern="^manage_bot_"),
-        ]
+            CallbackRouter(
+                (CHECK_NEW_GROUP, check_new_group_step),
+                (MANAGE_BOT, cancel_change_group),
+            ),
+        ],
+        **wizard_timeout("edit_bot_id", "edit_bot_token"),
     },
-    fallbacks=[CallbackQueryHandler(cancel_change_group, pattern="^manage_bot_")],
+    fallbacks=[CallbackRouter((MANAGE_BOT, cancel_change_group))],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="change_group",
+    persistent=True,
 )
 
-bot_action_handlers = [
-    CallbackQueryHandler(toggle_bot_status, pattern="^toggle_bot_"),
-    CallbackQueryHandler(confirm_delete_bot, pattern="^delete_bot_"),
-    CallbackQueryHandler(action_delete_bot, pattern="^real_del_bot_"),
+bot_action_routes = [
+    (TOGGLE_BOT, toggle_bot_status),
+    (DELETE_BOT, confirm_delete_bot),
+    (CONFIRM_DELETE_BOT, action_delete_bot),
 ]
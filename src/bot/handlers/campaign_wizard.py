@@ -0,0 +1,243 @@
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.error import BadRequest
+from telegram.ext import (
+    ContextTypes,
+    ConversationHandler,
+    MessageHandler,
+    CommandHandler,
+    filters,
+)
+from sqlalchemy.future import select
+
+from src.database.base import AsyncSessionLocal
+from src.database.models import Bot
+from src.utils.chat_manager import ChatManager
+from src.utils.formatters import TextUtils
+from src.utils.ui import UI
+from src.services.campaign_service import AUDIENCES, CampaignService, campaign_runner
+from src.bot.keyboards.dashboard import bot_management_keyboard
+from src.bot.handlers.start import start_command
+from src.bot.callbacks import (
+    CallbackRouter,
+    MANAGE_BOT,
+    NEW_CAMPAIGN,
+    CAMPAIGN_AUDIENCE,
+    CAMPAIGN_CONFIRM,
+    CANCEL_CAMPAIGN,
+)
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
+
+CHOOSING_AUDIENCE = 1
+WAITING_TEXT = 2
+CONFIRMING = 3
+
+
+def _cancel_keyboard(bot_id: int, *rows):
+    return InlineKeyboardMarkup(
+        [
+            *rows,
+            [InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_BOT(bot_id))],
+        ]
+    )
+
+
+async def start_campaign(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inicia o wizard de campanha: escolha do público."""
+    bot_id = context.args[0]
+
+    # O bot_id vem do callback: só o dono pode transmitir para o público
+    if not await CampaignService.owned_bot(bot_id, update.effective_user.id):
+        await UI.show_toast(update, "Bot não encontrado!", alert=True)
+        return ConversationHandler.END
+
+    running = await CampaignService.running_for(bot_id)
+    if running:
+        await UI.show_toast(
+            update,
+            "Já existe uma campanha em andamento neste bot. Aguarde ou cancele.",
+            alert=True,
+        )
+        return ConversationHandler.END
+
+    context.user_data["campaign_bot_id"] = bot_id
+
+    text = TextUtils.pad_message(
+        "<b>📣 Nova Campanha (1/3)</b>\n\n"
+        "Envie uma mensagem para o público do seu bot.\n\n"
+        "👥 <b>Para quem?</b>"
+    )
+    kb = _cancel_keyboard(
+        bot_id,
+        [
+            InlineKeyboardButton(
+                "👥 Todos os Leads", callback_data=CAMPAIGN_AUDIENCE("leads")
+            )
+        ],
+        [
+            InlineKeyboardButton(
+                "💎 Assinantes Ativos", callback_data=CAMPAIGN_AUDIENCE("subscribers")
+            )
+        ],
+    )
+
+    await ChatManager.render_view(update, context, text, kb)
+    return CHOOSING_AUDIENCE
+
+
+async def choose_audience(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Registra o público e pede o texto da campanha."""
+    bot_id = context.user_data["campaign_bot_id"]
+    audience = context.args[0]
+    context.user_data["campaign_audience"] = audience
+
+    text = TextUtils.pad_message(
+        f"<b>📣 Nova Campanha (2/3)</b>\n\n"
+        f"Público: <b>{AUDIENCES[audience]}</b>\n\n"
+        "📝 <b>Envie o texto da mensagem:</b>\n"
+        "<i>Negrito, itálico e links são mantidos.</i>"
+    )
+
+    await ChatManager.render_view(update, context, text, _cancel_keyboard(bot_id))
+    return WAITING_TEXT
+
+
+async def receive_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Recebe o texto e mostra a confirmação com o tamanho do público."""
+    bot_id = context.user_data["campaign_bot_id"]
+    audience = context.user_data["campaign_audience"]
+
+    msg = update.message
+    if msg.photo or msg.video or msg.document:
+        await msg.reply_text(
+            "❌ <b>Erro:</b> A campanha deve ser apenas texto.", parse_mode="HTML"
+        )
+        return WAITING_TEXT
+
+    # Teste da formatação com o mesmo parse_mode do envio: HTML recusado
+    # faria todos os destinatários voltarem como "rejected"
+    try:
+        test_msg = await context.bot.send_message(
+            chat_id=msg.chat_id, text=msg.text_html, parse_mode="HTML"
+        )
+    except BadRequest:
+        await msg.reply_text(
+            "❌ <b>Erro:</b> O Telegram recusou a formatação desta mensagem. "
+            "Envie o texto novamente.",
+            parse_mode="HTML",
+        )
+        return WAITING_TEXT
+    try:
+        await test_msg.delete()
+    except Exception:
+        pass
+
+    context.user_data["campaign_text"] = msg.text_html
+    total = await CampaignService.count_recipients(bot_id, audience)
+
+    text = TextUtils.pad_message(
+        f"<b>📣 Nova Campanha (3/3)</b>\n\n"
+        f"Público: <b>{AUDIENCES[audience]}</b> ({total} pessoas)\n\n"
+        f"{msg.text_html}\n\n"
+        "<i>Quem bloqueou o bot não recebe. Confirma o envio?</i>"
+    )
+    kb = _cancel_keyboard(
+        bot_id,
+        [InlineKeyboardButton("🚀 Enviar Agora", callback_data=CAMPAIGN_CONFIRM())],
+    )
+
+    await ChatManager.render_view(update, context, text, kb)
+    return CONFIRMING
+
+
+async def confirm_campaign(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cria a campanha; o progresso chega numa mensagem separada."""
+    bot_id = context.user_data.pop("campaign_bot_id")
+    audience = context.user_data.pop("campaign_audience")
+    campaign_text = context.user_data.pop("campaign_text")
+
+    campaign, reason = await CampaignService.create(
+        bot_id, update.effective_user.id, audience, campaign_text
+    )
+    if campaign:
+        campaign_runner.wake()
+        await UI.show_toast(update, "🚀 Campanha iniciada!")
+        status = "O envio começou. Acompanhe o progresso na mensagem abaixo."
+    elif reason == "not_owner":
+        # Bot excluído ou de outro dono: volta ao menu principal
+        await UI.show_toast(update, "Bot não encontrado!", alert=True)
+        await start_command(update, context)
+        return ConversationHandler.END
+    else:
+        await UI.show_toast(update, "Já existe uma campanha em andamento.", alert=True)
+        status = "Nenhuma campanha nova foi criada."
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Bot).filter(Bot.id == bot_id))
+        bot = result.scalars().first()
+
+    text = TextUtils.pad_message(f"<b>📣 Campanha</b>\n\n{status}")
+    await ChatManager.render_view(update, context, text, bot_management_keyboard(bot))
+    return ConversationHandler.END
+
+
+async def cancel_wizard(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cancela o wizard e retorna ao menu do bot."""
+    bot_id = context.args[0]
+    for key in ("campaign_bot_id", "campaign_audience", "campaign_text"):
+        context.user_data.pop(key, None)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Bot).filter(Bot.id == bot_id))
+        bot = result.scalars().first()
+        text = TextUtils.pad_message(
+            f"<b>⚙️ Gerenciando: {bot.name}</b>\nOperação cancelada."
+        )
+        await ChatManager.render_view(
+            update, context, text, bot_management_keyboard(bot)
+        )
+    return ConversationHandler.END
+
+
+async def cancel_campaign(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Botão da mensagem de progresso: cancela a campanha em andamento."""
+    campaign_id = context.args[0]
+
+    if await CampaignService.cancel(campaign_id, update.effective_user.id):
+        await UI.show_toast(update, "⏹ Campanha cancelada.")
+    else:
+        await UI.show_toast(update, "A campanha já terminou.")
+
+
+async def restart_via_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Reinicia o bot via comando /start durante o wizard."""
+    await start_command(update, context)
+    return ConversationHandler.END
+
+
+campaign_wizard_handler = ConversationHandler(
+    entry_points=[CallbackRouter((NEW_CAMPAIGN, start_campaign))],
+    states={
+        CHOOSING_AUDIENCE: [
+            CallbackRouter((CAMPAIGN_AUDIENCE, choose_audience)),
+        ],
+        WAITING_TEXT: [
+            MessageHandler(filters.TEXT & ~filters.COMMAND, receive_text),
+        ],
+        CONFIRMING: [
+            CallbackRouter((CAMPAIGN_CONFIRM, confirm_campaign)),
+        ],
+        **wizard_timeout("campaign_bot_id", "campaign_audience", "campaign_text"),
+    },
+    fallbacks=[
+        CallbackRouter((MANAGE_BOT, cancel_wizard)),
+        CommandHandler("start", restart_via_command),
+    ],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="campaign_wizard",
+    persistent=True,
+)
+
+campaign_routes = [
+    (CANCEL_CAMPAIGN, cancel_campaign),
+]
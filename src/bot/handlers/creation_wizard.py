@@ -2,7 +2,6 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
-    CallbackQueryHandler,
     MessageHandler,
     filters,
 )
@@ -12,6 +11,9 @@ from src.utils.formatters import TextUtils
 from src.utils.ui import UI
 from src.services.bot_service import BotService
 from src.bot.keyboards.menus import main_menu_keyboard
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
+from src.bot.callbacks import CallbackRouter, NEW_BOT, CHECK_GROUP, CANCEL_WIZARD
 
 WAITING_TOKEN = 1
 WAITING_GROUP_CONFIRMATION = 2
@@ -24,7 +26,7 @@ async def start_creation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Envie o <b>Token de API</b> do seu bot criado no @BotFather."
     )
     keyboard = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data="cancel_wizard")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=CANCEL_WIZARD())]]
     )
     await ChatManager.render_view(update, context, text, keyboard)
     return WAITING_TOKEN
@@ -40,7 +42,7 @@ async def receive_token(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not bot_info:
         error_text = TextUtils.pad_message("<b>❌ Token Inválido!</b> Tente novamente.")
         keyboard = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("🔙 Cancelar", callback_data="cancel_wizard")]]
+            [[InlineKeyboardButton("🔙 Cancelar", callback_data=CANCEL_WIZARD())]]
         )
         await ChatManager.render_view(update, context, error_text, keyboard)
         return WAITING_TOKEN
@@ -66,10 +68,10 @@ async def receive_token(update: Update, context: ContextTypes.DEFAULT_TYPE):
             [InlineKeyboardButton("➕ Adicionar no Grupo (Admin)", url=add_group_url)],
             [
                 InlineKeyboardButton(
-                    "🔄 Verificar Grupo", callback_data="check_group_connection"
+                    "🔄 Verificar Grupo", callback_data=CHECK_GROUP()
                 )
             ],
-            [InlineKeyboardButton("� Cancelar", callback_data="cancel_wizard")],
+            [InlineKeyboardButton("� Cancelar", callback_data=CANCEL_WIZARD())],
         ]
     )
 
@@ -124,16 +126,22 @@ async def cancel_wizard(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 creation_handler = ConversationHandler(
-    entry_points=[CallbackQueryHandler(start_creation, pattern="^wizard_new_bot$")],
+    entry_points=[CallbackRouter((NEW_BOT, start_creation))],
     states={
         WAITING_TOKEN: [
             MessageHandler(filters.TEXT & ~filters.COMMAND, receive_token),
-            CallbackQueryHandler(cancel_wizard, pattern="^cancel_wizard$"),
+            CallbackRouter((CANCEL_WIZARD, cancel_wizard)),
         ],
         WAITING_GROUP_CONFIRMATION: [
-            CallbackQueryHandler(check_group_step, pattern="^check_group_connection$"),
-            CallbackQueryHandler(cancel_wizard, pattern="^cancel_wizard$"),
+            CallbackRouter(
+                (CHECK_GROUP, check_group_step),
+                (CANCEL_WIZARD, cancel_wizard),
+            ),
         ],
+        **wizard_timeout("temp_bot_token", "temp_bot_info"),
     },
-    fallbacks=[CallbackQueryHandler(cancel_wizard, pattern="^cancel_wizard$")],
+    fallbacks=[CallbackRouter((CANCEL_WIZARD, cancel_wizard))],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="creation_wizard",
+    persistent=True,
 )
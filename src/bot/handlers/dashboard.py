@@ -1,11 +1,12 @@
 from telegram import Update
-from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.ext import ContextTypes
 from sqlalchemy.future import select
 
-from src.database.base import AsyncSessionLocal
+from src.database.base import read_session
 from src.database.models import Bot, Plan
 from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
+from src.bot.callbacks import MY_BOTS, MANAGE_BOT, MANAGE_PLANS
 from src.bot.keyboards.dashboard import (
     my_bots_list_keyboard,
     bot_management_keyboard,
@@ -17,8 +18,10 @@ async def list_my_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Lista todos os bots do usuário."""
     user_id = update.effective_user.id
 
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Bot).filter(Bot.owner_id == user_id))
+    async with read_session(("user", user_id)) as session:
+        result = await session.execute(
+            select(Bot).filter(Bot.owner_id == user_id, Bot.deleted_at == None)
+        )
         bots = result.scalars().all()
 
         text = TextUtils.pad_message(
@@ -39,10 +42,12 @@ async def list_my_bots(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def open_bot_manager(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Abre o menu de gerenciamento de um bot específico."""
     query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
+    bot_id = context.args[0]
 
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Bot).filter(Bot.id == bot_id))
+    async with read_session(("user", update.effective_user.id)) as session:
+        result = await session.execute(
+            select(Bot).filter(Bot.id == bot_id, Bot.deleted_at == None)
+        )
         bot = result.scalars().first()
 
         if not bot:
@@ -62,10 +67,9 @@ async def open_bot_manager(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def view_plans(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Exibe a lista de planos de assinatura de um bot."""
-    query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
+    bot_id = context.args[0]
 
-    async with AsyncSessionLocal() as session:
+    async with read_session(("bot", bot_id)) as session:
         result = await session.execute(select(Plan).filter(Plan.bot_id == bot_id))
         plans = result.scalars().all()
 
@@ -80,8 +84,8 @@ async def view_plans(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
-dashboard_handlers = [
-    CallbackQueryHandler(list_my_bots, pattern="^my_bots_list$"),
-    CallbackQueryHandler(open_bot_manager, pattern="^manage_bot_"),
-    CallbackQueryHandler(view_plans, pattern="^manage_plans_"),
+dashboard_routes = [
+    (MY_BOTS, list_my_bots),
+    (MANAGE_BOT, open_bot_manager),
+    (MANAGE_PLANS, view_plans),
 ]
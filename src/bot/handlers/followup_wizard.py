@@ -2,7 +2,6 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
-    CallbackQueryHandler,
     MessageHandler,
     CommandHandler,
     filters,
@@ -15,6 +14,9 @@ from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
 from src.bot.keyboards.dashboard import bot_management_keyboard
 from src.bot.handlers.start import start_command
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
+from src.bot.callbacks import CallbackRouter, MANAGE_BOT, EDIT_FOLLOWUPS, SKIP_FOLLOWUP
 
 WAITING_MSG_1 = 1
 WAITING_MSG_2 = 2
@@ -23,8 +25,7 @@ WAITING_MSG_3 = 3
 
 async def start_edit_followups(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Inicia o wizard de configuração de mensagens de remarketing."""
-    query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
+    bot_id = context.args[0]
     context.user_data["settings_bot_id"] = bot_id
     context.user_data["new_followups"] = []
 
@@ -40,8 +41,8 @@ async def start_edit_followups(update: Update, context: ContextTypes.DEFAULT_TYP
 
     kb = InlineKeyboardMarkup(
         [
-            [InlineKeyboardButton("⏭ Pular esta", callback_data="skip_followup")],
-            [InlineKeyboardButton("🔙 Cancelar", callback_data=f"manage_bot_{bot_id}")],
+            [InlineKeyboardButton("⏭ Pular esta", callback_data=SKIP_FOLLOWUP())],
+            [InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_BOT(bot_id))],
         ]
     )
 
@@ -122,10 +123,10 @@ async def process_followup_step(
         )
         kb = InlineKeyboardMarkup(
             [
-                [InlineKeyboardButton("⏭ Pular esta", callback_data="skip_followup")],
+                [InlineKeyboardButton("⏭ Pular esta", callback_data=SKIP_FOLLOWUP())],
                 [
                     InlineKeyboardButton(
-                        "🔙 Cancelar", callback_data=f"manage_bot_{bot_id}"
+                        "🔙 Cancelar", callback_data=MANAGE_BOT(bot_id)
                     )
                 ],
             ]
@@ -172,7 +173,7 @@ async def process_followup_step(
 
 async def cancel_followups(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancela a configuração de mensagens de remarketing."""
-    bot_id = int(update.callback_query.data.split("_")[2])
+    bot_id = context.args[0]
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Bot).filter(Bot.id == bot_id))
         bot = result.scalars().first()
@@ -193,24 +194,28 @@ async def restart_via_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 followup_wizard_handler = ConversationHandler(
     entry_points=[
-        CallbackQueryHandler(start_edit_followups, pattern="^edit_followups_")
+        CallbackRouter((EDIT_FOLLOWUPS, start_edit_followups))
     ],
     states={
         WAITING_MSG_1: [
             MessageHandler(filters.TEXT & ~filters.COMMAND, receive_msg_1),
-            CallbackQueryHandler(skip_msg_1, pattern="^skip_followup$"),
+            CallbackRouter((SKIP_FOLLOWUP, skip_msg_1)),
         ],
         WAITING_MSG_2: [
             MessageHandler(filters.TEXT & ~filters.COMMAND, receive_msg_2),
-            CallbackQueryHandler(skip_msg_2, pattern="^skip_followup$"),
+            CallbackRouter((SKIP_FOLLOWUP, skip_msg_2)),
         ],
         WAITING_MSG_3: [
             MessageHandler(filters.TEXT & ~filters.COMMAND, receive_msg_3),
-            CallbackQueryHandler(skip_msg_3, pattern="^skip_followup$"),
+            CallbackRouter((SKIP_FOLLOWUP, skip_msg_3)),
         ],
+        **wizard_timeout("settings_bot_id", "new_followups"),
     },
     fallbacks=[
-        CallbackQueryHandler(cancel_followups, pattern="^manage_bot_"),
+        CallbackRouter((MANAGE_BOT, cancel_followups)),
         CommandHandler("start", restart_via_command),
     ],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="followup_wizard",
+    persistent=True,
 )
@@ -2,7 +2,6 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
-    CallbackQueryHandler,
     MessageHandler,
     filters,
 )
@@ -14,14 +13,23 @@ from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
 from src.utils.ui import UI
 from src.bot.keyboards.dashboard import single_plan_keyboard
+from src.bot.callbacks import (
+    CallbackRouter,
+    OPEN_PLAN,
+    EDIT_PLAN,
+    TOGGLE_PLAN,
+    DELETE_PLAN,
+    CONFIRM_DELETE_PLAN,
+)
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
 
 EDITING_VALUE = 1
 
 
 async def open_plan_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Exibe os detalhes de um plano específico."""
-    query = update.callback_query
-    plan_id = int(query.data.split("_")[2])
+    plan_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Plan).filter(Plan.id == plan_id))
@@ -47,7 +55,7 @@ async def open_plan_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def toggle_plan_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Alterna o status ativo/inativo do plano."""
-    plan_id = int(update.callback_query.data.split("_")[2])
+    plan_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Plan).filter(Plan.id == plan_id))
@@ -65,7 +73,7 @@ async def toggle_plan_status(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def delete_plan_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Solicita confirmação antes de excluir o plano."""
-    plan_id = int(update.callback_query.data.split("_")[2])
+    plan_id = context.args[0]
 
     text = TextUtils.pad_message(
         "<b>⚠️ Tem certeza?</b>\n\n"
@@ -77,10 +85,10 @@ async def delete_plan_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE
         [
             [
                 InlineKeyboardButton(
-                    "🔥 Sim, Apagar", callback_data=f"confirm_delete_{plan_id}"
+                    "🔥 Sim, Apagar", callback_data=CONFIRM_DELETE_PLAN(plan_id)
                 )
             ],
-            [InlineKeyboardButton("Cancelar", callback_data=f"open_plan_{plan_id}")],
+            [InlineKeyboardButton("Cancelar", callback_data=OPEN_PLAN(plan_id))],
         ]
     )
 
@@ -89,7 +97,7 @@ async def delete_plan_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def delete_plan_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Executa a exclusão do plano."""
-    plan_id = int(update.callback_query.data.split("_")[2])
+    plan_id = context.args[0]
 
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Plan).filter(Plan.id == plan_id))
@@ -101,7 +109,7 @@ async def delete_plan_action(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await session.commit()
             await UI.show_toast(update, "Plano apagado com sucesso!")
 
-        update.callback_query.data = f"manage_plans_{bot_id}"
+        context.args = [bot_id]
         from src.bot.handlers.dashboard import view_plans
 
         await view_plans(update, context)
@@ -109,10 +117,7 @@ async def delete_plan_action(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 async def start_edit_field(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Inicia a edição de um campo específico do plano (nome, preço ou duração)."""
-    query = update.callback_query
-    data = query.data.split("_")
-    field = data[2]
-    plan_id = int(data[3])
+    field, plan_id = context.args
 
     context.user_data["edit_plan_id"] = plan_id
     context.user_data["edit_field"] = field
@@ -125,7 +130,7 @@ async def start_edit_field(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data=f"open_plan_{plan_id}")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=OPEN_PLAN(plan_id))]]
     )
     await ChatManager.render_view(update, context, text, kb)
 
@@ -167,7 +172,6 @@ async def receive_new_value(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cancel_edit(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancela a edição do plano."""
-    plan_id = int(update.callback_query.data.split("_")[2])
     await open_plan_details(update, context)
     return ConversationHandler.END
 
@@ -190,14 +194,20 @@ async def open_plan_details_manual(update, context, plan_id):
 
 
 plan_edit_conversation = ConversationHandler(
-    entry_points=[CallbackQueryHandler(start_edit_field, pattern="^edit_plan_")],
-    states={EDITING_VALUE: [MessageHandler(filters.TEXT, receive_new_value)]},
-    fallbacks=[CallbackQueryHandler(cancel_edit, pattern="^open_plan_")],
+    entry_points=[CallbackRouter((EDIT_PLAN, start_edit_field))],
+    states={
+        EDITING_VALUE: [MessageHandler(filters.TEXT, receive_new_value)],
+        **wizard_timeout("edit_plan_id", "edit_field"),
+    },
+    fallbacks=[CallbackRouter((OPEN_PLAN, cancel_edit))],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="plan_editor",
+    persistent=True,
 )
 
-plan_action_handlers = [
-    CallbackQueryHandler(open_plan_details, pattern="^open_plan_"),
-    CallbackQueryHandler(toggle_plan_status, pattern="^toggle_plan_"),
-    CallbackQueryHandler(delete_plan_confirm, pattern="^delete_plan_"),
-    CallbackQueryHandler(delete_plan_action, pattern="^confirm_delete_"),
+plan_action_routes = [
+    (OPEN_PLAN, open_plan_details),
+    (TOGGLE_PLAN, toggle_plan_status),
+    (DELETE_PLAN, delete_plan_confirm),
+    (CONFIRM_DELETE_PLAN, delete_plan_action),
 ]
@@ -2,7 +2,6 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
-    CallbackQueryHandler,
     MessageHandler,
     filters,
 )
@@ -12,6 +11,9 @@ from src.database.models import Plan
 from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
 from src.bot.keyboards.dashboard import plans_list_keyboard
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
+from src.bot.callbacks import CallbackRouter, MANAGE_PLANS, NEW_PLAN
 from sqlalchemy.future import select
 
 WAITING_NAME, WAITING_PRICE, WAITING_DAYS = range(3)
@@ -19,7 +21,7 @@ WAITING_NAME, WAITING_PRICE, WAITING_DAYS = range(3)
 
 async def start_new_plan(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Inicia o wizard de criação de novo plano."""
-    bot_id = int(update.callback_query.data.split("_")[2])
+    bot_id = context.args[0]
     context.user_data["plan_bot_id"] = bot_id
 
     text = TextUtils.pad_message(
@@ -28,7 +30,7 @@ async def start_new_plan(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "<i>Ex: VIP Mensal, Grupo Gold, Acesso Total</i>"
     )
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data=f"manage_plans_{bot_id}")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_PLANS(bot_id))]]
     )
 
     await ChatManager.render_view(update, context, text, kb)
@@ -50,7 +52,7 @@ async def receive_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "<i>Ex: 29.90</i>"
     )
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data=f"manage_plans_{bot_id}")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_PLANS(bot_id))]]
     )
     await ChatManager.render_view(update, context, text, kb)
     return WAITING_PRICE
@@ -73,7 +75,7 @@ async def receive_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
             [
                 [
                     InlineKeyboardButton(
-                        "🔙 Cancelar", callback_data=f"manage_plans_{bot_id}"
+                        "🔙 Cancelar", callback_data=MANAGE_PLANS(bot_id)
                     )
                 ]
             ]
@@ -88,7 +90,7 @@ async def receive_price(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "💡 <i>Dica: Digite 36500 para Vitalício.</i>"
     )
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data=f"manage_plans_{bot_id}")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_PLANS(bot_id))]]
     )
     await ChatManager.render_view(update, context, text, kb)
     return WAITING_DAYS
@@ -130,9 +132,6 @@ async def receive_days(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cancel_plan(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancela a criação do plano e retorna à lista de planos."""
-    query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
-
     from src.bot.handlers.dashboard import view_plans
 
     await view_plans(update, context)
@@ -140,11 +139,15 @@ async def cancel_plan(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 plan_wizard_handler = ConversationHandler(
-    entry_points=[CallbackQueryHandler(start_new_plan, pattern="^new_plan_")],
+    entry_points=[CallbackRouter((NEW_PLAN, start_new_plan))],
     states={
         WAITING_NAME: [MessageHandler(filters.TEXT, receive_name)],
         WAITING_PRICE: [MessageHandler(filters.TEXT, receive_price)],
         WAITING_DAYS: [MessageHandler(filters.TEXT, receive_days)],
+        **wizard_timeout("plan_bot_id", "plan_name", "plan_price"),
     },
-    fallbacks=[CallbackQueryHandler(cancel_plan, pattern="^manage_plans_")],
+    fallbacks=[CallbackRouter((MANAGE_PLANS, cancel_plan))],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="plan_wizard",
+    persistent=True,
 )
@@ -2,7 +2,6 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
-    CallbackQueryHandler,
     MessageHandler,
     CommandHandler,
     filters,
@@ -16,6 +15,9 @@ from src.utils.formatters import TextUtils
 from src.bot.keyboards.dashboard import bot_management_keyboard
 from src.bot.handlers.start import start_command
 from src.services.bot_service import BotService
+from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
+from src.bot.callbacks import CallbackRouter, MANAGE_BOT, EDIT_DESCRIPTION, EDIT_WELCOME
 
 WAITING_DESCRIPTION = 1
 WAITING_WELCOME = 2
@@ -23,8 +25,7 @@ WAITING_WELCOME = 2
 
 async def start_edit_description(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Inicia a edição da descrição/bio do bot no Telegram."""
-    query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
+    bot_id = context.args[0]
     context.user_data["settings_bot_id"] = bot_id
 
     async with AsyncSessionLocal() as session:
@@ -42,7 +43,7 @@ async def start_edit_description(update: Update, context: ContextTypes.DEFAULT_T
     )
 
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data=f"manage_bot_{bot_id}")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_BOT(bot_id))]]
     )
     await ChatManager.render_view(update, context, text, kb)
     return WAITING_DESCRIPTION
@@ -95,8 +96,7 @@ async def receive_description(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 async def start_edit_welcome(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Inicia a edição da mensagem de boas-vindas do bot."""
-    query = update.callback_query
-    bot_id = int(query.data.split("_")[2])
+    bot_id = context.args[0]
     context.user_data["settings_bot_id"] = bot_id
 
     text = TextUtils.pad_message(
@@ -107,7 +107,7 @@ async def start_edit_welcome(update: Update, context: ContextTypes.DEFAULT_TYPE)
     )
 
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data=f"manage_bot_{bot_id}")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=MANAGE_BOT(bot_id))]]
     )
     await ChatManager.render_view(update, context, text, kb)
     return WAITING_WELCOME
@@ -175,7 +175,7 @@ async def receive_welcome(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def cancel_settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancela a edição de configurações do bot."""
-    bot_id = int(update.callback_query.data.split("_")[2])
+    bot_id = context.args[0]
     async with AsyncSessionLocal() as session:
         result = await session.execute(select(Bot).filter(Bot.id == bot_id))
         bot = result.scalars().first()
@@ -196,8 +196,10 @@ async def restart_via_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 
 settings_wizard_handler = ConversationHandler(
     entry_points=[
-        CallbackQueryHandler(start_edit_description, pattern="^edit_desc_"),
-        CallbackQueryHandler(start_edit_welcome, pattern="^edit_welcome_"),
+        CallbackRouter(
+            (EDIT_DESCRIPTION, start_edit_description),
+            (EDIT_WELCOME, start_edit_welcome),
+        )
     ],
     states={
         WAITING_DESCRIPTION: [
@@ -209,9 +211,13 @@ settings_wizard_handler = ConversationHandler(
                 receive_welcome,
             )
         ],
+        **wizard_timeout("settings_bot_id", "settings_bot_token"),
     },
     fallbacks=[
-        CallbackQueryHandler(cancel_settings, pattern="^manage_bot_"),
+        CallbackRouter((MANAGE_BOT, cancel_settings)),
         CommandHandler("start", restart_via_command),
     ],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="settings_wizard",
+    persistent=True,
 )
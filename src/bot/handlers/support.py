@@ -1,8 +1,9 @@
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.ext import ContextTypes
 
 from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
+from src.bot.callbacks import BACK_TO_MAIN, SUPPORT
 
 
 async def view_support(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -24,11 +25,11 @@ async def view_support(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [
             [InlineKeyboardButton("📚 Ler Tutoriais / Docs", url=tutorial_url)],
             [InlineKeyboardButton("👨‍💻 Falar com Suporte Humano", url=suporte_url)],
-            [InlineKeyboardButton("🔙 Voltar ao Menu", callback_data="back_to_main")],
+            [InlineKeyboardButton("🔙 Voltar ao Menu", callback_data=BACK_TO_MAIN())],
         ]
     )
 
     await ChatManager.render_view(update, context, text, kb)
 
 
-support_handler = CallbackQueryHandler(view_support, pattern="^support_view$")
+support_routes = [(SUPPORT, view_support)]
@@ -3,15 +3,25 @@ from telegram.ext import (
     ContextTypes,
     ConversationHandler,
     MessageHandler,
-    CallbackQueryHandler,
     filters,
 )
 
 from src.utils.chat_manager import ChatManager
 from src.utils.formatters import TextUtils
+from src.utils.rate_limit import MAIN_BOT, outbound
 from src.utils.ui import UI
 from src.services.finance_service import FinanceService
 from src.core.config import settings
+from src.bot.state_sweeper import wizard_timeout
+from src.bot.callbacks import (
+    CallbackRouter,
+    BACK_TO_MAIN,
+    WALLET,
+    WALLET_EXTRACT,
+    WITHDRAW,
+    ADMIN_PAY,
+    ADMIN_REJECT,
+)
 
 WAITING_AMOUNT = 1
 WAITING_PIX = 2
@@ -38,15 +48,15 @@ async def view_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [
             [
                 InlineKeyboardButton(
-                    "📜 Extrato Detalhado", callback_data="wallet_extract"
+                    "📜 Extrato Detalhado", callback_data=WALLET_EXTRACT()
                 )
             ],
             [
                 InlineKeyboardButton(
-                    "💸 Solicitar Saque", callback_data="wallet_withdraw"
+                    "💸 Solicitar Saque", callback_data=WITHDRAW()
                 )
             ],
-            [InlineKeyboardButton("� Menu Principal", callback_data="back_to_main")],
+            [InlineKeyboardButton("� Menu Principal", callback_data=BACK_TO_MAIN())],
         ]
     )
 
@@ -72,7 +82,7 @@ async def view_extract(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     text = TextUtils.pad_message("\n".join(msg_lines))
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Voltar", callback_data="wallet_view")]]
+        [[InlineKeyboardButton("🔙 Voltar", callback_data=WALLET())]]
     )
     await ChatManager.render_view(update, context, text, kb)
 
@@ -98,7 +108,7 @@ async def start_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Digite o valor (ex: 150.00):"
     )
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data="wallet_view")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=WALLET())]]
     )
     await ChatManager.render_view(update, context, text, kb)
     return WAITING_AMOUNT
@@ -125,7 +135,7 @@ async def receive_amount(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "Digite um valor menor ou igual ao seu saldo:"
         )
         kb = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("🔙 Cancelar", callback_data="wallet_view")]]
+            [[InlineKeyboardButton("🔙 Cancelar", callback_data=WALLET())]]
         )
         await ChatManager.render_view(update, context, TextUtils.pad_message(msg), kb)
         return WAITING_AMOUNT
@@ -148,7 +158,7 @@ async def receive_amount(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Digite sua chave PIX (CPF, Email, etc):"
     )
     kb = InlineKeyboardMarkup(
-        [[InlineKeyboardButton("🔙 Cancelar", callback_data="wallet_view")]]
+        [[InlineKeyboardButton("🔙 Cancelar", callback_data=WALLET())]]
     )
     await ChatManager.render_view(update, context, text, kb)
     return WAITING_PIX
@@ -184,22 +194,26 @@ async def receive_pix(update: Update, context: ContextTypes.DEFAULT_TYPE):
             [
                 [
                     InlineKeyboardButton(
-                        "✅ Confirmar Pagamento",
-                        callback_data=f"admin_pay_{withdrawal.id}",
+                        "✅ Aprovar e Pagar",
+                        callback_data=ADMIN_PAY(withdrawal.id),
                     ),
                     InlineKeyboardButton(
                         "❌ Rejeitar/Estornar",
-                        callback_data=f"admin_reject_{withdrawal.id}",
+                        callback_data=ADMIN_REJECT(withdrawal.id),
                     ),
                 ]
             ]
         )
 
-        await context.bot.send_message(
-            chat_id=settings.ADMIN_WITHDRAWAL_GROUP_ID,
-            text=admin_text,
-            reply_markup=admin_kb,
-            parse_mode="HTML",
+        await outbound.send(
+            MAIN_BOT,
+            settings.ADMIN_WITHDRAWAL_GROUP_ID,
+            lambda: context.bot.send_message(
+                chat_id=settings.ADMIN_WITHDRAWAL_GROUP_ID,
+                text=admin_text,
+                reply_markup=admin_kb,
+                parse_mode="HTML",
+            ),
         )
 
         text = TextUtils.pad_message(
@@ -209,7 +223,7 @@ async def receive_pix(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "O pagamento será processado em até <b>3 dias úteis</b>."
         )
         kb = InlineKeyboardMarkup(
-            [[InlineKeyboardButton("🔙 Ir para Carteira", callback_data="wallet_view")]]
+            [[InlineKeyboardButton("🔙 Ir para Carteira", callback_data=WALLET())]]
         )
         await ChatManager.render_view(update, context, text, kb)
         return ConversationHandler.END
@@ -228,18 +242,21 @@ async def cancel_withdrawal(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 withdrawal_wizard = ConversationHandler(
-    entry_points=[CallbackQueryHandler(start_withdrawal, pattern="^wallet_withdraw$")],
+    entry_points=[CallbackRouter((WITHDRAW, start_withdrawal))],
     states={
         WAITING_AMOUNT: [
             MessageHandler(filters.TEXT & ~filters.COMMAND, receive_amount)
         ],
         WAITING_PIX: [MessageHandler(filters.TEXT & ~filters.COMMAND, receive_pix)],
+        **wizard_timeout("withdraw_gross"),
     },
-    fallbacks=[CallbackQueryHandler(cancel_withdrawal, pattern="^wallet_view$")],
+    fallbacks=[CallbackRouter((WALLET, cancel_withdrawal))],
+    conversation_timeout=settings.CONVERSATION_TIMEOUT_SECONDS,
+    name="withdrawal_wizard",
+    persistent=True,
 )
 
-wallet_handlers = [
-    CallbackQueryHandler(view_wallet, pattern="^wallet_view$"),
-    CallbackQueryHandler(view_extract, pattern="^wallet_extract$"),
-    withdrawal_wizard,
+wallet_routes = [
+    (WALLET, view_wallet),
+    (WALLET_EXTRACT, view_extract),
 ]
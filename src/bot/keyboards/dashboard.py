@@ -1,19 +1,38 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from src.utils.formatters import TextUtils
+from src.bot.callbacks import (
+    BACK_TO_MAIN,
+    MY_BOTS,
+    MANAGE_BOT,
+    TOGGLE_BOT,
+    DELETE_BOT,
+    CHANGE_GROUP,
+    EDIT_DESCRIPTION,
+    EDIT_WELCOME,
+    EDIT_FOLLOWUPS,
+    MANAGE_PLANS,
+    NEW_PLAN,
+    OPEN_PLAN,
+    EDIT_PLAN,
+    TOGGLE_PLAN,
+    DELETE_PLAN,
+    NEW_CAMPAIGN,
+)
 
 
 def my_bots_list_keyboard(bots):
     """Gera teclado com a lista de bots do usuário."""
     keyboard = []
     for bot in bots:
+        icon = "🔒" if bot.token_invalid_at else "🤖"  # Token rejeitado
         keyboard.append(
             [
                 InlineKeyboardButton(
-                    f"🤖 {bot.name}", callback_data=f"manage_bot_{bot.id}"
+                    f"{icon} {bot.name}", callback_data=MANAGE_BOT(bot.id)
                 )
             ]
         )
-    keyboard.append([InlineKeyboardButton("🔙 Voltar", callback_data="back_to_main")])
+    keyboard.append([InlineKeyboardButton("🔙 Voltar", callback_data=BACK_TO_MAIN())])
     return InlineKeyboardMarkup(keyboard)
 
 
@@ -26,36 +45,39 @@ def bot_management_keyboard(bot):
         [
             [
                 InlineKeyboardButton(
-                    "📝 Editar Descrição", callback_data=f"edit_desc_{bot.id}"
+                    "📝 Editar Descrição", callback_data=EDIT_DESCRIPTION(bot.id)
                 ),
                 InlineKeyboardButton(
-                    "👋 Boas-Vindas", callback_data=f"edit_welcome_{bot.id}"
+                    "👋 Boas-Vindas", callback_data=EDIT_WELCOME(bot.id)
                 ),
             ],
             [
                 InlineKeyboardButton(
-                    "📢 Follow-ups", callback_data=f"edit_followups_{bot.id}"
+                    "📢 Follow-ups", callback_data=EDIT_FOLLOWUPS(bot.id)
                 ),
                 InlineKeyboardButton(
-                    "💎 Gerenciar Planos", callback_data=f"manage_plans_{bot.id}"
+                    "💎 Gerenciar Planos", callback_data=MANAGE_PLANS(bot.id)
                 ),
             ],
             [
                 InlineKeyboardButton(
-                    "🔄 Trocar Grupo Vinculado", callback_data=f"change_group_{bot.id}"
-                )
+                    "📣 Enviar Campanha", callback_data=NEW_CAMPAIGN(bot.id)
+                ),
+                InlineKeyboardButton(
+                    "🔄 Trocar Grupo", callback_data=CHANGE_GROUP(bot.id)
+                ),
             ],
             [
                 InlineKeyboardButton(
-                    f"{status_icon} {status_text}", callback_data=f"toggle_bot_{bot.id}"
+                    f"{status_icon} {status_text}", callback_data=TOGGLE_BOT(bot.id)
                 ),
                 InlineKeyboardButton(
-                    "🗑 Excluir Bot", callback_data=f"delete_bot_{bot.id}"
+                    "🗑 Excluir Bot", callback_data=DELETE_BOT(bot.id)
                 ),
             ],
             [
                 InlineKeyboardButton(
-                    "🔙 Voltar para Lista", callback_data="my_bots_list"
+                    "🔙 Voltar para Lista", callback_data=MY_BOTS()
                 )
             ],
         ]
@@ -69,18 +91,18 @@ def plans_list_keyboard(plans, bot_id):
         status = "✅" if plan.is_active else "❌"
         btn_text = f"{status} {plan.name} - {TextUtils.currency(plan.price)}"
         keyboard.append(
-            [InlineKeyboardButton(btn_text, callback_data=f"open_plan_{plan.id}")]
+            [InlineKeyboardButton(btn_text, callback_data=OPEN_PLAN(plan.id))]
         )
 
     keyboard.append(
         [
             InlineKeyboardButton(
-                "➕ Criar Novo Plano", callback_data=f"new_plan_{bot_id}"
+                "➕ Criar Novo Plano", callback_data=NEW_PLAN(bot_id)
             )
         ]
     )
     keyboard.append(
-        [InlineKeyboardButton("🔙 Voltar", callback_data=f"manage_bot_{bot_id}")]
+        [InlineKeyboardButton("🔙 Voltar", callback_data=MANAGE_BOT(bot_id))]
     )
     return InlineKeyboardMarkup(keyboard)
 
@@ -93,26 +115,26 @@ def single_plan_keyboard(plan):
         [
             [
                 InlineKeyboardButton(
-                    "✏️ Nome", callback_data=f"edit_plan_name_{plan.id}"
+                    "✏️ Nome", callback_data=EDIT_PLAN("name", plan.id)
                 ),
                 InlineKeyboardButton(
-                    "✏️ Valor", callback_data=f"edit_plan_price_{plan.id}"
+                    "✏️ Valor", callback_data=EDIT_PLAN("price", plan.id)
                 ),
                 InlineKeyboardButton(
-                    "✏️ Dias", callback_data=f"edit_plan_days_{plan.id}"
+                    "✏️ Dias", callback_data=EDIT_PLAN("days", plan.id)
                 ),
             ],
             [
                 InlineKeyboardButton(
-                    status_text, callback_data=f"toggle_plan_{plan.id}"
+                    status_text, callback_data=TOGGLE_PLAN(plan.id)
                 ),
                 InlineKeyboardButton(
-                    "🗑 Apagar", callback_data=f"delete_plan_{plan.id}"
+                    "🗑 Apagar", callback_data=DELETE_PLAN(plan.id)
                 ),
             ],
             [
                 InlineKeyboardButton(
-                    "🔙 Voltar", callback_data=f"manage_plans_{plan.bot_id}"
+                    "🔙 Voltar", callback_data=MANAGE_PLANS(plan.bot_id)
                 )
             ],
         ]
@@ -1,18 +1,20 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.bot.callbacks import NEW_BOT, MY_BOTS, WALLET, SUPPORT
+
 
 def main_menu_keyboard(is_admin: bool = False):
     """Gera o teclado do menu principal da aplicação."""
     keyboard = [
         [
-            InlineKeyboardButton("🚀 Criar Novo Bot", callback_data="wizard_new_bot"),
+            InlineKeyboardButton("🚀 Criar Novo Bot", callback_data=NEW_BOT()),
         ],
         [
-            InlineKeyboardButton("🤖 Meus Bots", callback_data="my_bots_list"),
-            InlineKeyboardButton("💰 Minha Carteira", callback_data="wallet_view"),
+            InlineKeyboardButton("🤖 Meus Bots", callback_data=MY_BOTS()),
+            InlineKeyboardButton("💰 Minha Carteira", callback_data=WALLET()),
         ],
         [
-            InlineKeyboardButton("🆘 Suporte / Ajuda", callback_data="support_view"),
+            InlineKeyboardButton("🆘 Suporte / Ajuda", callback_data=SUPPORT()),
         ],
     ]
 
@@ -0,0 +1,436 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+import telegram
+from sqlalchemy import and_, or_, text
+from sqlalchemy.future import select
+from telegram import TelegramObject, Update
+from telegram.ext import BasePersistence, ConversationHandler, PersistenceInput
+
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal
+from src.database.models import PersistedState
+
+logger = logging.getLogger(__name__)
+
+# ON CONFLICT ... DO UPDATE: mesma sintaxe no Postgres e no SQLite. Só
+# sobrescreve a versão lida por este processo (:version NULL = linha nova);
+# sem linha retornada, outro processo gravou antes
+UPSERT_SQL = text(
+    "INSERT INTO persisted_state (kind, key, data, version, updated_at) "
+    "VALUES (:kind, :key, :data, 1, CURRENT_TIMESTAMP) "
+    "ON CONFLICT (kind, key) DO UPDATE "
+    "SET data = excluded.data, version = persisted_state.version + 1, "
+    "updated_at = excluded.updated_at "
+    "WHERE persisted_state.version = :version "
+    "RETURNING version"
+)
+DELETE_SQL = text(
+    "DELETE FROM persisted_state "
+    "WHERE kind = :kind AND key = :key AND version = :version"
+)
+
+
+def _pack(obj):
+    """
+    Prepara o valor para o JSON sem perder tipos: tuplas e dicts com chaves
+    que não são str (ex: {plan_id: ...}) viram objetos marcados, desfeitos
+    em _decode. Tipos sem representação levantam TypeError já na gravação.
+    """
+    if isinstance(obj, dict):
+        if all(isinstance(key, str) for key in obj):
+            return {key: _pack(value) for key, value in obj.items()}
+        return {"__dict__": [[_pack(key), _pack(value)] for key, value in obj.items()]}
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_pack(item) for item in obj]}
+    if isinstance(obj, list):
+        return [_pack(item) for item in obj]
+    # Objetos do Telegram guardados nos wizards (ex: temp_bot_info)
+    if isinstance(obj, TelegramObject):
+        return {"__telegram__": type(obj).__name__, "data": obj.to_dict()}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    raise TypeError(f"{type(obj).__name__} não é serializável")
+
+
+def _dumps(value) -> str:
+    return json.dumps(_pack(value))
+
+
+class DatabasePersistence(BasePersistence):
+    """
+    Persistência do bot principal no banco: user_data e o estado dos
+    ConversationHandlers sobrevivem a reinícios e deploys.
+
+    O estado é compartilhado entre os processos que atendem o webhook. O
+    PerUserUpdateProcessor chama before_update e after_update em volta de
+    cada update com usuário:
+
+    - before_update relê, numa consulta pela chave primária, o user_data e
+      o estado do usuário em cada ConversationHandler; só o que outro
+      processo gravou (versão diferente da conhecida) substitui a memória;
+    - after_update entrega à persistência o que o update mudou e espera a
+      gravação, para que o próximo update do usuário, em qualquer processo,
+      já o veja.
+
+    Fora dos updates (jobs, timeouts), a Application chama os update_* a
+    cada PERSISTENCE_UPDATE_SECONDS. Cada valor é comparado ao último
+    gravado (hash do JSON) e só o que mudou é gravado; se a gravação falhar,
+    volta para a fila da próxima rodada. Cada gravação confere a versão
+    lida por este processo (compare-and-set): se outro processo gravou
+    antes, o valor dele prevalece e é relido no próximo update.
+
+    Conversas paradas há mais de CONVERSATION_TIMEOUT_SECONDS e user_data
+    sem mudança há mais de USER_DATA_IDLE_SECONDS não são carregados e saem
+    do banco.
+    """
+
+    def __init__(self):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=True, callback_data=False
+            ),
+            update_interval=settings.PERSISTENCE_UPDATE_SECONDS,
+        )
+        self._saved = {}  # (kind, key) -> hash do JSON gravado
+        self._versions = {}  # (kind, key) -> versão da linha lida/gravada
+        self._pending = {}  # (kind, key) -> JSON a gravar, None para apagar
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+        self._open = set()  # (nome, chave) das conversas em andamento
+        self._restored = set()  # (nome, chave) lidas do banco e ainda sem update
+        self._fresh = set()  # user_ids relidos pelo before_update em curso
+        self._app = None
+        self._conversations = None  # nome -> estados do ConversationHandler
+
+    def _decode(self, obj: dict):
+        if "__telegram__" in obj:
+            cls = getattr(telegram, obj["__telegram__"])
+            return cls.de_json(obj["data"], self.bot)
+        if "__tuple__" in obj:
+            return tuple(obj["__tuple__"])
+        if "__dict__" in obj:
+            return {
+                tuple(key) if isinstance(key, list) else key: value
+                for key, value in obj["__dict__"]
+            }
+        return obj
+
+    async def _load(self, kind: str, max_age: int) -> list:
+        """Lê as linhas do tipo; as mais antigas que max_age são apagadas."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(
+                    PersistedState.key,
+                    PersistedState.data,
+                    PersistedState.version,
+                    PersistedState.updated_at,
+                ).where(PersistedState.kind == kind)
+            )
+            rows = result.all()
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        loaded = []
+        for key, data, version, updated_at in rows:
+            if updated_at and updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            self._saved[(kind, key)] = hash(data)
+            self._versions[(kind, key)] = version
+            if updated_at and updated_at < cutoff:
+                self._stage(kind, key, None)
+                continue
+            loaded.append((key, json.loads(data, object_hook=self._decode)))
+
+        if len(loaded) < len(rows):
+            logger.info(
+                f"🧹 {len(rows) - len(loaded)} registros expirados de {kind} descartados"
+            )
+        return loaded
+
+    def _stage(self, kind: str, key: str, value):
+        """Coloca o valor no próximo lote, se mudou desde a última gravação."""
+        data = None if value is None else _dumps(value)
+        saved = self._saved.get((kind, key))
+        if data is None and saved is None and (kind, key) not in self._pending:
+            return
+        if data is not None and saved == hash(data):
+            self._pending.pop((kind, key), None)
+            return
+
+        self._pending[(kind, key)] = data
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._write())
+
+    def _forget(self, item: tuple):
+        """Esquece a versão conhecida: a próxima leitura recarrega a linha."""
+        self._saved.pop(item, None)
+        self._versions.pop(item, None)
+
+    def _reload(self, item: tuple, row) -> tuple:
+        """
+        Confere a linha lida com a versão conhecida.
+
+        Returns:
+            Tupla (mudou, valor); valor None se outro processo apagou a linha
+        """
+        if item in self._pending:
+            # Mudanças locais ainda não gravadas são as mais recentes
+            return False, None
+
+        known = self._versions.get(item)
+        if row is None:
+            if known is None:
+                return False, None
+            self._forget(item)
+            return True, None
+        if row.version == known:
+            return False, None
+
+        self._saved[item] = hash(row.data)
+        self._versions[item] = row.version
+        return True, json.loads(row.data, object_hook=self._decode)
+
+    async def _write(self):
+        """Grava os lotes pendentes, um por transação, até esvaziar a fila."""
+        async with self._lock:
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                written, lost = {}, []
+                try:
+                    async with AsyncSessionLocal() as session:
+                        for (kind, key), data in batch.items():
+                            params = {
+                                "kind": kind,
+                                "key": key,
+                                "version": self._versions.get((kind, key)),
+                            }
+                            if data is not None:
+                                result = await session.execute(
+                                    UPSERT_SQL, {**params, "data": data}
+                                )
+                                version = result.scalar()
+                                ok = version is not None
+                            elif params["version"] is not None:
+                                result = await session.execute(DELETE_SQL, params)
+                                version, ok = None, bool(result.rowcount)
+                            else:
+                                # Nunca chegou ao banco: nada a apagar
+                                version, ok = None, True
+
+                            if ok:
+                                written[(kind, key)] = version
+                            else:
+                                lost.append((kind, key))
+                        await session.commit()
+                except Exception as e:
+                    logger.error(
+                        f"❌ Erro ao gravar estado do bot ({len(batch)} itens): {e}"
+                    )
+                    # Valores que chegaram durante a gravação prevalecem; o
+                    # lote é repetido na próxima rodada
+                    self._pending = {**batch, **self._pending}
+                    return
+
+                for item, version in written.items():
+                    if version is None:
+                        self._forget(item)
+                    else:
+                        self._saved[item] = hash(batch[item])
+                        self._versions[item] = version
+
+                # Outro processo gravou antes: o valor dele prevalece
+                for item in lost:
+                    self._forget(item)
+                if lost:
+                    logger.warning(
+                        f"⚠️ {len(lost)} registros de estado alterados por outro "
+                        "processo; a gravação deste foi descartada"
+                    )
+
+    async def get_user_data(self) -> dict:
+        rows = await self._load("user", settings.USER_DATA_IDLE_SECONDS)
+        return {int(key): data for key, data in rows}
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        # Conversas restauradas não têm o job de timeout: as paradas há mais
+        # tempo que o timeout nem voltam e as demais são encerradas pelo
+        # StateSweeper se o usuário não voltar
+        rows = await self._load(f"conv:{name}", settings.CONVERSATION_TIMEOUT_SECONDS)
+        conversations = {tuple(json.loads(key)): state for key, state in rows}
+        self._open.update((name, key) for key in conversations)
+        self._restored.update((name, key) for key in conversations)
+        return conversations
+
+    async def update_conversation(self, name: str, key: tuple, new_state):
+        # Conversa mexida depois do restore já tem o job de timeout
+        self._restored.discard((name, key))
+        if new_state is None:
+            self._open.discard((name, key))
+        else:
+            self._open.add((name, key))
+        self._stage(f"conv:{name}", json.dumps(list(key)), new_state)
+
+    def busy_users(self) -> set:
+        """Usuários com alguma conversa em andamento (o user_id fecha a chave)."""
+        return {key[-1] for _, key in self._open}
+
+    def restored_conversations(self) -> list:
+        """(nome, chave) das conversas restauradas sem update desde o startup."""
+        return list(self._restored)
+
+    @property
+    def open_conversations(self) -> int:
+        return len(self._open)
+
+    async def update_user_data(self, user_id: int, data: dict):
+        # user_data vazio não ocupa linha
+        self._stage("user", str(user_id), data or None)
+
+    async def drop_user_data(self, user_id: int):
+        self._stage("user", str(user_id), None)
+
+    async def update_chat_data(self, chat_id: int, data: dict):
+        pass
+
+    async def update_bot_data(self, data: dict):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id: int):
+        pass
+
+    async def refresh_user_data(self, user_id: int, user_data: dict):
+        if user_id in self._fresh:
+            # Relido agora há pouco pelo before_update deste update
+            self._fresh.discard(user_id)
+            return
+
+        item = ("user", str(user_id))
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(PersistedState.data, PersistedState.version).where(
+                    PersistedState.kind == item[0], PersistedState.key == item[1]
+                )
+            )
+            row = result.first()
+
+        changed, value = self._reload(item, row)
+        if changed:
+            user_data.clear()
+            user_data.update(value or {})
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict):
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict):
+        pass
+
+    def bind(self, application):
+        """Guarda a Application, de onde vêm user_data e conversas do update."""
+        self._app = application
+
+    def _conversation_states(self) -> dict:
+        """nome -> dict de estados de cada ConversationHandler persistente."""
+        if self._conversations is None:
+            # O initialize da Application troca os dicts: lidos no 1º update
+            self._conversations = {
+                handler.name: handler._conversations
+                for group in self._app.handlers.values()
+                for handler in group
+                if isinstance(handler, ConversationHandler) and handler.persistent
+            }
+        return self._conversations
+
+    async def before_update(self, update: object):
+        """Relê do banco o estado do usuário gravado por outros processos."""
+        if self._app is None or not isinstance(update, Update):
+            return
+        user, chat = update.effective_user, update.effective_chat
+        if user is None:
+            return
+
+        # Chave padrão dos ConversationHandlers (per_chat e per_user)
+        conv_key = (chat.id, user.id) if chat else None
+        conversations = self._conversation_states() if conv_key else {}
+        key = json.dumps(list(conv_key)) if conv_key else None
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(
+                        PersistedState.kind, PersistedState.data, PersistedState.version
+                    ).where(
+                        or_(
+                            and_(
+                                PersistedState.kind == "user",
+                                PersistedState.key == str(user.id),
+                            ),
+                            and_(
+                                PersistedState.kind.in_(
+                                    [f"conv:{name}" for name in conversations]
+                                ),
+                                PersistedState.key == key,
+                            ),
+                        )
+                    )
+                )
+                rows = {row.kind: row for row in result}
+        except Exception as e:
+            # Segue com o estado em memória deste processo
+            logger.error(f"❌ Erro ao reler o estado do usuário {user.id}: {e}")
+            return
+
+        changed, value = self._reload(("user", str(user.id)), rows.get("user"))
+        if changed:
+            user_data = self._app.user_data[user.id]
+            user_data.clear()
+            user_data.update(value or {})
+        self._fresh.add(user.id)
+
+        for name, states in conversations.items():
+            item = (f"conv:{name}", key)
+            changed, state = self._reload(item, rows.get(item[0]))
+            if not changed:
+                continue
+            # Sem marcar para gravação: o valor acabou de vir do banco
+            if state is None:
+                states.data.pop(conv_key, None)
+                self._open.discard((name, conv_key))
+                self._restored.discard((name, conv_key))
+            else:
+                states.update_no_track({conv_key: state})
+                self._open.add((name, conv_key))
+                # Sem job de timeout neste processo até o próximo update dela
+                self._restored.add((name, conv_key))
+
+    async def after_update(self, update: object):
+        """Grava o que o update mudou antes do próximo update do usuário."""
+        if self._app is None or not isinstance(update, Update):
+            return
+        if update.effective_user:
+            self._fresh.discard(update.effective_user.id)
+        try:
+            await self._app.update_persistence()
+            if self._flush_task:
+                # A gravação é compartilhada: não cancela com o update
+                await asyncio.shield(self._flush_task)
+        except Exception as e:
+            logger.error(f"❌ Erro ao gravar o estado do update: {e}")
+
+    async def flush(self):
+        """Grava o que estiver pendente (chamado no shutdown da Application)."""
+        if self._flush_task:
+            await self._flush_task
+        await self._write()
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import Application, ConversationHandler, TypeHandler
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Chaves de rascunho dos wizards no user_data (só valem durante a conversa)
+WIZARD_KEY_PREFIXES = (
+    "temp_bot_",
+    "new_followups",
+    "edit_",
+    "settings_bot_",
+    "plan_",
+    "campaign_",
+    "withdraw_",
+)
+
+
+def wizard_timeout(*keys: str) -> dict:
+    """
+    Estado TIMEOUT de um wizard: quando a conversa expira por
+    conversation_timeout, descarta as chaves de rascunho do próprio wizard.
+    """
+
+    async def discard(update: Update, context):
+        for key in keys:
+            context.user_data.pop(key, None)
+        # O job de timeout não é de nenhum usuário: marca a gravação
+        context.application.mark_data_for_update_persistence(
+            user_ids=update.effective_user.id
+        )
+
+    return {ConversationHandler.TIMEOUT: [TypeHandler(Update, discard)]}
+
+
+class StateSweeper:
+    """
+    Varredura periódica do user_data do bot principal em memória.
+
+    O timeout dos ConversationHandlers encerra wizards parados, mas chaves de
+    rascunho que sobram de wizards concluídos (ou restaurados do banco sem
+    job de timeout) ficariam para sempre. A cada STATE_SWEEP_SECONDS:
+
+    - conversas restauradas do banco cujo usuário está parado há mais de
+      CONVERSATION_TIMEOUT_SECONDS são encerradas (o job de timeout delas não
+      existe);
+    - quem está parado há mais de CONVERSATION_TIMEOUT_SECONDS e sem conversa
+      aberta perde as chaves de rascunho;
+    - quem está parado há mais de USER_DATA_IDLE_SECONDS tem o user_data
+      inteiro descartado (também no banco).
+
+    A última atividade de cada usuário é registrada por um TypeHandler no
+    grupo -1. Roda em todos os processos: cada um limpa a própria memória.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._seen = {}  # user_id -> monotonic da última atividade
+        self._task = None
+        self.evicted_keys = 0
+        self.dropped_users = 0
+        self.ended_conversations = 0
+
+    async def _touch(self, update: Update, context):
+        if update.effective_user:
+            self._seen[update.effective_user.id] = time.monotonic()
+
+    def _end_restored(self, now: float) -> int:
+        """
+        Encerra as conversas restauradas de usuários inativos.
+
+        O PTB não tem API para encerrar uma conversa: a chave sai do dict do
+        ConversationHandler e o update_persistence seguinte grava o fim
+        (update_conversation com None), liberando o usuário para a varredura.
+        """
+        handlers = {
+            handler.name: handler
+            for group in self._app.handlers.values()
+            for handler in group
+            if isinstance(handler, ConversationHandler)
+        }
+        ended = 0
+        for name, key in self._app.persistence.restored_conversations():
+            # Usuários carregados do banco contam a partir do startup
+            idle = now - self._seen.setdefault(key[-1], now)
+            handler = handlers.get(name)
+            if handler is None or idle < settings.CONVERSATION_TIMEOUT_SECONDS:
+                continue
+            conversations = handler._conversations
+            if key in conversations:
+                del conversations[key]
+                ended += 1
+        return ended
+
+    def sweep(self):
+        """Descarta rascunhos e user_data de usuários inativos."""
+        now = time.monotonic()
+        ended = self._end_restored(now)
+        busy = self._app.persistence.busy_users()
+        evicted = dropped = 0
+
+        for user_id, data in list(self._app.user_data.items()):
+            # Usuários carregados do banco contam a partir do startup
+            idle = now - self._seen.setdefault(user_id, now)
+            if user_id in busy or idle < settings.CONVERSATION_TIMEOUT_SECONDS:
+                continue
+
+            if idle >= settings.USER_DATA_IDLE_SECONDS:
+                self._app.drop_user_data(user_id)
+                del self._seen[user_id]
+                dropped += 1
+                continue
+
+            stale = [key for key in data if key.startswith(WIZARD_KEY_PREFIXES)]
+            for key in stale:
+                del data[key]
+            if stale:
+                self._app.mark_data_for_update_persistence(user_ids=user_id)
+                evicted += len(stale)
+
+        # Quem nunca guardou nada só ocupa o registro de atividade
+        for user_id, seen in list(self._seen.items()):
+            if user_id not in self._app.user_data and (
+                now - seen >= settings.USER_DATA_IDLE_SECONDS
+            ):
+                del self._seen[user_id]
+
+        self.evicted_keys += evicted
+        self.dropped_users += dropped
+        self.ended_conversations += ended
+        if evicted or dropped or ended:
+            logger.info(
+                f"🧹 Estado do bot: {ended} conversas restauradas encerradas, "
+                f"{evicted} rascunhos e {dropped} user_data descartados "
+                f"({self.stats()})"
+            )
+
+    def stats(self) -> dict:
+        """Contadores de uso de memória do estado do bot principal."""
+        user_data = self._app.user_data if self._app else {}
+        return {
+            "users": len(user_data),
+            "tracked_users": len(self._seen),
+            "wizard_keys": sum(
+                1
+                for data in user_data.values()
+                for key in data
+                if key.startswith(WIZARD_KEY_PREFIXES)
+            ),
+            "user_data_bytes": sum(
+                len(json.dumps(data, default=str)) for data in user_data.values()
+            ),
+            "open_conversations": (
+                self._app.persistence.open_conversations if self._app else 0
+            ),
+            "evicted_keys": self.evicted_keys,
+            "dropped_users": self.dropped_users,
+            "ended_conversations": self.ended_conversations,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.STATE_SWEEP_SECONDS)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"❌ Erro na varredura do estado do bot: {e}")
+
+    def start(self, application: Application):
+        """Registra o rastreio de atividade e inicia a varredura."""
+        self._app = application
+        application.add_handler(TypeHandler(Update, self._touch), group=-1)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+state_sweeper = StateSweeper()
@@ -0,0 +1,91 @@
+import logging
+from collections import deque
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processa updates do bot principal em paralelo, mas em série por usuário.
+
+    Donos diferentes são atendidos ao mesmo tempo (até max_concurrent_updates
+    updates), enquanto os updates de um mesmo usuário rodam na ordem de
+    chegada, um por vez: os estados dos ConversationHandlers e o user_data
+    continuam consistentes, como no processamento sequencial.
+
+    O PTB ocupa uma vaga do semáforo durante todo o do_process_update. Por
+    isso um usuário nunca espera com uma vaga presa: o primeiro update dele
+    processa e depois drena a fila do usuário; os que chegam nesse meio tempo
+    entram na fila e liberam a vaga na hora. Cada usuário ocupa no máximo uma
+    vaga, e a fila tem no máximo max_backlog updates (o excedente é
+    descartado, ex: cliques repetidos em rajada).
+
+    Com `state` (DatabasePersistence), cada update do usuário relê antes o
+    estado gravado por outros processos e grava o seu ao terminar.
+    """
+
+    __slots__ = ("_pending", "_max_backlog", "_state")
+
+    def __init__(self, max_concurrent_updates: int, max_backlog: int, state=None):
+        super().__init__(max_concurrent_updates)
+        self._pending = {}  # user_id -> deque de (update, coroutine) na fila
+        self._max_backlog = max_backlog
+        self._state = state
+
+    @staticmethod
+    def _key(update: object):
+        if isinstance(update, Update):
+            if update.effective_user:
+                return update.effective_user.id
+            if update.effective_chat:
+                return update.effective_chat.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine):
+        key = self._key(update)
+        if key is None:
+            await coroutine
+            return
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Já há um update do usuário em execução: ele processa este depois
+            if len(pending) >= self._max_backlog:
+                coroutine.close()
+                logger.warning(f"⚠️ Fila do usuário {key} cheia: update descartado.")
+                return
+            pending.append((update, coroutine))
+            return
+
+        pending = self._pending[key] = deque()
+        try:
+            while True:
+                try:
+                    if self._state:
+                        await self._state.before_update(update)
+                    await coroutine
+                except Exception as e:
+                    # Um update com erro não trava os seguintes do usuário
+                    logger.error(f"❌ Erro ao processar update do usuário {key}: {e}")
+                finally:
+                    # No-op se já rodou; evita a corrotina nunca aguardada
+                    coroutine.close()
+                if self._state:
+                    await self._state.after_update(update)
+                if not pending:
+                    break
+                update, coroutine = pending.popleft()
+        finally:
+            del self._pending[key]
+            # Só sobra algo se a drenagem foi cancelada (encerramento)
+            for _, leftover in pending:
+                leftover.close()
+
+    async def initialize(self):
+        """Nada a preparar."""
+
+    async def shutdown(self):
+        """Nada a liberar."""
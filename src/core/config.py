@@ -8,8 +8,31 @@ class Settings(BaseSettings):
     ADMIN_USER_IDS: str
     WEBHOOK_URL: str
     PORT: int = 8080
+    MAIN_BOT_CONCURRENT_UPDATES: int = 64  # Updates do bot principal em paralelo
+    MAIN_BOT_USER_BACKLOG: int = 20  # Updates de um usuário aguardando na fila
+    PERSISTENCE_UPDATE_SECONDS: float = 5.0  # Gravação do estado do bot principal
+    CONVERSATION_TIMEOUT_SECONDS: int = 1800  # Wizard parado é encerrado
+    USER_DATA_IDLE_SECONDS: int = 172800  # user_data de quem sumiu é descartado
+    STATE_SWEEP_SECONDS: int = 300  # Varredura do user_data em memória
 
     DATABASE_URL: str
+    DATABASE_READ_URL: str = ""  # Réplica somente leitura (opcional)
+    READ_YOUR_WRITES_SECONDS: float = 10.0
+
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # Segundos
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: int = 5  # Conexões abertas no startup
+    DB_PGBOUNCER: bool = False  # Desliga cache de prepared statements
+
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Espera pelo lock de escrita do SQLite
+
+    # LISTEN exige conexão direta (sem pgbouncer em modo transaction)
+    DATABASE_LISTEN_URL: str = ""
+    LEADER_CHECK_SECONDS: float = 5.0  # Intervalo da eleição de líder
+    CACHE_TTL_SECONDS: int = 3600
 
     GGPIX_API_KEY: str
     GGPIX_WEBHOOK_SECRET: str
@@ -19,6 +42,54 @@ class Settings(BaseSettings):
 
     MIN_WITHDRAWAL: float = 50.00
 
+    PAYOUT_BATCH_SIZE: int = 100
+    PAYOUT_CONCURRENCY: int = 10
+    PAYOUT_MAX_ATTEMPTS: int = 5
+    PAYOUT_STALE_MINUTES: int = 10
+
+    PARTITION_MONTHS_AHEAD: int = 3
+    LEAD_ARCHIVE_STALE_DAYS: int = 90
+    LEAD_ARCHIVE_CONVERTED_DAYS: int = 30
+    LEDGER_CLOSE_AFTER_DAYS: int = 60
+    ARCHIVE_BATCH_SIZE: int = 5000
+
+    BOT_DELETE_CHUNK_SIZE: int = 5000
+
+    JOB_CHUNK_SIZE: int = 500  # Linhas por bloco nos jobs agendados
+
+    # Sequência de follow-up: espera antes de cada passo, em minutos (o
+    # primeiro conta da última interação, os demais do passo anterior)
+    FOLLOWUP_STEP_DELAYS_MINUTES: str = "30,360,1440"
+    FOLLOWUP_RETRY_MINUTES: int = 5  # Espera após a 1ª falha (dobra a cada falha)
+    FOLLOWUP_RETRY_MAX_MINUTES: int = 360  # Teto da espera entre tentativas
+    FOLLOWUP_MAX_ATTEMPTS: int = 5  # Falhas seguidas antes de desistir do lead
+    FOLLOWUP_HORIZON_SECONDS: int = 600  # Janela carregada na timing wheel
+    FOLLOWUP_REFILL_SECONDS: int = 30  # Frequência da leitura do índice
+    FOLLOWUP_WHEEL_CAPACITY: int = 50000  # Máximo de leads em memória
+    FOLLOWUP_CLAIM_LEASE_SECONDS: int = 900  # Reserva de um lead durante o envio
+    REMARKETING_MAX_ATTEMPTS: int = 3  # Falhas seguidas antes de pular a janela de 24h
+
+    EXPIRY_HEAP_SIZE: int = 1000  # Próximos vencimentos mantidos em memória
+    EXPIRY_REFRESH_SECONDS: int = 300  # Releitura do heap de vencimentos
+    EXPIRY_CLAIM_LEASE_SECONDS: int = 300  # Reserva de uma remoção em andamento
+    EXPIRY_RETRY_MINUTES: int = 5  # Espera após a 1ª falha de remoção (dobra)
+    EXPIRY_RETRY_MAX_MINUTES: int = 360  # Teto da espera entre tentativas
+    TELEGRAM_BOT_RATE: float = 25.0  # Mensagens/s por token (limite ~30)
+    TELEGRAM_CHAT_RATE: float = 1.0  # Mensagens/s por chat
+    TELEGRAM_CHAT_BURST: int = 3  # Mensagens seguidas no mesmo chat
+    TELEGRAM_BOT_CONCURRENCY: int = 20  # Teto de envios simultâneos por bot
+    TELEGRAM_MAX_RETRIES: int = 3  # Repetições após RetryAfter
+    TELEGRAM_BOT_DOWN_SECONDS: int = 1800  # Pausa de um bot com token rejeitado
+    TOKEN_PROBE_SECONDS: int = 900  # Teste dos tokens de bots em quarentena
+    SUPPRESSION_CACHE_SECONDS: int = 300  # Validade da lista de bloqueios em memória
+
+    CAMPAIGN_CHUNK_SIZE: int = 100  # Destinatários por lote (checkpoint)
+    CAMPAIGN_REPORT_SECONDS: int = 5  # Edição do contador de progresso
+    CAMPAIGN_POLL_SECONDS: int = 10  # Busca de campanhas novas ou retomadas
+
+    JOB_RUNS_RETENTION_DAYS: int = 30  # Histórico de execuções em job_runs
+    JOB_RUNS_ENGINE_WINDOW_SECONDS: int = 300  # Lotes dos motores somados por registro
+
     FEE_IN_PLATFORM: float = 0.03
     FEE_IN_PROFIT: float = 0.05
     FEE_IN_MIN_FIXED: float = 0.77
@@ -30,13 +101,33 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
 
+    @staticmethod
+    def _to_async_url(url: str) -> str:
+        """
+        Converte a URL do banco para o driver assíncrono do SQLAlchemy:
+        asyncpg para Postgres e aiosqlite para SQLite (instalações de um nó
+        só e benchmarks locais).
+        """
+        if url and url.startswith("postgresql://"):
+            return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        if url and url.startswith("sqlite://"):
+            return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return url
+
+    @property
+    def followup_step_delays(self) -> list:
+        """Esperas da sequência de follow-up, em minutos."""
+        return [int(m) for m in self.FOLLOWUP_STEP_DELAYS_MINUTES.split(",") if m.strip()]
+
     @property
     def async_database_url(self) -> str:
-        """Converte a URL do banco para o driver asyncpg do SQLAlchemy."""
-        url = self.DATABASE_URL
-        if url and "postgresql://" in url and "postgresql+asyncpg" not in url:
-            return url.replace("postgresql://", "postgresql+asyncpg://")
-        return url
+        """URL assíncrona do banco principal."""
+        return self._to_async_url(self.DATABASE_URL)
+
+    @property
+    def async_read_database_url(self) -> str:
+        """URL assíncrona da réplica de leitura, ou vazio se não configurada."""
+        return self._to_async_url(self.DATABASE_READ_URL)
 
 
 settings = Settings()
@@ -1,14 +1,138 @@
+import asyncio
+import time
+import uuid
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from src.core.config import settings
 
 
-engine = create_async_engine(settings.async_database_url, echo=False)
+# now() no SQLite, no mesmo formato em que o SQLAlchemy grava DateTime
+# ("YYYY-MM-DD HH:MM:SS.ffffff"). O CURRENT_TIMESTAMP padrão não tem
+# microssegundos, o que quebra comparações com valores vindos do ORM.
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    Ajusta cada conexão SQLite para uso concorrente: WAL permite leituras
+    simultâneas a uma escrita, e o busy_timeout faz escritas concorrentes
+    aguardarem o lock em vez de falharem com "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _create_sqlite_engine(url):
+    """Cria o engine SQLite (aiosqlite) em modo WAL."""
+    options = {"echo": False}
+    if url.database not in (None, "", ":memory:"):
+        # Banco em memória usa StaticPool, que não aceita opções de tamanho
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    sqlite_engine = create_async_engine(url, **options)
+    event.listen(sqlite_engine.sync_engine, "connect", _configure_sqlite)
+    return sqlite_engine
+
+
+def _create_engine(url: str):
+    """
+    Cria o engine assíncrono com o pool configurado em Settings.
+
+    No modo pgbouncer (pool em modo transaction) os prepared statements não
+    podem ser reaproveitados entre transações: os caches do asyncpg e do
+    SQLAlchemy são desligados e cada statement recebe um nome único.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return _create_sqlite_engine(url)
+
+    options = {
+        "echo": False,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if settings.DB_PGBOUNCER and url.drivername == "postgresql+asyncpg":
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    return create_async_engine(url, **options)
+
+
+def direct_dsn() -> str:
+    """
+    DSN do Postgres para conexões asyncpg dedicadas (LISTEN, advisory locks).
+
+    Estado de sessão não sobrevive ao pgbouncer em modo transaction, então
+    DATABASE_LISTEN_URL pode apontar para uma conexão direta ao banco.
+    """
+    url = make_url(settings.DATABASE_LISTEN_URL or settings.async_database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def warm_up_pool(target_engine, size: int = None):
+    """
+    Abre conexões do pool antecipadamente (chamado no lifespan), para que as
+    primeiras requisições após o deploy não paguem o custo de conexão.
+    """
+    size = min(size or settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE)
+    if size <= 0:
+        return
+
+    connections = await asyncio.gather(
+        *[target_engine.connect() for _ in range(size)]
+    )
+    try:
+        await asyncio.gather(
+            *[conn.execute(text("SELECT 1")) for conn in connections]
+        )
+    finally:
+        # Devolve ao pool, que mantém as conexões abertas
+        await asyncio.gather(*[conn.close() for conn in connections])
+
+
+engine = _create_engine(settings.async_database_url)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Réplica de leitura opcional; sem ela, leituras usam o banco principal
+if settings.async_read_database_url:
+    read_engine = _create_engine(settings.async_read_database_url)
+else:
+    read_engine = engine
+
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Chave (ex: ("user", 123)) -> instante do último commit que a afetou, neste
+# processo ou em outro worker (marcas recebidas pelo InvalidationBus)
+_recent_writes = {}
+
+# Publicadores das marcas de escrita para os demais processos (ver on_write)
+_write_publishers = []
+
+# True enquanto as marcas de escrita chegam de todos os workers
+_writes_shared = False
+
 
 class Base(DeclarativeBase):
     """Classe base para modelos SQLAlchemy."""
@@ -20,3 +144,77 @@ async def get_db():
     """Fornece uma sessão de banco de dados assíncrona."""
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def stream_chunks(stmt, chunk_size: int):
+    """
+    Itera o resultado de um select em blocos de até chunk_size linhas.
+
+    Usa cursor no servidor: a consulta roda uma única vez e a memória não
+    cresce com o tamanho do resultado. Escritas feitas durante a iteração
+    devem usar outra sessão.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+        async for chunk in result.partitions():
+            yield chunk
+
+
+def on_write(publisher):
+    """Inscreve publisher(keys), chamado a cada mark_write deste processo."""
+    _write_publishers.append(publisher)
+
+
+def set_writes_shared(shared: bool):
+    """Indica se as marcas de escrita dos outros workers estão chegando."""
+    global _writes_shared
+    _writes_shared = shared
+
+
+def mark_write(*keys, broadcast: bool = True):
+    """
+    Registra que as chaves acabaram de receber escrita no banco principal.
+
+    Chamado automaticamente após o commit de sessões do ORM (ver models.py).
+    Escritas fora do ORM (update()/delete() em lote, SQL direto) devem
+    chamar mark_write após o commit. A marca é repassada aos publicadores
+    (InvalidationBus) para valer também nos outros workers.
+    """
+    if not keys:
+        return
+
+    now = time.monotonic()
+    for key in keys:
+        _recent_writes[key] = now
+
+    if broadcast:
+        for publisher in _write_publishers:
+            publisher(keys)
+
+    # Limpeza preguiçosa das chaves cuja janela já expirou
+    if len(_recent_writes) > 10000:
+        cutoff = now - settings.READ_YOUR_WRITES_SECONDS
+        for key, written_at in list(_recent_writes.items()):
+            if written_at < cutoff:
+                del _recent_writes[key]
+
+
+def read_session(*keys) -> AsyncSession:
+    """
+    Abre uma sessão para consultas somente leitura (extrato, dashboards).
+
+    Usa a réplica, exceto se alguma das chaves teve escrita recente
+    (read-your-writes): nesse caso lê do principal para não mostrar dados
+    anteriores ao commit do próprio usuário.
+
+    As marcas de escrita de outros workers chegam pelo InvalidationBus;
+    enquanto ele está desconectado não há como saber o que os outros
+    gravaram e as leituras com chaves vão para o principal.
+    """
+    if read_engine is not engine:
+        if keys and not _writes_shared:
+            return AsyncSessionLocal()
+        cutoff = time.monotonic() - settings.READ_YOUR_WRITES_SECONDS
+        if not any(_recent_writes.get(key, float("-inf")) > cutoff for key in keys):
+            return ReadSessionLocal()
+    return AsyncSessionLocal()
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from src.core.config import settings
+from src.database.base import direct_dsn, mark_write, on_write, set_writes_shared
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Marcas de read-your-writes entre workers: "rw_<tipo>:<id>" (ver mark_write)
+WRITE_PREFIX = "rw_"
+NOTIFY_SQL = "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload"
+
+# Trigger que publica "<tabela>:<id>" a cada escrita em bots/plans.
+# Para planos o id publicado é o bot_id (o cache é a vitrine do bot).
+# NOTIFY é transacional: só é entregue após o commit.
+TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+    DECLARE
+        rec RECORD;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN rec := OLD; ELSE rec := NEW; END IF;
+
+        IF TG_TABLE_NAME = 'plans' THEN
+            PERFORM pg_notify('{CHANNEL}', 'plans:' || rec.bot_id);
+            IF TG_OP = 'UPDATE' AND OLD.bot_id IS DISTINCT FROM NEW.bot_id THEN
+                PERFORM pg_notify('{CHANNEL}', 'plans:' || OLD.bot_id);
+            END IF;
+        ELSE
+            PERFORM pg_notify('{CHANNEL}', TG_TABLE_NAME || ':' || rec.id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS bots_cache_invalidation ON bots",
+    "CREATE TRIGGER bots_cache_invalidation AFTER INSERT OR UPDATE OR DELETE "
+    "ON bots FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation()",
+    "DROP TRIGGER IF EXISTS plans_cache_invalidation ON plans",
+    "CREATE TRIGGER plans_cache_invalidation AFTER INSERT OR UPDATE OR DELETE "
+    "ON plans FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidation()",
+]
+
+_caches = []
+_handlers = {}
+_task = None
+_connection = None
+_publish_lock = asyncio.Lock()
+_publishing = set()
+
+
+def ensure_invalidation_triggers(connection):
+    """Cria (ou recria) os triggers de invalidação. Somente Postgres."""
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in TRIGGER_DDL:
+        connection.execute(text(statement))
+
+
+class InvalidationBus:
+    """
+    Invalida caches em memória de todos os workers via LISTEN/NOTIFY.
+
+    Cada processo mantém uma conexão dedicada escutando o canal; ao receber
+    "<tabela>:<id>" chama os handlers inscritos para a tabela. Enquanto a
+    conexão não está ativa os caches ficam desligados (sem hits).
+
+    A mesma conexão publica as marcas de escrita deste processo (mark_write),
+    para que o read-your-writes de read_session valha entre workers.
+    """
+
+    @staticmethod
+    def register(cache):
+        """Registra um TTLCache controlado pelo barramento."""
+        _caches.append(cache)
+
+    @staticmethod
+    def subscribe(table: str, handler):
+        """Inscreve handler(id) para escritas na tabela."""
+        _handlers.setdefault(table, []).append(handler)
+
+    @staticmethod
+    def _set_caches_enabled(enabled: bool):
+        for cache in _caches:
+            # Pode ter perdido notificações enquanto esteve desconectado
+            cache.clear()
+            cache.enabled = enabled
+
+    @staticmethod
+    def _on_notify(connection, pid, channel, payload):
+        """Callback do asyncpg para cada NOTIFY recebido."""
+        table, _, raw_id = payload.partition(":")
+        try:
+            record_id = int(raw_id)
+        except ValueError:
+            return
+
+        for handler in _handlers.get(table, []):
+            try:
+                handler(record_id)
+            except Exception as e:
+                logger.error(f"❌ Erro ao invalidar cache ({payload}): {e}")
+
+    @staticmethod
+    def _publish_writes(keys):
+        """Repassa as marcas de escrita aos outros workers (sem bloquear)."""
+        payloads = [
+            f"{WRITE_PREFIX}{kind}:{key_id}"
+            for kind, key_id in keys
+            if isinstance(key_id, int)
+        ]
+        if not payloads or _connection is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task = loop.create_task(InvalidationBus._notify(payloads))
+        _publishing.add(task)
+        task.add_done_callback(_publishing.discard)
+
+    @staticmethod
+    async def _notify(payloads: list):
+        connection = _connection
+        if connection is None or connection.is_closed():
+            return
+        try:
+            # Uma operação por vez na conexão asyncpg
+            async with _publish_lock:
+                await connection.execute(NOTIFY_SQL, CHANNEL, payloads)
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao publicar marcas de escrita: {e}")
+
+    @staticmethod
+    async def _listen_forever():
+        """Mantém a conexão LISTEN, reconectando com backoff se cair."""
+        global _connection
+        delay = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(direct_dsn())
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, InvalidationBus._on_notify)
+
+                InvalidationBus._set_caches_enabled(True)
+                _connection = connection
+                logger.info("📡 Barramento de invalidação conectado.")
+                delay = 1
+
+                # Marcas publicadas pelos outros workers enquanto estava
+                # desconectado se perderam: só confia nelas após uma janela
+                try:
+                    await asyncio.wait_for(
+                        closed.wait(), settings.READ_YOUR_WRITES_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    set_writes_shared(True)
+                    await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Barramento de invalidação indisponível: {e}")
+            finally:
+                _connection = None
+                set_writes_shared(False)
+                InvalidationBus._set_caches_enabled(False)
+                if connection and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    @staticmethod
+    async def start():
+        """Inicia a escuta em background (chamado no lifespan)."""
+        global _task
+        if make_url(settings.async_database_url).get_backend_name() != "postgresql":
+            return
+        if _task is None:
+            _task = asyncio.create_task(InvalidationBus._listen_forever())
+
+    @staticmethod
+    async def stop():
+        """Encerra a escuta."""
+        global _task
+        if _task:
+            _task.cancel()
+            try:
+                await _task
+            except asyncio.CancelledError:
+                pass
+            _task = None
+
+
+on_write(InvalidationBus._publish_writes)
+for _kind in ("user", "bot"):
+    InvalidationBus.subscribe(
+        WRITE_PREFIX + _kind,
+        lambda key_id, kind=_kind: mark_write((kind, key_id), broadcast=False),
+    )
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from src.core.config import settings
+from src.database.base import direct_dsn
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, o processo local é sempre líder
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Keepalive TCP da sessão do lock: se a máquina do líder cair sem fechar a
+# conexão, o Postgres libera o lock em ~idle + interval * count segundos
+KEEPALIVE_SETTINGS = {
+    "tcp_keepalives_idle": "5",
+    "tcp_keepalives_interval": "2",
+    "tcp_keepalives_count": "3",
+}
+
+
+def _lock_key(name: str) -> int:
+    """Chave estável de 64 bits (bigint com sinal) para pg_advisory_lock."""
+    digest = hashlib.sha1(f"botify:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class _AdvisoryLock:
+    """Advisory lock de sessão do Postgres em uma conexão dedicada."""
+
+    def __init__(self, key: int, timeout: float):
+        self.key = key
+        self.timeout = timeout
+        self._conn = None
+
+    async def try_acquire(self) -> bool:
+        if self._conn is None or self._conn.is_closed():
+            self._conn = await asyncpg.connect(
+                direct_dsn(),
+                timeout=self.timeout,
+                server_settings=KEEPALIVE_SETTINGS,
+            )
+        return await self._conn.fetchval(
+            "SELECT pg_try_advisory_lock($1)", self.key, timeout=self.timeout
+        )
+
+    async def check(self):
+        """Confirma que a sessão (e portanto o lock) continua viva."""
+        await self._conn.fetchval("SELECT 1", timeout=self.timeout)
+
+    async def release(self):
+        # Fechar a sessão libera o lock
+        conn, self._conn = self._conn, None
+        if conn and not conn.is_closed():
+            try:
+                await asyncio.wait_for(conn.close(), self.timeout)
+            except Exception:
+                conn.terminate()
+
+
+class _FileLock:
+    """flock exclusivo em um arquivo ao lado do banco SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    async def try_acquire(self) -> bool:
+        if fcntl is None:
+            return True
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    async def check(self):
+        # O flock dura enquanto o descritor estiver aberto
+        pass
+
+    async def release(self):
+        # Fechar o descritor libera o flock (o SO faz o mesmo se o processo morrer)
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
+
+
+class LeaderElection:
+    """
+    Elege um único processo (entre workers e instâncias) para uma tarefa.
+
+    No Postgres o líder é quem detém um advisory lock de sessão; no SQLite,
+    quem detém um flock no arquivo do banco. Os dois são liberados pelo
+    próprio banco/SO quando o processo morre, e os demais candidatos tentam
+    assumir a cada LEADER_CHECK_SECONDS.
+    """
+
+    def __init__(self, name: str, interval: float = None):
+        self.name = name
+        self.interval = interval or settings.LEADER_CHECK_SECONDS
+        self.is_leader = False
+        self._task = None
+
+        url = make_url(settings.async_database_url)
+        if url.get_backend_name() == "postgresql":
+            self._lock = _AdvisoryLock(_lock_key(name), self.interval)
+        else:
+            database = url.database
+            if not database or database == ":memory:":
+                database = os.path.join(tempfile.gettempdir(), "botify")
+            self._lock = _FileLock(f"{database}.{name}.leader")
+
+    async def _step_down(self, reason: str):
+        if self.is_leader:
+            logger.warning(f"⚠️ Liderança '{self.name}' perdida: {reason}")
+        self.is_leader = False
+        await self._lock.release()
+
+    async def _campaign(self):
+        """Tenta assumir (ou confirma) a liderança periodicamente."""
+        try:
+            while True:
+                try:
+                    if self.is_leader:
+                        await self._lock.check()
+                    elif await self._lock.try_acquire():
+                        self.is_leader = True
+                        logger.info(f"👑 Processo {os.getpid()} assumiu '{self.name}'.")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await self._step_down(str(e))
+
+                await asyncio.sleep(self.interval)
+        finally:
+            self.is_leader = False
+            await self._lock.release()
+
+    async def start(self):
+        """Inicia a candidatura em background (chamado no lifespan)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._campaign())
+
+    async def stop(self):
+        """Renuncia à liderança e encerra a candidatura."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Líder dos jobs agendados (scheduler, JobsService)
+scheduler_leader = LeaderElection("scheduler")
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    DDL,
     BigInteger,
     Column,
     String,
@@ -8,12 +9,19 @@ from sqlalchemy import (
     ForeignKey,
     Float,
     Integer,
+    Index,
     JSON,
-    Enum as PgEnum,
+    UniqueConstraint,
+    event,
+    text,
+    Enum,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.schema import CreateColumn, PrimaryKeyConstraint
+from sqlalchemy.sql.functions import now
 import enum
-from src.database.base import Base
+from src.database.base import SQLITE_NOW, Base, mark_write
 
 
 class TransactionType(enum.Enum):
@@ -56,7 +64,7 @@ class Bot(Base):
     __tablename__ = "bots"
 
     id = Column(BigInteger, primary_key=True, index=True)
-    owner_id = Column(BigInteger, ForeignKey("users.id"))
+    owner_id = Column(BigInteger, ForeignKey("users.id"), index=True)
     token = Column(String, unique=True, nullable=False)
     name = Column(String)
     username = Column(String)
@@ -69,6 +77,8 @@ class Bot(Base):
     followups = Column(JSON, default=list)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Exclusão pendente
+    token_invalid_at = Column(DateTime(timezone=True), nullable=True)  # Quarentena
     owner = relationship("User", back_populates="bots")
     plans = relationship("Plan", back_populates="bot", cascade="all, delete-orphan")
     leads = relationship("Lead", back_populates="bot", cascade="all, delete-orphan")
@@ -78,6 +88,7 @@ class Plan(Base):
     """Plano de assinatura vinculado a um bot."""
 
     __tablename__ = "plans"
+    __table_args__ = (Index("ix_plans_bot_id_is_active", "bot_id", "is_active"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     bot_id = Column(BigInteger, ForeignKey("bots.id"))
@@ -106,6 +117,24 @@ class Subscription(Base):
     """Vínculo entre assinante, bot e plano."""
 
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        # Expiração: só assinaturas ativas com data de término
+        Index(
+            "ix_subscriptions_active_end_date",
+            "end_date",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        Index("ix_subscriptions_bot_id", "bot_id"),
+        # Campanhas: assinantes ativos do bot em ordem de subscriber_id
+        Index(
+            "ix_subscriptions_bot_active_subscriber",
+            "bot_id",
+            "subscriber_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     bot_id = Column(BigInteger, ForeignKey("bots.id"))
@@ -114,24 +143,57 @@ class Subscription(Base):
     start_date = Column(DateTime(timezone=True), server_default=func.now())
     end_date = Column(DateTime(timezone=True), nullable=True)  # Null = vitalício
     is_active = Column(Boolean, default=True)
+    # Reserva da remoção do grupo em andamento ou espera da próxima
+    # tentativa (ver ExpiryScheduler)
+    expiring_until = Column(DateTime(timezone=True), nullable=True)
+    expiry_attempts = Column(Integer, default=0, server_default="0")  # Falhas seguidas
 
 
 class Transaction(Base):
     """Registro de transação financeira (livro caixa)."""
 
     __tablename__ = "transactions"
-
+    __table_args__ = (
+        Index("ix_transactions_external_id", "external_id"),
+        Index("ix_transactions_user_id_created_at", "user_id", "created_at"),
+        Index("ix_transactions_bot_id", "bot_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # PK composta: no Postgres a chave de partição precisa fazer parte da PK
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, ForeignKey("users.id"))
     bot_id = Column(BigInteger, ForeignKey("bots.id"), nullable=True)
     external_id = Column(String, nullable=True)
-    type = Column(PgEnum(TransactionType), nullable=False)
+    type = Column(Enum(TransactionType), nullable=False)
     description = Column(String)
     amount = Column(Float, nullable=False)  # Positivo = entrada, negativo = saída
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
     followup_sent = Column(Boolean, default=False)
 
 
+class LedgerSnapshot(Base):
+    """
+    Saldo consolidado de um período do livro caixa já encerrado.
+    As transações do período ficam em transactions_archive.
+    """
+
+    __tablename__ = "ledger_snapshots"
+    __table_args__ = (UniqueConstraint("user_id", "period_start"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    period_start = Column(DateTime(timezone=True), nullable=False)
+    period_end = Column(DateTime(timezone=True), nullable=False)
+    balance = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Withdrawal(Base):
     """Solicitação de saque."""
 
@@ -144,11 +206,20 @@ class Withdrawal(Base):
     amount_final = Column(Float, nullable=False)
     pix_key = Column(String, nullable=False)
     pix_type = Column(String, default="CPF")
-    status = Column(PgEnum(WithdrawalStatus), default=WithdrawalStatus.PENDING)
+    status = Column(Enum(WithdrawalStatus), default=WithdrawalStatus.PENDING)
     ggpix_id = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Controle do pagamento automático (PayoutService)
+    approved_at = Column(DateTime(timezone=True), nullable=True)
+    approved_by = Column(BigInteger, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0, nullable=False, server_default="0")
+    last_error = Column(String, nullable=True)
+
+    __table_args__ = (Index("ix_withdrawals_payout_queue", "status", "approved_at"),)
+
 
 class Lead(Base):
     """
@@ -157,6 +228,19 @@ class Lead(Base):
     """
 
     __tablename__ = "leads"
+    __table_args__ = (
+        Index("ix_leads_user_id_bot_id", "user_id", "bot_id"),
+        # Exclusão em lotes por bot e campanhas (keyset por user_id)
+        Index("ix_leads_bot_id_user_id", "bot_id", "user_id"),
+        # Fila de follow-up: só leads com um passo agendado
+        Index(
+            "ix_leads_followup_due_at",
+            "followup_due_at",
+            postgresql_where=text("followup_due_at IS NOT NULL"),
+            sqlite_where=text("followup_due_at IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, ForeignKey("subscribers.id"))
@@ -165,13 +249,177 @@ class Lead(Base):
     first_name = Column(String, nullable=True)
     username = Column(String, nullable=True)
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
 
     # Controle de Follow-up
     last_interaction = Column(DateTime(timezone=True), server_default=func.now())
-    followup_sent = Column(Boolean, default=False)
+    followup_sent = Column(Boolean, default=False)  # Recebeu o primeiro passo
+    followup_step = Column(Integer, default=0, server_default="0")  # Próximo passo
+    followup_due_at = Column(DateTime(timezone=True), nullable=True)  # Vencimento
+    followup_attempts = Column(Integer, default=0, server_default="0")  # Falhas seguidas
     is_converted = Column(
         Boolean, default=False
     )  # True se já comprou (não enviar mais msg)
+    last_remarketing_at = Column(DateTime(timezone=True), nullable=True)
+    remarketing_attempts = Column(Integer, default=0, server_default="0")  # Falhas seguidas
 
     bot = relationship("Bot", back_populates="leads")
+
+
+class Suppression(Base):
+    """Usuário que bloqueou o bot: nenhum envio ativo deve ser tentado."""
+
+    __tablename__ = "suppressions"
+
+    bot_id = Column(BigInteger, ForeignKey("bots.id"), primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Campaign(Base):
+    """
+    Campanha de transmissão do dono para os leads ou assinantes de um bot.
+
+    O envio percorre os destinatários em ordem de user_id; `last_user_id` é o
+    checkpoint gravado a cada lote, de onde a campanha continua após um
+    reinício.
+    """
+
+    __tablename__ = "campaigns"
+    __table_args__ = (
+        # Uma campanha em andamento por bot, mesmo com confirmações simultâneas
+        Index(
+            "ux_campaigns_bot_running",
+            "bot_id",
+            unique=True,
+            postgresql_where=text("status = 'running'"),
+            sqlite_where=text("status = 'running'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bot_id = Column(BigInteger, ForeignKey("bots.id"), index=True)
+    owner_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
+    audience = Column(String, nullable=False)  # leads, subscribers
+    text = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="running")  # running, done, cancelled
+    last_user_id = Column(BigInteger, default=0, nullable=False, server_default="0")
+    total = Column(Integer, default=0, nullable=False, server_default="0")
+    sent = Column(Integer, default=0, nullable=False, server_default="0")
+    skipped = Column(Integer, default=0, nullable=False, server_default="0")  # Bloqueados/inválidos
+    failed = Column(Integer, default=0, nullable=False, server_default="0")
+    progress_message_id = Column(BigInteger, nullable=True)  # Contador no chat do dono
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class PersistedState(Base):
+    """
+    Estado do bot principal (user_data e conversas dos ConversationHandlers),
+    gravado pela DatabasePersistence. `kind` é "user" ou "conv:<nome>";
+    `data` é JSON. `version` sobe a cada gravação (compare-and-set entre
+    processos).
+    """
+
+    __tablename__ = "persisted_state"
+
+    kind = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    data = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, server_default="1")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class JobRun(Base):
+    """Execução de um job agendado (telemetria do JobRegistry)."""
+
+    __tablename__ = "job_runs"
+    __table_args__ = (Index("ix_job_runs_job_started_at", "job", "started_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job = Column(String, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    duration = Column(Float, default=0.0)  # Segundos
+    interval = Column(Integer, nullable=False)  # Intervalo configurado (segundos)
+    items = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    status = Column(String, nullable=False)  # ok, error, timeout, missed, skipped
+    error = Column(String, nullable=True)
+
+
+# Partição DEFAULT criada junto com as tabelas particionadas (create_all);
+# as partições mensais são mantidas por ArchiveService.maintain_partitions.
+for _table in (Transaction.__table__, Lead.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS {_table.name}_default "
+            f"PARTITION OF {_table.name} DEFAULT"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
+def _is_partitioned(table) -> bool:
+    return bool(table.dialect_options["postgresql"]["partition_by"])
+
+
+# O SQLite não tem particionamento nem autoincremento em PK composta: nas
+# tabelas particionadas o id vira INTEGER PRIMARY KEY (alias do rowid) e a PK
+# (id, created_at) fica só no Postgres.
+@compiles(CreateColumn, "sqlite")
+def _sqlite_partitioned_id(element, compiler, **kw):
+    column = element.element
+    if column.name == "id" and _is_partitioned(column.table):
+        return "id INTEGER PRIMARY KEY AUTOINCREMENT"
+    return compiler.visit_create_column(element, **kw)
+
+
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    return SQLITE_NOW
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _sqlite_partitioned_pk(element, compiler, **kw):
+    if _is_partitioned(element.table):
+        return None
+    return compiler.visit_primary_key_constraint(element, **kw)
+
+
+def _read_keys(obj):
+    """Chaves de leitura (ver read_session) afetadas por uma escrita no objeto."""
+    if isinstance(obj, (Transaction, Withdrawal, LedgerSnapshot)):
+        return [("user", obj.user_id)]
+    if isinstance(obj, Bot):
+        return [("user", obj.owner_id)]
+    if isinstance(obj, Plan):
+        return [("bot", obj.bot_id)]
+    return []
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_read_keys(session, flush_context):
+    """Acumula as chaves escritas na sessão até o commit."""
+    keys = session.info.setdefault("read_keys", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        keys.update(_read_keys(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_read_keys(session):
+    """Ativa o read-your-writes para as chaves escritas no commit."""
+    keys = session.info.pop("read_keys", None)
+    if keys:
+        mark_write(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_read_keys(session):
+    """Descarta as chaves de uma transação desfeita."""
+    session.info.pop("read_keys", None)
@@ -0,0 +1,110 @@
+import re
+from datetime import date
+from sqlalchemy import text
+
+# Tabelas particionadas por mês via RANGE (created_at) no Postgres
+PARTITIONED_TABLES = ("leads", "transactions")
+
+_PARTITION_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(value) -> date:
+    """Retorna o primeiro dia do mês da data informada."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(start: date, months: int) -> date:
+    """Soma meses a uma data de início de mês."""
+    year, month = divmod(start.month - 1 + months, 12)
+    return date(start.year + year, month + 1, 1)
+
+
+def partition_name(table: str, start: date) -> str:
+    """Nome da partição mensal (ex: leads_y2026m10)."""
+    return f"{table}_y{start.year}m{start.month:02d}"
+
+
+def partition_month(name: str):
+    """Extrai o mês de uma partição pelo nome, ou None (ex: partição DEFAULT)."""
+    match = _PARTITION_RE.search(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_default_partition(connection, table: str):
+    """Cria a partição DEFAULT, que recebe linhas fora dos meses criados."""
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {table}_default "
+            f"PARTITION OF {table} DEFAULT"
+        )
+    )
+
+
+def create_month_partition(connection, table: str, start: date):
+    """Cria a partição de um mês, se ainda não existir."""
+    end = add_months(start, 1)
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} "
+            f"PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+
+
+def list_partitions(connection, table: str) -> list:
+    """Lista as partições anexadas a uma tabela."""
+    result = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table ORDER BY c.relname"
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in result]
+
+
+def create_archive_tables(connection):
+    """
+    Cria as tabelas de arquivo: transactions_archive recebe as partições de
+    períodos encerrados do livro caixa e leads_archive os leads convertidos
+    ou inativos retirados da tabela quente.
+    """
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS transactions_archive "
+            "(LIKE transactions INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS leads_archive "
+            "(LIKE leads INCLUDING DEFAULTS, archived_at TIMESTAMPTZ DEFAULT now())"
+        )
+    )
+    # Linhas arquivadas mantêm o id original
+    connection.execute(text("ALTER TABLE leads_archive ALTER COLUMN id DROP DEFAULT"))
+    connection.execute(
+        text("ALTER TABLE transactions_archive ALTER COLUMN id DROP DEFAULT")
+    )
+
+
+def ensure_partitions(connection, months_ahead: int = 3):
+    """
+    Garante as partições do mês atual e dos próximos meses.
+    Precisa rodar antes da virada do mês: criar a partição de um mês que já
+    tem linhas na DEFAULT falha.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+
+    create_archive_tables(connection)
+
+    current = month_start(date.today())
+    for table in PARTITIONED_TABLES:
+        create_default_partition(connection, table)
+        for offset in range(months_ahead + 1):
+            create_month_partition(connection, table, add_months(current, offset))
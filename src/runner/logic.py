@@ -1,17 +1,17 @@
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, Bot as TgBot
 from sqlalchemy.future import select
 from datetime import datetime
-from src.database.base import AsyncSessionLocal
 from src.database.models import (
-    Bot,
-    Plan,
     Subscriber,
-    Transaction,
     TransactionType,
     Lead,
 )
+from src.runner.queries import RunnerQueries, BotRecord
+from src.runner.scheduler import followup_due_at
 from src.services.payment_service import PaymentService
+from src.services.suppression_service import SuppressionService
 from src.utils.formatters import TextUtils
+from src.utils.rate_limit import outbound
 import uuid
 
 
@@ -21,8 +21,10 @@ class RunnerLogic:
     @staticmethod
     async def register_interaction(session, user, bot_id):
         """
-        Salva ou atualiza o usuário como um Lead na tabela.
+        Salva ou atualiza o usuário como um Lead na tabela (caminho via ORM).
         Atualiza a data da última interação para reiniciar o contador do follow-up.
+        O runner usa RunnerQueries.upsert_lead; este método serve de referência
+        no benchmark (bench_runner_queries.py).
         """
         # 1. Garante que existe na tabela de Subscribers (Usuários Globais)
         result = await session.execute(
@@ -47,6 +49,8 @@ class RunnerLogic:
             # Se já recebeu follow-up, não atualizamos para não resetar ciclo (opcional)
             if not lead.is_converted:
                 lead.last_interaction = datetime.now()
+                if not lead.followup_step:
+                    lead.followup_due_at = followup_due_at(0)
                 # Opcional: Se quiser dar uma segunda chance de follow-up:
                 # lead.followup_sent = False
         else:
@@ -59,11 +63,13 @@ class RunnerLogic:
                 last_interaction=datetime.now(),
                 followup_sent=False,
                 is_converted=False,
+                followup_step=0,
+                followup_due_at=followup_due_at(0),
             )
             session.add(lead)
 
     @staticmethod
-    async def process_start(update: Update, bot: TgBot, db_bot: Bot):
+    async def process_start(update: Update, bot: TgBot, db_bot: BotRecord):
         """
         Processa o comando /start do bot filho.
         """
@@ -71,52 +77,71 @@ class RunnerLogic:
         chat_id = update.effective_chat.id
 
         # Registra interação (Lead)
-        async with AsyncSessionLocal() as session:
-            await RunnerLogic.register_interaction(session, user, db_bot.id)
-            await session.commit()
+        await RunnerQueries.upsert_lead(user, db_bot.id)
+        # Quem manda /start desbloqueou o bot
+        await SuppressionService.unsuppress(db_bot.id, user.id)
 
         # Lógica de Mídia de Boas-vindas
         if db_bot.welcome_media_id:
             caption = db_bot.welcome_message or ""
             try:
                 if db_bot.welcome_media_type == "photo":
-                    await bot.send_photo(
-                        chat_id=chat_id,
-                        photo=db_bot.welcome_media_id,
-                        caption=caption,
-                        parse_mode="HTML",
+                    await outbound.send(
+                        db_bot.id,
+                        chat_id,
+                        lambda: bot.send_photo(
+                            chat_id=chat_id,
+                            photo=db_bot.welcome_media_id,
+                            caption=caption,
+                            parse_mode="HTML",
+                        ),
                     )
                 elif db_bot.welcome_media_type == "video":
-                    await bot.send_video(
-                        chat_id=chat_id,
-                        video=db_bot.welcome_media_id,
-                        caption=caption,
-                        parse_mode="HTML",
+                    await outbound.send(
+                        db_bot.id,
+                        chat_id,
+                        lambda: bot.send_video(
+                            chat_id=chat_id,
+                            video=db_bot.welcome_media_id,
+                            caption=caption,
+                            parse_mode="HTML",
+                        ),
                     )
             except Exception:
-                await bot.send_message(chat_id=chat_id, text=caption, parse_mode="HTML")
+                await outbound.send(
+                    db_bot.id,
+                    chat_id,
+                    lambda: bot.send_message(
+                        chat_id=chat_id, text=caption, parse_mode="HTML"
+                    ),
+                )
         else:
             if db_bot.welcome_message:
-                await bot.send_message(
-                    chat_id=chat_id, text=db_bot.welcome_message, parse_mode="HTML"
+                await outbound.send(
+                    db_bot.id,
+                    chat_id,
+                    lambda: bot.send_message(
+                        chat_id=chat_id, text=db_bot.welcome_message, parse_mode="HTML"
+                    ),
                 )
 
         await RunnerLogic.show_plans(update, bot, db_bot)
 
     @staticmethod
-    async def show_plans(update: Update, bot: TgBot, db_bot: Bot):
+    async def show_plans(update: Update, bot: TgBot, db_bot: BotRecord):
         """Exibe os planos de assinatura disponíveis para o bot."""
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(Plan).filter(Plan.bot_id == db_bot.id, Plan.is_active == True)
-            )
-            plans = result.scalars().all()
+        plans = await RunnerQueries.get_active_plans(db_bot.id)
+        chat_id = update.effective_chat.id
 
         if not plans:
-            await bot.send_message(
-                chat_id=update.effective_chat.id,
-                text="<i>Sem planos disponíveis no momento.</i>",
-                parse_mode="HTML",
+            await outbound.send(
+                db_bot.id,
+                chat_id,
+                lambda: bot.send_message(
+                    chat_id=chat_id,
+                    text="<i>Sem planos disponíveis no momento.</i>",
+                    parse_mode="HTML",
+                ),
             )
             return
 
@@ -127,16 +152,20 @@ class RunnerLogic:
                 [InlineKeyboardButton(btn_text, callback_data=f"buy_plan_{plan.id}")]
             )
 
-        await bot.send_message(
-            chat_id=update.effective_chat.id,
-            text="👇 <b>Escolha seu plano de acesso:</b>",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode="HTML",
+        await outbound.send(
+            db_bot.id,
+            chat_id,
+            lambda: bot.send_message(
+                chat_id=chat_id,
+                text="👇 <b>Escolha seu plano de acesso:</b>",
+                reply_markup=InlineKeyboardMarkup(keyboard),
+                parse_mode="HTML",
+            ),
         )
 
     @staticmethod
     async def process_purchase(
-        update: Update, bot: TgBot, db_bot: Bot, callback_data: str
+        update: Update, bot: TgBot, db_bot: BotRecord, callback_data: str
     ):
         """
         Processa a compra de um plano gerando cobrança PIX.
@@ -144,63 +173,81 @@ class RunnerLogic:
         """
         plan_id = int(callback_data.split("_")[2])
         user = update.effective_user
+        chat_id = update.effective_chat.id
+        query_id = update.callback_query.id
 
-        async with AsyncSessionLocal() as session:
-            # Atualiza interação pois ele clicou num botão
-            await RunnerLogic.register_interaction(session, user, db_bot.id)
+        # Atualiza interação pois ele clicou num botão
+        await RunnerQueries.upsert_lead(user, db_bot.id)
 
-            result = await session.execute(select(Plan).filter(Plan.id == plan_id))
-            plan = result.scalars().first()
+        plan = await RunnerQueries.get_plan(plan_id)
 
-            if not plan:
-                await bot.answer_callback_query(
-                    update.callback_query.id, "Plano indisponível."
-                )
-                return
+        if not plan:
+            await outbound.send(
+                db_bot.id,
+                None,
+                lambda: bot.answer_callback_query(query_id, "Plano indisponível."),
+            )
+            return
 
-            external_id = f"{uuid.uuid4()}|{plan.id}|{user.id}"
+        external_id = f"{uuid.uuid4()}|{plan.id}|{user.id}"
 
-            await bot.answer_callback_query(update.callback_query.id, "Gerando Pix...")
-            await bot.send_message(
-                update.effective_chat.id,
-                "⏳ <b>Gerando seu Pix...</b>",
-                parse_mode="HTML",
-            )
+        await outbound.send(
+            db_bot.id,
+            None,
+            lambda: bot.answer_callback_query(query_id, "Gerando Pix..."),
+        )
+        await outbound.send(
+            db_bot.id,
+            chat_id,
+            lambda: bot.send_message(
+                chat_id, "⏳ <b>Gerando seu Pix...</b>", parse_mode="HTML"
+            ),
+        )
 
-            charge = await PaymentService.create_pix_charge(
-                amount=plan.price,
-                description=f"Plano {plan.name}",
-                payer_name=user.full_name,
-                external_id=external_id,
-            )
+        charge = await PaymentService.create_pix_charge(
+            amount=plan.price,
+            description=f"Plano {plan.name}",
+            payer_name=user.full_name,
+            external_id=external_id,
+        )
 
-            if not charge:
-                await bot.send_message(
-                    update.effective_chat.id, "❌ Erro no pagamento. Tente novamente."
-                )
-                return
-
-            transaction = Transaction(
-                user_id=db_bot.owner_id,
-                bot_id=db_bot.id,
-                external_id=external_id,
-                type=TransactionType.SALE,
-                description=f"(Pendente) {plan.name} - @{user.username or user.first_name}",
-                amount=0.0,
+        if not charge:
+            await outbound.send(
+                db_bot.id,
+                chat_id,
+                lambda: bot.send_message(
+                    chat_id, "❌ Erro no pagamento. Tente novamente."
+                ),
             )
-            session.add(transaction)
-            await session.commit()
+            return
+
+        await RunnerQueries.insert_transaction(
+            user_id=db_bot.owner_id,
+            bot_id=db_bot.id,
+            external_id=external_id,
+            type_name=TransactionType.SALE.name,
+            description=f"(Pendente) {plan.name} - @{user.username or user.first_name}",
+            amount=0.0,
+        )
 
-            pix_code = charge["pixCopyPaste"]
+        pix_code = charge["pixCopyPaste"]
 
-            msg = (
-                f"✅ <b>Pix Gerado!</b>\n\n"
-                f"💠 <b>Plano:</b> {plan.name}\n"
-                f"💲 <b>Valor:</b> {TextUtils.currency(plan.price)}\n\n"
-                "Copie o código abaixo e pague no seu banco:"
-            )
+        msg = (
+            f"✅ <b>Pix Gerado!</b>\n\n"
+            f"💠 <b>Plano:</b> {plan.name}\n"
+            f"💲 <b>Valor:</b> {TextUtils.currency(plan.price)}\n\n"
+            "Copie o código abaixo e pague no seu banco:"
+        )
 
-            await bot.send_message(update.effective_chat.id, msg, parse_mode="HTML")
-            await bot.send_message(
-                update.effective_chat.id, f"`{pix_code}`", parse_mode="MarkdownV2"
-            )
+        await outbound.send(
+            db_bot.id,
+            chat_id,
+            lambda: bot.send_message(chat_id, msg, parse_mode="HTML"),
+        )
+        await outbound.send(
+            db_bot.id,
+            chat_id,
+            lambda: bot.send_message(
+                chat_id, f"`{pix_code}`", parse_mode="MarkdownV2"
+            ),
+        )
@@ -0,0 +1,237 @@
+import re
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from src.core.config import settings
+from src.database.base import SQLITE_NOW, engine, mark_write
+from src.database.invalidation import InvalidationBus
+from src.runner.scheduler import followup_due_at
+from src.utils.cache import TTLCache
+
+
+class BotRecord(NamedTuple):
+    """Dados do bot usados pelo runner (somente leitura)."""
+
+    id: int
+    owner_id: int
+    token: str
+    name: str
+    username: str
+    group_id: Optional[int]
+    welcome_message: Optional[str]
+    welcome_media_id: Optional[str]
+    welcome_media_type: Optional[str]
+    is_active: bool
+    quarantined: bool  # Token rejeitado pelo Telegram (TokenHealthService)
+
+
+class PlanRecord(NamedTuple):
+    """Plano exibido/vendido pelo runner."""
+
+    id: int
+    bot_id: int
+    name: str
+    price: float
+    days: int
+    is_active: bool
+
+
+BOT_BY_TOKEN_SQL = (
+    "SELECT id, owner_id, token, name, username, group_id, welcome_message, "
+    "welcome_media_id, welcome_media_type, is_active,"
+    " token_invalid_at IS NOT NULL FROM bots WHERE token = $1"
+)
+
+ACTIVE_PLANS_SQL = (
+    "SELECT id, bot_id, name, price, days, is_active FROM plans "
+    "WHERE bot_id = $1 AND is_active ORDER BY id"
+)
+
+PLAN_BY_ID_SQL = (
+    "SELECT id, bot_id, name, price, days, is_active FROM plans WHERE id = $1"
+)
+
+# Subscriber + Lead em um único round-trip. Mantém a semântica de
+# RunnerLogic.register_interaction: lead existente e não convertido tem a
+# interação renovada (e o primeiro follow-up adiado, se ainda não saiu);
+# lead inexistente é criado com o primeiro passo agendado para $6.
+LEAD_UPSERT_SQL = (
+    "WITH subscriber AS ("
+    "  INSERT INTO subscribers (id, name, username, created_at)"
+    "  VALUES ($1, $2, $3, now()) ON CONFLICT (id) DO NOTHING"
+    "), touched AS ("
+    "  UPDATE leads SET last_interaction = now(),"
+    "  followup_due_at = CASE WHEN followup_step = 0 THEN $6::timestamptz"
+    "  ELSE followup_due_at END"
+    "  WHERE user_id = $1 AND bot_id = $4 AND NOT is_converted"
+    ") "
+    "INSERT INTO leads (user_id, bot_id, first_name, username, created_at,"
+    " last_interaction, followup_sent, is_converted, followup_step, followup_due_at) "
+    "SELECT $1, $4, $5, $3, now(), now(), false, false, 0, $6::timestamptz "
+    "WHERE NOT EXISTS (SELECT 1 FROM leads WHERE user_id = $1 AND bot_id = $4)"
+)
+
+# O SQLite não aceita INSERT/UPDATE dentro de CTE: mesmo efeito em três
+# statements na mesma transação.
+LEAD_UPSERT_STEPS = (
+    "INSERT INTO subscribers (id, name, username, created_at)"
+    " VALUES ($1, $2, $3, now()) ON CONFLICT (id) DO NOTHING",
+    "UPDATE leads SET last_interaction = now(),"
+    " followup_due_at = CASE WHEN followup_step = 0 THEN $6"
+    " ELSE followup_due_at END"
+    " WHERE user_id = $1 AND bot_id = $4 AND NOT is_converted",
+    "INSERT INTO leads (user_id, bot_id, first_name, username, created_at,"
+    " last_interaction, followup_sent, is_converted, followup_step, followup_due_at) "
+    "SELECT $1, $4, $5, $3, now(), now(), false, false, 0, $6 "
+    "WHERE NOT EXISTS (SELECT 1 FROM leads WHERE user_id = $1 AND bot_id = $4)",
+)
+
+TRANSACTION_INSERT_SQL = (
+    "INSERT INTO transactions (user_id, bot_id, external_id, type, description,"
+    " amount, created_at, followup_sent) "
+    "VALUES ($1, $2, $3, $4, $5, $6, now(), false) RETURNING id"
+)
+
+_POSITIONAL_PARAM = re.compile(r"\$(\d+)")
+
+# token -> BotRecord e bot_id -> [PlanRecord]. O TTL é longo porque toda
+# escrita em bots/plans invalida as entradas em todos os workers.
+_bot_cache = TTLCache(settings.CACHE_TTL_SECONDS)
+_plans_cache = TTLCache(settings.CACHE_TTL_SECONDS)
+
+InvalidationBus.register(_bot_cache)
+InvalidationBus.register(_plans_cache)
+InvalidationBus.subscribe(
+    "bots", lambda bot_id: _bot_cache.evict_where(lambda _, bot: bot.id == bot_id)
+)
+InvalidationBus.subscribe("plans", _plans_cache.evict)
+
+
+def _portable_value(value):
+    """Datas viram texto UTC no mesmo formato que o SQLAlchemy grava no SQLite."""
+    if isinstance(value, datetime):
+        if value.tzinfo:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value
+
+
+class RunnerQueries:
+    """
+    Acesso direto ao asyncpg para as consultas mais frequentes do runner.
+
+    Evita a montagem de select() e o Result do ORM. O asyncpg mantém os
+    statements preparados em cache por conexão, então cada SQL é preparado
+    uma única vez por conexão do pool. Em outros bancos (SQLite) o mesmo SQL
+    roda pelo SQLAlchemy, com os parâmetros $N convertidos para :pN e now()
+    no formato de data do SQLite.
+    """
+
+    @staticmethod
+    async def _fetch(method: str, sql: str, *args):
+        """Executa o SQL na conexão asyncpg subjacente a uma conexão do pool."""
+        if engine.dialect.driver != "asyncpg":
+            return await RunnerQueries._fetch_portable(method, (sql,), *args)
+
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            return await getattr(driver, method)(sql, *args)
+
+    @staticmethod
+    async def _fetch_portable(method: str, statements: tuple, *args):
+        """
+        Executa os statements em uma transação e devolve o resultado do último
+        no formato do método asyncpg equivalente.
+        """
+        params = {
+            f"p{i}": _portable_value(value) for i, value in enumerate(args, start=1)
+        }
+        async with engine.begin() as conn:
+            for sql in statements:
+                sql = _POSITIONAL_PARAM.sub(r":p\1", sql).replace("now()", SQLITE_NOW)
+                result = await conn.exec_driver_sql(sql, params)
+
+            if method == "fetchrow":
+                return result.first()
+            if method == "fetch":
+                return result.all()
+            if method == "fetchval":
+                return result.scalar()
+            return None
+
+    @staticmethod
+    async def get_bot_by_token(token: str) -> Optional[BotRecord]:
+        """Busca o bot pelo token do webhook."""
+        cached = _bot_cache.get(token)
+        if cached:
+            return cached
+
+        generation = _bot_cache.generation
+        row = await RunnerQueries._fetch("fetchrow", BOT_BY_TOKEN_SQL, token)
+        if not row:
+            return None
+
+        db_bot = BotRecord(*row)
+        _bot_cache.set(token, db_bot, generation)
+        return db_bot
+
+    @staticmethod
+    async def get_active_plans(bot_id: int) -> list:
+        """Lista os planos ativos do bot."""
+        cached = _plans_cache.get(bot_id)
+        if cached is not None:
+            return cached
+
+        generation = _plans_cache.generation
+        rows = await RunnerQueries._fetch("fetch", ACTIVE_PLANS_SQL, bot_id)
+        plans = [PlanRecord(*row) for row in rows]
+        _plans_cache.set(bot_id, plans, generation)
+        return plans
+
+    @staticmethod
+    async def get_plan(plan_id: int) -> Optional[PlanRecord]:
+        """Busca um plano pelo ID."""
+        row = await RunnerQueries._fetch("fetchrow", PLAN_BY_ID_SQL, plan_id)
+        return PlanRecord(*row) if row else None
+
+    @staticmethod
+    async def upsert_lead(user, bot_id: int):
+        """Registra a interação do usuário como Lead do bot (um round-trip)."""
+        args = (
+            user.id,
+            user.full_name,
+            user.username,
+            bot_id,
+            user.first_name,
+            followup_due_at(0),
+        )
+        if engine.dialect.driver != "asyncpg":
+            await RunnerQueries._fetch_portable("execute", LEAD_UPSERT_STEPS, *args)
+            return
+
+        await RunnerQueries._fetch("execute", LEAD_UPSERT_SQL, *args)
+
+    @staticmethod
+    async def insert_transaction(
+        user_id: int,
+        bot_id: int,
+        external_id: str,
+        type_name: str,
+        description: str,
+        amount: float,
+    ) -> int:
+        """Insere uma transação e retorna seu ID."""
+        transaction_id = await RunnerQueries._fetch(
+            "fetchval",
+            TRANSACTION_INSERT_SQL,
+            user_id,
+            bot_id,
+            external_id,
+            type_name,
+            description,
+            amount,
+        )
+        # SQL direto não passa pelos eventos do ORM (read-your-writes)
+        mark_write(("user", user_id))
+        return transaction_id
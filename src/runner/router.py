@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request, BackgroundTasks, Response
 from telegram import Update, Bot as TgBot
+from telegram.error import InvalidToken
 from telegram.ext import Application
 from sqlalchemy.future import select
 from datetime import datetime, timedelta
@@ -14,7 +15,10 @@ from src.database.models import (
     Lead,
 )
 from src.runner.logic import RunnerLogic
+from src.runner.queries import RunnerQueries
 from src.services.payment_service import PaymentService
+from src.services.token_health_service import TokenHealthService
+from src.utils.rate_limit import Priority, outbound
 from src.core.config import settings
 
 runner_router = APIRouter()
@@ -22,12 +26,10 @@ runner_router = APIRouter()
 
 async def process_update_task(token: str, update_data: dict):
     """Processa atualizações do Telegram em background para bots gerenciados."""
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Bot).filter(Bot.token == token))
-        db_bot = result.scalars().first()
+    db_bot = await RunnerQueries.get_bot_by_token(token)
 
-        if not db_bot or not db_bot.is_active:
-            return
+    if not db_bot or not db_bot.is_active or db_bot.quarantined:
+        return
 
     try:
         app = Application.builder().token(token).build()
@@ -49,6 +51,8 @@ async def process_update_task(token: str, update_data: dict):
 
         await app.shutdown()
 
+    except InvalidToken:
+        await TokenHealthService.quarantine(db_bot.id)
     except Exception as e:
         print(f"Erro Runner ({db_bot.name}): {e}")
 
@@ -86,6 +90,7 @@ async def payment_webhook(request: Request):
         amount_cents = data.get("amount", 0)
         net_amount_cents = data.get("netAmount", 0)
 
+        invalid_bot_id = None
         async with AsyncSessionLocal() as session:
             result = await session.execute(
                 select(Transaction).filter(Transaction.external_id == external_id)
@@ -115,7 +120,9 @@ async def payment_webhook(request: Request):
 
             parts = str(external_id).split("|")
 
-            if len(parts) >= 3:
+            # bot_id nulo: o bot foi excluído depois da cobrança; o valor
+            # fica na carteira do dono, mas não há grupo para entregar
+            if len(parts) >= 3 and transaction.bot_id:
                 plan_id = int(parts[1])
                 subscriber_id = int(parts[2])
 
@@ -152,24 +159,43 @@ async def payment_webhook(request: Request):
                 lead = lead_res.scalars().first()
                 if lead:
                     lead.is_converted = True
+                    lead.followup_due_at = None  # Sai da fila de follow-up
                 # ------------------------------------------
 
                 try:
                     tg_bot = TgBot(bot.token)
-                    invite = await tg_bot.create_chat_invite_link(
-                        chat_id=bot.group_id,
-                        member_limit=1,
-                        name=f"Venda {str(external_id)[:8]}",
+                    # Prioridade máxima: passa na frente de campanhas e follow-ups
+                    invite = await outbound.send(
+                        bot.id,
+                        None,
+                        lambda: tg_bot.create_chat_invite_link(
+                            chat_id=bot.group_id,
+                            member_limit=1,
+                            name=f"Venda {str(external_id)[:8]}",
+                        ),
+                        Priority.PAYMENT,
                     )
 
-                    await tg_bot.send_message(
-                        chat_id=subscriber_id,
-                        text=f"✅ <b>Pagamento Confirmado!</b>\n\nAqui está seu link de acesso exclusivo:\n{invite.invite_link}",
-                        parse_mode="HTML",
+                    await outbound.send(
+                        bot.id,
+                        subscriber_id,
+                        lambda: tg_bot.send_message(
+                            chat_id=subscriber_id,
+                            text=f"✅ <b>Pagamento Confirmado!</b>\n\nAqui está seu link de acesso exclusivo:\n{invite.invite_link}",
+                            parse_mode="HTML",
+                        ),
+                        Priority.PAYMENT,
                     )
+                except InvalidToken:
+                    # Marcado depois do commit, fora desta transação
+                    invalid_bot_id = bot.id
+                    print(f"Erro entrega VIP: token do bot {bot.id} rejeitado")
                 except Exception as e:
                     print(f"Erro entrega VIP: {e}")
 
             await session.commit()
 
+        if invalid_bot_id:
+            await TokenHealthService.quarantine(invalid_bot_id)
+
     return {"received": True}
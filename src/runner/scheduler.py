@@ -1,155 +1,350 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import update
 from sqlalchemy.future import select
 from telegram import Bot as TgBot
-from telegram.error import Forbidden, BadRequest
 
-from src.database.base import AsyncSessionLocal
-from src.database.models import Transaction, Bot, TransactionType
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal, read_session
+from src.database.leader import scheduler_leader
+from src.database.models import Lead, Bot
+from src.services.job_registry import JobRegistry
+from src.services.token_health_service import TokenHealthService
+from src.utils.rate_limit import outbound, send_limited
+from src.utils.timing_wheel import TimingWheel
 
 logger = logging.getLogger(__name__)
-DELAY_MINUTES = 30
-
-
-async def check_abandoned_carts():
-    """
-    Verifica carrinhos abandonados (vendas pendentes) e envia mensagens de recuperação.
-    Executado periodicamente pelo scheduler.
-    """
-    logger.info("⏰ Scheduler: Verificando carrinhos abandonados...")
-
-    try:
-        async with AsyncSessionLocal() as session:
-            cutoff_time = datetime.now() - timedelta(minutes=DELAY_MINUTES)
-
-            query = select(Transaction).where(
-                Transaction.type == TransactionType.SALE,
-                Transaction.amount == 0,
-                Transaction.created_at < cutoff_time,
-                Transaction.followup_sent == False,
-            )
-
-            result = await session.execute(query)
-            transactions = result.scalars().all()
-
-            if not transactions:
-                return
-
-            logger.info(f"🔎 Encontradas {len(transactions)} vendas para recuperar.")
 
-            for tx in transactions:
-                bot_res = await session.execute(select(Bot).filter(Bot.id == tx.bot_id))
-                db_bot = bot_res.scalars().first()
 
-                if not db_bot or not db_bot.is_active:
-                    continue
-
-                try:
-                    bot = TgBot(db_bot.token)
-                    msg = (
-                        "Olá! 👋\n\n"
-                        "Notamos que seu pedido de acesso ao <b>Grupo VIP</b> ainda não foi concluído.\n\n"
-                        "⏳ As vagas podem acabar a qualquer momento.\n"
-                        "Se tiver dúvidas sobre o pagamento, responda aqui!"
-                    )
-                    await bot.send_message(
-                        chat_id=tx.user_id, text=msg, parse_mode="HTML"
-                    )
-                    logger.info(f"✅ Follow-up enviado para User {tx.user_id}")
+def _followup_text(first_name: str) -> str:
+    return (
+        f"Olá, {first_name or 'Visitante'}! 👋\n\n"
+        "Vi que você acessou nosso bot mas ainda não finalizou sua entrada no <b>Grupo VIP</b>.\n\n"
+        "🤔 <b>Ficou com alguma dúvida?</b>\n"
+        "As vagas são limitadas e o conteúdo exclusivo já está rolando lá dentro.\n\n"
+        "👇 <b>Clique abaixo para ver os planos novamente:</b>\n"
+        "/start"
+    )
 
-                    tx.followup_sent = True
-
-                except Forbidden:
-                    logger.warning(f"🚫 User {tx.user_id} bloqueou o bot.")
-                    tx.followup_sent = True
-                except Exception as e:
-                    logger.error(f"❌ Erro envio: {e}")
-
-            await session.commit()
 
-    except Exception as e:
-        logger.error(f"❌ Erro fatal no Scheduler: {e}")
-
-
-import logging
-from datetime import datetime, timedelta
-from sqlalchemy.future import select
-from telegram import Bot as TgBot
-from telegram.error import Forbidden, BadRequest
+def followup_due_at(step: int, base: datetime = None) -> Optional[datetime]:
+    """
+    Vencimento do passo `step` da sequência de follow-up, contado a partir de
+    `base` (agora, por padrão). None se a sequência não tem esse passo.
+    """
+    delays = settings.followup_step_delays
+    if step >= len(delays):
+        return None
+    return (base or datetime.now(timezone.utc)) + timedelta(minutes=delays[step])
 
-from src.database.base import AsyncSessionLocal
-from src.database.models import Lead, Bot
 
-logger = logging.getLogger(__name__)
-DELAY_MINUTES = 30  # Tempo sem interação antes de mandar a mensagem
+def _as_epoch(value: datetime) -> float:
+    # O SQLite devolve datas sem fuso, gravadas em UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
 
 
-async def check_abandoned_carts():
+class DripEngine:
     """
-    Verifica LEADS (visitantes) que interagiram mas não converteram,
-    e envia mensagem de recuperação.
+    Fila de atraso dos follow-ups de carrinho abandonado.
+
+    O vencimento de cada lead fica persistido em leads.followup_due_at
+    (índice parcial só com leads agendados). O processo líder lê desse
+    índice apenas a janela dos próximos FOLLOWUP_HORIZON_SECONDS e a mantém
+    em uma timing wheel; a cada segundo os leads vencidos são reivindicados
+    no banco (UPDATE condicional), recebem o passo da sequência e têm o
+    próximo passo agendado. Não há varredura da tabela de leads.
+
+    A reivindicação é uma reserva: followup_due_at passa a ser o fim da
+    reserva (FOLLOWUP_CLAIM_LEASE_SECONDS) e só é sobrescrito no resultado
+    do envio. Um disparo interrompido (deploy, troca de líder, queda do
+    processo) volta para a fila quando a reserva vence.
+
+    A sequência são os follow-ups cadastrados no bot, na ordem, com as
+    esperas de FOLLOWUP_STEP_DELAYS_MINUTES; bots sem follow-ups recebem
+    apenas a mensagem padrão.
+
+    Falhas temporárias reagendam o mesmo passo com backoff exponencial, até
+    FOLLOWUP_MAX_ATTEMPTS falhas seguidas; erros definitivos (usuário
+    bloqueou, chat inválido) encerram a sequência. Leads de um bot com token
+    rejeitado são adiados sem consumir tentativas, e o bot entra em
+    quarentena (TokenHealthService).
     """
-    logger.info("⏰ Scheduler: Verificando leads pendentes...")
 
-    try:
+    def __init__(self):
+        self.wheel = TimingWheel(tick=1.0, slots=settings.FOLLOWUP_HORIZON_SECONDS)
+        self._bots = {}  # token -> TgBot, reaproveitado entre os disparos
+        self._tasks = set()
+        self._task = None
+
+    async def _refill(self):
+        """Carrega na wheel os leads que vencem dentro do horizonte."""
+        horizon = datetime.now(timezone.utc) + timedelta(
+            seconds=settings.FOLLOWUP_HORIZON_SECONDS
+        )
+        # Réplica: uma leitura atrasada só adia ou antecipa a vez do lead na
+        # wheel; quem decide o envio é o UPDATE condicional no principal
+        async with read_session() as session:
+            result = await session.execute(
+                select(Lead.id, Lead.followup_due_at)
+                .where(Lead.followup_due_at <= horizon)
+                .order_by(Lead.followup_due_at)
+                .limit(settings.FOLLOWUP_WHEEL_CAPACITY)
+            )
+            rows = result.all()
+
+        # Reagendar é idempotente: leads adiados depois da última leitura
+        # apenas mudam de slot
+        for lead_id, due_at in rows:
+            self.wheel.add(lead_id, _as_epoch(due_at))
+
+    async def _claim(self, lead_ids: list) -> tuple:
+        """
+        Reserva os leads ainda vencidos e não convertidos.
+
+        Returns:
+            Tupla (fim da reserva, linhas reservadas); o fim da reserva
+            identifica a posse dos leads na gravação do resultado
+        """
+        now = datetime.now(timezone.utc)
+        lease_until = now + timedelta(seconds=settings.FOLLOWUP_CLAIM_LEASE_SECONDS)
         async with AsyncSessionLocal() as session:
-            cutoff_time = datetime.now() - timedelta(minutes=DELAY_MINUTES)
-
-            # Busca leads que:
-            # 1. Mexeram no bot antes do tempo de corte
-            # 2. Ainda não compraram (is_converted = False)
-            # 3. Ainda não receberam follow-up
-            query = select(Lead).where(
-                Lead.last_interaction < cutoff_time,
-                Lead.is_converted == False,
-                Lead.followup_sent == False,
+            result = await session.execute(
+                update(Lead)
+                .where(
+                    Lead.id.in_(lead_ids),
+                    Lead.followup_due_at <= now,
+                    Lead.is_converted == False,
+                )
+                .values(followup_due_at=lease_until)
+                .returning(
+                    Lead.id,
+                    Lead.user_id,
+                    Lead.first_name,
+                    Lead.bot_id,
+                    Lead.followup_step,
+                    Lead.followup_attempts,
+                )
+                .execution_options(synchronize_session=False)
             )
+            rows = result.all()
+            await session.commit()
+            return lease_until, rows
 
-            result = await session.execute(query)
-            leads = result.scalars().all()
-
-            if not leads:
-                return
-
-            logger.info(f"🔎 Encontrados {len(leads)} leads para recuperar.")
+    async def _load_bots(self, bot_ids: set) -> dict:
+        """
+        bot_id -> (TgBot, sequência de textos) dos bots ativos; bots em
+        quarentena vêm com TgBot None.
 
-            for lead in leads:
-                bot_res = await session.execute(
-                    select(Bot).filter(Bot.id == lead.bot_id)
+        Lê do banco principal: bot ausente encerra a sequência, e uma réplica
+        atrasada não pode encerrá-la por um bot recém-criado ou editado.
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Bot.id, Bot.token, Bot.followups, Bot.token_invalid_at).where(
+                    Bot.id.in_(bot_ids),
+                    Bot.is_active == True,
+                    Bot.deleted_at == None,
                 )
-                db_bot = bot_res.scalars().first()
-
-                if not db_bot or not db_bot.is_active:
+            )
+            rows = result.all()
+
+        bots = {}
+        for bot_id, token, followups, token_invalid_at in rows:
+            if token_invalid_at:
+                bots[bot_id] = (None, followups or [None])
+                continue
+            if token not in self._bots:
+                self._bots[token] = TgBot(token)
+            bots[bot_id] = (self._bots[token], followups or [None])
+        return bots
+
+    @staticmethod
+    def _retry_values(row, now: datetime) -> tuple:
+        """Nova tentativa com backoff exponencial, ou desistência no limite."""
+        attempts = row.followup_attempts + 1
+        if attempts >= settings.FOLLOWUP_MAX_ATTEMPTS:
+            logger.warning(f"⏹ Follow-up do lead {row.id}: {attempts} falhas, desistindo.")
+            return (("followup_attempts", attempts), ("followup_due_at", None))
+
+        minutes = min(
+            settings.FOLLOWUP_RETRY_MINUTES * 2 ** (attempts - 1),
+            settings.FOLLOWUP_RETRY_MAX_MINUTES,
+        )
+        return (
+            ("followup_attempts", attempts),
+            ("followup_due_at", now + timedelta(minutes=minutes)),
+        )
+
+    async def _fire(self, lead_ids: list):
+        """Envia o passo atual para os leads vencidos e agenda o próximo."""
+        summary = {
+            "sent": 0,
+            "blocked": 0,
+            "suppressed": 0,
+            "rejected": 0,
+            "unauthorized": 0,
+            "deferred": 0,
+            "failed": 0,
+        }
+        started = time.monotonic()
+
+        for i in range(0, len(lead_ids), settings.JOB_CHUNK_SIZE):
+            lease_until, rows = await self._claim(
+                lead_ids[i : i + settings.JOB_CHUNK_SIZE]
+            )
+            if not rows:
+                continue
+
+            # Leads de bots pausados ou excluídos encerram a sequência
+            bots = await self._load_bots({row.bot_id for row in rows})
+            steps_total = len(settings.followup_step_delays)
+
+            now = datetime.now(timezone.utc)
+            ended = (("followup_due_at", None),)
+            groups = {}
+            pending = []
+            for row in rows:
+                if row.bot_id not in bots:
+                    groups.setdefault(ended, []).append(row.id)
                     continue
-
-                try:
-                    bot = TgBot(db_bot.token)
-
-                    first_name = lead.first_name or "Visitante"
-
-                    msg = (
-                        f"Olá, {first_name}! 👋\n\n"
-                        "Vi que você acessou nosso bot mas ainda não finalizou sua entrada no <b>Grupo VIP</b>.\n\n"
-                        "🤔 <b>Ficou com alguma dúvida?</b>\n"
-                        "As vagas são limitadas e o conteúdo exclusivo já está rolando lá dentro.\n\n"
-                        "👇 <b>Clique abaixo para ver os planos novamente:</b>\n"
-                        "/start"
+                tg_bot, sequence = bots[row.bot_id]
+                if row.followup_step >= min(len(sequence), steps_total):
+                    groups.setdefault(ended, []).append(row.id)
+                    continue
+                if tg_bot is None:
+                    # Quarentena: espera o próximo teste do token
+                    probe = timedelta(seconds=settings.TOKEN_PROBE_SECONDS)
+                    groups.setdefault((("followup_due_at", now + probe),), []).append(
+                        row.id
                     )
+                    summary["deferred"] += 1
+                    continue
+                text = sequence[row.followup_step] or _followup_text(row.first_name)
+                pending.append((row, min(len(sequence), steps_total), tg_bot, text))
+
+            statuses = await asyncio.gather(
+                *[
+                    send_limited(tg_bot, row.bot_id, row.user_id, text)
+                    for row, _, tg_bot, text in pending
+                ]
+            )
 
-                    await bot.send_message(
-                        chat_id=lead.user_id, text=msg, parse_mode="HTML"
+            # Agrupa as atualizações por valores gravados: um UPDATE por grupo
+            now = datetime.now(timezone.utc)
+            unauthorized = set()
+            for (row, length, _, _), status in zip(pending, statuses):
+                summary[status] += 1
+                if status == "sent":
+                    step = row.followup_step + 1
+                    due = followup_due_at(step, now) if step < length else None
+                    values = (
+                        ("followup_step", step),
+                        ("followup_due_at", due),
+                        ("followup_attempts", 0),
                     )
-                    logger.info(f"✅ Follow-up enviado para Lead {lead.user_id}")
-
-                    lead.followup_sent = True
-
-                except Forbidden:
-                    logger.warning(f"🚫 User {lead.user_id} bloqueou o bot.")
-                    lead.followup_sent = True
-                except Exception as e:
-                    logger.error(f"❌ Erro envio: {e}")
-
-            await session.commit()
-
-    except Exception as e:
-        logger.error(f"❌ Erro fatal no Scheduler: {e}")
+                elif status == "failed":
+                    values = self._retry_values(row, now)
+                elif status in ("unauthorized", "deferred"):
+                    # Problema do bot, não do lead: volta quando o bot voltar,
+                    # sem gastar tentativas
+                    if status == "unauthorized":
+                        unauthorized.add(row.bot_id)
+                    wait = math.ceil(outbound.down_until(row.bot_id))
+                    values = (("followup_due_at", now + timedelta(seconds=wait)),)
+                else:
+                    # Bloqueou o bot ou o envio é inválido: a sequência termina
+                    values = ended
+                groups.setdefault(values, []).append(row.id)
+
+            if groups:
+                async with AsyncSessionLocal() as session:
+                    for values, ids in groups.items():
+                        values = dict(values)
+                        if "followup_step" in values:
+                            values["followup_sent"] = True
+                        # Só grava enquanto a reserva é deste disparo (a
+                        # conversão zera followup_due_at e tira o lead da fila)
+                        await session.execute(
+                            update(Lead)
+                            .where(
+                                Lead.id.in_(ids),
+                                Lead.followup_due_at == lease_until,
+                            )
+                            .values(**values)
+                            .execution_options(synchronize_session=False)
+                        )
+                    await session.commit()
+
+            for bot_id in unauthorized:
+                await TokenHealthService.quarantine(bot_id)
+
+        total = sum(summary.values())
+        if total:
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"📨 Follow-up: {summary['sent']} enviados, "
+                f"{summary['blocked'] + summary['suppressed']} bloqueados, "
+                f"{summary['rejected']} recusados, "
+                f"{summary['unauthorized'] + summary['deferred']} adiados (bot fora "
+                f"do ar), {summary['failed']} falhas em {elapsed:.1f}s."
+            )
+        return summary
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self):
+        """Relógio da wheel: um tick por segundo, no processo líder."""
+        last_refill = float("-inf")
+        while True:
+            try:
+                if not scheduler_leader.is_leader:
+                    # Outro processo cuida da fila; relê tudo ao assumir
+                    self.wheel.clear()
+                    last_refill = float("-inf")
+                elif (
+                    time.monotonic() - last_refill >= settings.FOLLOWUP_REFILL_SECONDS
+                ):
+                    await self._refill()
+                    last_refill = time.monotonic()
+
+                due = [lead_id for lead_id, _ in self.wheel.advance()]
+                if due:
+                    # Telemetria em job_runs com o nome do antigo job periódico
+                    self._spawn(JobRegistry.track("abandoned_carts", self._fire(due)))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erro na fila de follow-up: {e}")
+
+            await asyncio.sleep(self.wheel.tick - time.time() % self.wheel.tick)
+
+    async def start(self):
+        """Inicia o relógio em background (chamado no lifespan)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Encerra o relógio e os disparos em andamento."""
+        tasks = [self._task, *self._tasks] if self._task else list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+        await asyncio.gather(
+            *[bot.shutdown() for bot in self._bots.values()], return_exceptions=True
+        )
+        self._bots.clear()
+
+
+drip_engine = DripEngine()
@@ -0,0 +1,164 @@
+import logging
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+
+from src.database.base import engine
+from src.database.models import Lead
+from src.database.partitioning import (
+    add_months,
+    ensure_partitions,
+    list_partitions,
+    month_start,
+    partition_month,
+)
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    """Mantém as partições mensais e arquiva dados frios (leads e livro caixa)."""
+
+    @staticmethod
+    async def maintain_partitions():
+        """Cria antecipadamente as partições dos próximos meses."""
+        async with engine.begin() as conn:
+            await conn.run_sync(ensure_partitions, settings.PARTITION_MONTHS_AHEAD)
+
+    @staticmethod
+    async def archive_leads() -> int:
+        """
+        Move leads convertidos ou inativos para leads_archive, em lotes.
+        Partições antigas que ficarem vazias são removidas.
+
+        Returns:
+            Quantidade de leads arquivados
+        """
+        if engine.dialect.name != "postgresql":
+            return 0
+
+        now = datetime.now()
+        converted_cutoff = now - timedelta(days=settings.LEAD_ARCHIVE_CONVERTED_DAYS)
+        stale_cutoff = now - timedelta(days=settings.LEAD_ARCHIVE_STALE_DAYS)
+
+        # Lista explícita: colunas novas em leads entram no fim de
+        # leads_archive (depois de archived_at)
+        columns = ", ".join(column.name for column in Lead.__table__.columns)
+        move_sql = text(
+            "WITH moved AS ("
+            "  DELETE FROM leads WHERE (id, created_at) IN ("
+            "    SELECT id, created_at FROM leads"
+            "    WHERE (is_converted AND last_interaction < :converted_cutoff)"
+            "       OR last_interaction < :stale_cutoff"
+            "    LIMIT :batch"
+            "  ) RETURNING *"
+            f") INSERT INTO leads_archive ({columns}) SELECT {columns} FROM moved"
+        )
+        params = {
+            "converted_cutoff": converted_cutoff,
+            "stale_cutoff": stale_cutoff,
+            "batch": settings.ARCHIVE_BATCH_SIZE,
+        }
+
+        total = 0
+        while True:
+            # Um commit por lote para não segurar locks por muito tempo
+            async with engine.begin() as conn:
+                result = await conn.execute(move_sql, params)
+            total += result.rowcount
+            if result.rowcount < settings.ARCHIVE_BATCH_SIZE:
+                break
+
+        await ArchiveService._drop_empty_lead_partitions()
+
+        logger.info(f"📦 Arquivo: {total} leads movidos para leads_archive.")
+        return total
+
+    @staticmethod
+    async def _drop_empty_lead_partitions():
+        """Remove partições de meses passados que não têm mais leads."""
+        current = month_start(date.today())
+
+        async with engine.begin() as conn:
+            partitions = await conn.run_sync(list_partitions, "leads")
+            for name in partitions:
+                month = partition_month(name)
+                if not month or month >= current:
+                    continue
+
+                has_rows = await conn.execute(text(f"SELECT 1 FROM {name} LIMIT 1"))
+                if has_rows.first() is None:
+                    await conn.execute(
+                        text(f"ALTER TABLE leads DETACH PARTITION {name}")
+                    )
+                    await conn.execute(text(f"DROP TABLE {name}"))
+
+    @staticmethod
+    async def close_ledger_periods() -> int:
+        """
+        Encerra meses antigos do livro caixa.
+
+        Para cada mês encerrado grava o saldo consolidado por usuário em
+        ledger_snapshots e move a partição para transactions_archive, tudo na
+        mesma transação. O saldo (FinanceService.get_balance) passa a somar
+        os snapshots e só as partições abertas.
+
+        Returns:
+            Quantidade de meses encerrados
+        """
+        if engine.dialect.name != "postgresql":
+            return 0
+
+        # Cobranças pendentes (valor 0) do período precisam já ter vencido
+        close_before = month_start(
+            date.today() - timedelta(days=settings.LEDGER_CLOSE_AFTER_DAYS)
+        )
+
+        async with engine.begin() as conn:
+            partitions = await conn.run_sync(list_partitions, "transactions")
+
+        closed = 0
+        for name in partitions:
+            start = partition_month(name)
+            if not start or add_months(start, 1) > close_before:
+                continue
+
+            end = add_months(start, 1)
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        "INSERT INTO ledger_snapshots "
+                        "(user_id, period_start, period_end, balance, created_at) "
+                        f"SELECT user_id, :start, :end, SUM(amount), now() FROM {name} "
+                        "WHERE user_id IS NOT NULL GROUP BY user_id "
+                        "ON CONFLICT (user_id, period_start) DO NOTHING"
+                    ),
+                    {"start": start, "end": end},
+                )
+                await conn.execute(
+                    text(f"ALTER TABLE transactions DETACH PARTITION {name}")
+                )
+                await conn.execute(
+                    text(
+                        f"ALTER TABLE transactions_archive ATTACH PARTITION {name} "
+                        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                    )
+                )
+            closed += 1
+
+        if closed:
+            logger.info(f"📦 Arquivo: {closed} período(s) do livro caixa encerrado(s).")
+        return closed
+
+    @staticmethod
+    async def run_archival() -> dict:
+        """
+        Executa a manutenção completa (partições, leads e livro caixa).
+
+        Returns:
+            Dict com leads arquivados e meses do livro caixa encerrados
+        """
+        await ArchiveService.maintain_partitions()
+        leads = await ArchiveService.archive_leads()
+        periods = await ArchiveService.close_ledger_periods()
+        return {"leads": leads, "periods": periods}
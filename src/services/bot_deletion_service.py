@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import BigInteger, column, delete, func, table, tuple_, update
+from sqlalchemy.future import select
+from telegram import Bot as TgBot
+from telegram.error import TelegramError
+
+from src.database.base import AsyncSessionLocal, engine, mark_write
+from src.database.models import (
+    Bot,
+    Campaign,
+    Plan,
+    Lead,
+    Subscription,
+    Suppression,
+    Transaction,
+)
+from src.core.config import settings
+from src.utils.rate_limit import MAIN_BOT, outbound
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre edições da mensagem de progresso (segundos)
+PROGRESS_INTERVAL = 5.0
+
+_run_lock = asyncio.Lock()
+
+# Partições de períodos encerrados do livro caixa (ver ArchiveService): ao
+# sair de transactions elas mantêm a FK para bots
+_transactions_archive = table(
+    "transactions_archive",
+    column("id", BigInteger),
+    column("created_at"),
+    column("bot_id", BigInteger),
+)
+
+
+class BotDeletionService:
+    """
+    Exclusão de bots em duas etapas.
+
+    O handler apenas marca o bot como excluído (soft-delete), o que o tira do
+    ar imediatamente. Os dados dependentes são removidos em background, em
+    lotes pelo índice de bot_id e com transações curtas, sem carregar as
+    linhas na memória nem segurar locks longos.
+    """
+
+    @staticmethod
+    async def soft_delete(bot_id: int, owner_id: int) -> bool:
+        """
+        Marca o bot do dono como excluído e o desativa.
+
+        Returns:
+            True se o bot foi marcado, False se não existe ou não pertence ao dono
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Bot).filter(
+                    Bot.id == bot_id,
+                    Bot.owner_id == owner_id,
+                    Bot.deleted_at == None,
+                )
+            )
+            bot = result.scalars().first()
+            if not bot:
+                return False
+
+            bot.deleted_at = func.now()
+            bot.is_active = False
+            await session.commit()
+            return True
+
+    @staticmethod
+    def _steps(bot_id: int, limit: int) -> list:
+        """
+        Etapas da limpeza, na ordem exigida pelas FKs.
+
+        Cada statement processa um lote; as transações são mantidas no livro
+        caixa (o saldo do dono não muda), apenas desvinculadas do bot, inclusive
+        as já arquivadas em transactions_archive (somente Postgres).
+        """
+
+        def chunk(model):
+            return select(model.id).where(model.bot_id == bot_id).limit(limit)
+
+        steps = [
+            delete(Suppression).where(
+                Suppression.bot_id == bot_id,
+                Suppression.user_id.in_(
+                    select(Suppression.user_id)
+                    .where(Suppression.bot_id == bot_id)
+                    .limit(limit)
+                ),
+            ),
+            delete(Campaign).where(Campaign.id.in_(chunk(Campaign))),
+            delete(Subscription).where(Subscription.id.in_(chunk(Subscription))),
+            delete(Lead).where(Lead.id.in_(chunk(Lead))),
+            update(Transaction)
+            .where(Transaction.id.in_(chunk(Transaction)))
+            .values(bot_id=None),
+            delete(Plan).where(Plan.id.in_(chunk(Plan))),
+        ]
+
+        if engine.dialect.name == "postgresql":
+            archive = _transactions_archive
+            steps.insert(
+                -1,
+                update(archive)
+                .where(
+                    archive.c.bot_id == bot_id,
+                    tuple_(archive.c.id, archive.c.created_at).in_(
+                        select(archive.c.id, archive.c.created_at)
+                        .where(archive.c.bot_id == bot_id)
+                        .limit(limit)
+                    ),
+                )
+                .values(bot_id=None),
+            )
+        return steps
+
+    @staticmethod
+    async def _count_children(bot_id: int) -> int:
+        """Total de linhas dependentes do bot (base do percentual de progresso)."""
+        async with AsyncSessionLocal() as session:
+            total = 0
+            for model in (Suppression, Campaign, Subscription, Lead, Transaction, Plan):
+                result = await session.execute(
+                    select(func.count())
+                    .select_from(model)
+                    .where(model.bot_id == bot_id)
+                )
+                total += result.scalar() or 0
+
+            if engine.dialect.name == "postgresql":
+                result = await session.execute(
+                    select(func.count())
+                    .select_from(_transactions_archive)
+                    .where(_transactions_archive.c.bot_id == bot_id)
+                )
+                total += result.scalar() or 0
+            return total
+
+    @staticmethod
+    async def _report(notify_bot: TgBot, bot: Bot, text: str, message=None):
+        """Envia (ou atualiza) a mensagem de progresso para o dono."""
+        if not notify_bot:
+            return None
+
+        try:
+            if message:
+                return await outbound.send(
+                    MAIN_BOT,
+                    bot.owner_id,
+                    lambda: notify_bot.edit_message_text(
+                        chat_id=bot.owner_id,
+                        message_id=message.message_id,
+                        text=text,
+                        parse_mode="HTML",
+                    ),
+                )
+            return await outbound.send(
+                MAIN_BOT,
+                bot.owner_id,
+                lambda: notify_bot.send_message(
+                    chat_id=bot.owner_id, text=text, parse_mode="HTML"
+                ),
+            )
+        except TelegramError:
+            return message
+
+    @staticmethod
+    async def purge_bot(bot: Bot, notify_bot: TgBot = None) -> int:
+        """
+        Remove em lotes os dados de um bot marcado como excluído e, por fim,
+        o próprio bot.
+
+        Returns:
+            Quantidade de linhas dependentes processadas
+        """
+        total = await BotDeletionService._count_children(bot.id)
+        done = 0
+
+        message = await BotDeletionService._report(
+            notify_bot, bot, f"🗑 Excluindo <b>{bot.name}</b>...\n\n0/{total} registros"
+        )
+        last_report = time.monotonic()
+
+        for stmt in BotDeletionService._steps(bot.id, settings.BOT_DELETE_CHUNK_SIZE):
+            while True:
+                async with AsyncSessionLocal() as session:
+                    result = await session.execute(
+                        stmt, execution_options={"synchronize_session": False}
+                    )
+                    await session.commit()
+
+                if not result.rowcount:
+                    break
+                done += result.rowcount
+
+                if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                    percent = done * 100 // total if total else 100
+                    message = await BotDeletionService._report(
+                        notify_bot,
+                        bot,
+                        f"🗑 Excluindo <b>{bot.name}</b>...\n\n"
+                        f"{done}/{total} registros ({percent}%)",
+                        message,
+                    )
+                    last_report = time.monotonic()
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Bot).where(Bot.id == bot.id))
+            await session.commit()
+
+        mark_write(("user", bot.owner_id), ("bot", bot.id))
+
+        await BotDeletionService._report(
+            notify_bot,
+            bot,
+            f"✅ Bot <b>{bot.name}</b> excluído.\n\n{done} registros removidos.",
+            message,
+        )
+        return done
+
+    @staticmethod
+    async def purge_deleted_bots(notify_bot: TgBot = None) -> int:
+        """
+        Processa todos os bots marcados como excluídos, um por vez.
+
+        Também retoma exclusões interrompidas (ex: reinício do processo).
+
+        Returns:
+            Quantidade de bots removidos
+        """
+        if _run_lock.locked():
+            # A execução atual também pega os bots marcados depois dela
+            return 0
+
+        purged = 0
+        failed = set()
+        async with _run_lock:
+            while True:
+                async with AsyncSessionLocal() as session:
+                    result = await session.execute(
+                        select(Bot)
+                        .filter(Bot.deleted_at != None, Bot.id.notin_(failed))
+                        .order_by(Bot.deleted_at)
+                        .limit(1)
+                    )
+                    bot = result.scalars().first()
+
+                if not bot:
+                    break
+
+                try:
+                    done = await BotDeletionService.purge_bot(bot, notify_bot)
+                    purged += 1
+                    logger.info(f"🗑 Bot {bot.id} excluído ({done} registros).")
+                except Exception as e:
+                    # Continua marcado; será retomado na próxima execução
+                    failed.add(bot.id)
+                    logger.error(f"❌ Erro ao excluir bot {bot.id}: {e}")
+
+        return purged
@@ -111,7 +111,12 @@ class BotService:
         """
         async with AsyncSessionLocal() as session:
             result = await session.execute(select(Bot).filter(Bot.token == token))
-            if result.scalars().first():
+            existing = result.scalars().first()
+            if existing and existing.deleted_at:
+                raise ValueError(
+                    "Este bot ainda está sendo excluído. Tente novamente em alguns minutos."
+                )
+            if existing:
                 raise ValueError("Este bot já está cadastrado!")
 
             new_bot = Bot(
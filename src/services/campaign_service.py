@@ -0,0 +1,477 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+from telegram import Bot as TgBot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import TelegramError
+
+from src.bot.callbacks import CANCEL_CAMPAIGN
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal, read_session
+from src.database.leader import scheduler_leader
+from src.database.models import Bot, Campaign, Lead, Subscription
+from src.services.token_health_service import TokenHealthService
+from src.utils.rate_limit import MAIN_BOT, Priority, outbound, send_limited
+
+logger = logging.getLogger(__name__)
+
+AUDIENCES = {"leads": "todos os leads", "subscribers": "assinantes ativos"}
+
+# Status que não contam como envio nem como falha
+SKIPPED = ("blocked", "suppressed", "rejected")
+
+
+class CampaignService:
+    """Criação, cancelamento e destinatários das campanhas dos donos."""
+
+    @staticmethod
+    def _recipients(bot_id: int, audience: str):
+        """Select dos user_ids do público, sem repetição."""
+        if audience == "subscribers":
+            column = Subscription.subscriber_id
+            query = select(column).where(
+                Subscription.bot_id == bot_id, Subscription.is_active == True
+            )
+        else:
+            column = Lead.user_id
+            query = select(column).where(Lead.bot_id == bot_id)
+        return query, column
+
+    @staticmethod
+    async def count_recipients(bot_id: int, audience: str) -> int:
+        """Tamanho do público (exibido na confirmação)."""
+        query, column = CampaignService._recipients(bot_id, audience)
+        async with read_session(("bot", bot_id)) as session:
+            result = await session.execute(
+                select(func.count()).select_from(query.distinct().subquery())
+            )
+            return result.scalar() or 0
+
+    @staticmethod
+    async def next_chunk(campaign: Campaign, limit: int) -> list:
+        """
+        Próximos destinatários depois do checkpoint (keyset por user_id):
+        cada lote é uma leitura curta no índice, sem OFFSET e sem cursor
+        aberto durante os envios.
+        """
+        query, column = CampaignService._recipients(campaign.bot_id, campaign.audience)
+        async with read_session() as session:
+            result = await session.execute(
+                query.where(column > campaign.last_user_id)
+                .distinct()
+                .order_by(column)
+                .limit(limit)
+            )
+            return list(result.scalars())
+
+    @staticmethod
+    async def owned_bot(bot_id: int, owner_id: int):
+        """Bot do dono (não excluído), ou None se não pertence a ele."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Bot).where(
+                    Bot.id == bot_id,
+                    Bot.owner_id == owner_id,
+                    Bot.deleted_at == None,
+                )
+            )
+            return result.scalars().first()
+
+    @staticmethod
+    async def running_for(bot_id: int):
+        """Campanha em andamento do bot, se houver."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Campaign).where(
+                    Campaign.bot_id == bot_id, Campaign.status == "running"
+                )
+            )
+            return result.scalars().first()
+
+    @staticmethod
+    async def create(bot_id: int, owner_id: int, audience: str, text: str):
+        """
+        Cria a campanha (uma por bot por vez, garantido pelo índice único
+        parcial ux_campaigns_bot_running). O envio começa no processo líder
+        (CampaignRunner).
+
+        Returns:
+            Tupla (campanha, motivo): campanha None com motivo "not_owner"
+            (o bot não é do dono) ou "running" (já há uma em andamento)
+        """
+        if not await CampaignService.owned_bot(bot_id, owner_id):
+            logger.warning(f"⚠️ Campanha negada: bot {bot_id} não é de {owner_id}.")
+            return None, "not_owner"
+        if await CampaignService.running_for(bot_id):
+            return None, "running"
+
+        total = await CampaignService.count_recipients(bot_id, audience)
+        async with AsyncSessionLocal() as session:
+            campaign = Campaign(
+                bot_id=bot_id,
+                owner_id=owner_id,
+                audience=audience,
+                text=text,
+                status="running",
+                total=total,
+            )
+            session.add(campaign)
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Outra confirmação criou a campanha entre a checagem e o INSERT
+                return None, "running"
+            await session.refresh(campaign)
+
+        logger.info(f"📣 Campanha {campaign.id} criada: bot {bot_id}, {total} destinatários.")
+        return campaign, None
+
+    @staticmethod
+    async def cancel(campaign_id: int, owner_id: int) -> bool:
+        """Cancela a campanha do dono; o envio para no próximo lote."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Campaign)
+                .where(
+                    Campaign.id == campaign_id,
+                    Campaign.owner_id == owner_id,
+                    Campaign.status == "running",
+                )
+                .values(status="cancelled", finished_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            return bool(result.rowcount)
+
+    @staticmethod
+    def progress_text(campaign: Campaign) -> str:
+        done = campaign.sent + campaign.skipped + campaign.failed
+        percent = done * 100 // campaign.total if campaign.total else 100
+        status = {
+            "running": "⏳ Enviando...",
+            "done": "✅ Concluída",
+            "cancelled": "⏹ Cancelada",
+        }[campaign.status]
+        return (
+            f"<b>📣 Campanha para {AUDIENCES[campaign.audience]}</b>\n"
+            f"{status}\n\n"
+            f"{done}/{campaign.total} processados ({min(percent, 100)}%)\n"
+            f"✅ {campaign.sent} enviados\n"
+            f"🚫 {campaign.skipped} bloqueados ou inválidos\n"
+            f"❌ {campaign.failed} falhas"
+        )
+
+    @staticmethod
+    def progress_keyboard(campaign: Campaign):
+        if campaign.status != "running":
+            return None
+        return InlineKeyboardMarkup(
+            [
+                [
+                    InlineKeyboardButton(
+                        "⏹ Cancelar Campanha",
+                        callback_data=CANCEL_CAMPAIGN(campaign.id),
+                    )
+                ]
+            ]
+        )
+
+
+class CampaignRunner:
+    """
+    Envia as campanhas em andamento, no processo líder.
+
+    Cada campanha lê os destinatários em lotes de CAMPAIGN_CHUNK_SIZE pela
+    ordem de user_id, envia pelo dispatcher com prioridade de marketing (não
+    atrasa entregas de pagamento nem respostas) e grava contadores e
+    checkpoint num UPDATE condicional ao fim de cada lote. Se a campanha foi
+    cancelada ou o processo reiniciou, ela para ou continua do último
+    checkpoint; no pior caso um lote é reenviado. O UPDATE também confere o
+    checkpoint anterior: se outro líder já avançou a campanha, este para. O dono acompanha por uma
+    mensagem editada a cada CAMPAIGN_REPORT_SECONDS.
+    """
+
+    def __init__(self):
+        self._running = {}  # campaign_id -> Task
+        self._bots = {}  # token -> TgBot
+        self._notify_bot = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def wake(self):
+        """Procura campanhas novas agora (chamado após criar uma)."""
+        self._wakeup.set()
+
+    async def _report(self, campaign: Campaign):
+        """Envia ou edita o contador de progresso no chat do dono."""
+        if not self._notify_bot:
+            return
+
+        bot = self._notify_bot
+        text = CampaignService.progress_text(campaign)
+        markup = CampaignService.progress_keyboard(campaign)
+        try:
+            if campaign.progress_message_id:
+                await outbound.send(
+                    MAIN_BOT,
+                    campaign.owner_id,
+                    lambda: bot.edit_message_text(
+                        chat_id=campaign.owner_id,
+                        message_id=campaign.progress_message_id,
+                        text=text,
+                        reply_markup=markup,
+                        parse_mode="HTML",
+                    ),
+                )
+                return
+
+            message = await outbound.send(
+                MAIN_BOT,
+                campaign.owner_id,
+                lambda: bot.send_message(
+                    chat_id=campaign.owner_id,
+                    text=text,
+                    reply_markup=markup,
+                    parse_mode="HTML",
+                ),
+            )
+        except TelegramError as e:
+            logger.debug(f"Progresso da campanha {campaign.id} não atualizado: {e}")
+            return
+
+        campaign.progress_message_id = message.message_id
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Campaign)
+                .where(Campaign.id == campaign.id)
+                .values(progress_message_id=message.message_id)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    async def _checkpoint(
+        self, campaign: Campaign, last_user_id: int, counts: dict, done: bool = False
+    ) -> bool:
+        """
+        Grava os contadores e o checkpoint do lote. Returns False se a
+        campanha não está mais em andamento (cancelada ou bot excluído) ou se
+        o checkpoint já foi movido por outro processo (troca de líder).
+        """
+        values = {
+            "last_user_id": last_user_id,
+            "sent": Campaign.sent + counts["sent"],
+            "skipped": Campaign.skipped + counts["skipped"],
+            "failed": Campaign.failed + counts["failed"],
+        }
+        if done:
+            values["status"] = "done"
+            values["finished_at"] = func.now()
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Campaign)
+                .where(
+                    Campaign.id == campaign.id,
+                    Campaign.status == "running",
+                    Campaign.last_user_id == campaign.last_user_id,
+                )
+                .values(**values)
+                .returning(Campaign.sent, Campaign.skipped, Campaign.failed)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            await session.commit()
+
+        if not row:
+            return False
+        campaign.sent, campaign.skipped, campaign.failed = row
+        campaign.last_user_id = last_user_id
+        if done:
+            campaign.status = "done"
+        return True
+
+    @staticmethod
+    def _tally(campaign: Campaign, user_ids: list, statuses: list) -> tuple:
+        """
+        Contadores e checkpoint de um lote. Se o bot saiu do ar, o checkpoint
+        para antes do primeiro destinatário não atendido.
+
+        Returns:
+            (last_user_id, counts, bot_down)
+        """
+        counts = {"sent": 0, "skipped": 0, "failed": 0}
+        last_user_id = campaign.last_user_id
+        for user_id, status in zip(user_ids, statuses):
+            if status in ("unauthorized", "deferred"):
+                return last_user_id, counts, True
+            last_user_id = user_id
+            if status == "sent":
+                counts["sent"] += 1
+            elif status in SKIPPED:
+                counts["skipped"] += 1
+            else:
+                counts["failed"] += 1
+        return last_user_id, counts, False
+
+    async def _reload(self, campaign_id: int):
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Campaign).where(Campaign.id == campaign_id)
+            )
+            return result.scalars().first()
+
+    async def _stopped(self, campaign_id: int):
+        """Campanha cancelada durante o envio: atualiza o contador do dono."""
+        campaign = await self._reload(campaign_id)
+        if campaign:
+            await self._report(campaign)
+
+    async def _run_campaign(self, campaign_id: int, token: str):
+        campaign = await self._reload(campaign_id)
+        if not campaign or campaign.status != "running":
+            return
+
+        if token not in self._bots:
+            self._bots[token] = TgBot(token)
+        tg_bot = self._bots[token]
+
+        await self._report(campaign)
+        last_report = time.monotonic()
+
+        while True:
+            if not scheduler_leader.is_leader:
+                # O novo líder continua do checkpoint
+                return
+
+            user_ids = await CampaignService.next_chunk(
+                campaign, settings.CAMPAIGN_CHUNK_SIZE
+            )
+            if not user_ids:
+                counts = {"sent": 0, "skipped": 0, "failed": 0}
+                if await self._checkpoint(
+                    campaign, campaign.last_user_id, counts, done=True
+                ):
+                    break
+                await self._stopped(campaign_id)
+                return
+
+            sends = [
+                asyncio.ensure_future(
+                    send_limited(
+                        tg_bot, campaign.bot_id, user_id, campaign.text, Priority.MARKETING
+                    )
+                )
+                for user_id in user_ids
+            ]
+            try:
+                statuses = await asyncio.gather(*sends)
+            except asyncio.CancelledError:
+                # Encerramento no meio do lote: grava os envios já concluídos
+                # (em ordem), para que o próximo líder não os repita
+                finished = []
+                for send in sends:
+                    if not send.done() or send.cancelled():
+                        break
+                    finished.append(send.result())
+                last_user_id, counts, _ = self._tally(campaign, user_ids, finished)
+                await self._checkpoint(campaign, last_user_id, counts)
+                raise
+
+            last_user_id, counts, bot_down = self._tally(campaign, user_ids, statuses)
+            if not await self._checkpoint(campaign, last_user_id, counts):
+                await self._stopped(campaign_id)
+                return
+
+            if bot_down:
+                await self._report(campaign)
+                if "unauthorized" in statuses:
+                    await TokenHealthService.quarantine(campaign.bot_id)
+                # Bots em quarentena ficam fora do _poll; a campanha continua
+                # quando o token voltar
+                await asyncio.sleep(outbound.down_until(campaign.bot_id))
+                return
+
+            if time.monotonic() - last_report >= settings.CAMPAIGN_REPORT_SECONDS:
+                await self._report(campaign)
+                last_report = time.monotonic()
+
+        await self._report(campaign)
+        logger.info(
+            f"📣 Campanha {campaign.id} concluída: {campaign.sent} enviados, "
+            f"{campaign.skipped} sem envio, {campaign.failed} falhas."
+        )
+
+    def _cancel_all(self):
+        for task in self._running.values():
+            task.cancel()
+
+    async def _poll(self):
+        """Inicia as campanhas em andamento que ainda não estão rodando."""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Campaign.id, Bot.token)
+                .join(Bot, Bot.id == Campaign.bot_id)
+                .where(
+                    Campaign.status == "running",
+                    Bot.deleted_at == None,
+                    Bot.token_invalid_at == None,
+                )
+            )
+            rows = result.all()
+
+        for campaign_id, token in rows:
+            if campaign_id in self._running:
+                continue
+            task = asyncio.create_task(self._run_campaign(campaign_id, token))
+            self._running[campaign_id] = task
+            task.add_done_callback(
+                lambda _, campaign_id=campaign_id: self._running.pop(campaign_id, None)
+            )
+
+    async def _run(self):
+        while True:
+            try:
+                if scheduler_leader.is_leader:
+                    await self._poll()
+                elif self._running:
+                    # Outro processo assumiu: ele continua do checkpoint
+                    self._cancel_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erro no envio de campanhas: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), settings.CAMPAIGN_POLL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self, notify_bot: TgBot = None):
+        """Inicia o runner em background (chamado no lifespan)."""
+        self._notify_bot = notify_bot
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Encerra o runner; as campanhas continuam do checkpoint no próximo líder."""
+        tasks = [self._task, *self._running.values()] if self._task else list(
+            self._running.values()
+        )
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+        await asyncio.gather(
+            *[bot.shutdown() for bot in self._bots.values()], return_exceptions=True
+        )
+        self._bots.clear()
+
+
+campaign_runner = CampaignRunner()
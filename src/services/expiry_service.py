@@ -0,0 +1,342 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.future import select
+from telegram import Bot as TgBot
+from telegram.error import Forbidden, InvalidToken, TelegramError
+
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal, mark_write, read_session
+from src.database.leader import scheduler_leader
+from src.database.models import Subscription, Bot
+from src.services.job_registry import JobRegistry
+from src.services.suppression_service import SuppressionService
+from src.services.token_health_service import TokenHealthService
+from src.utils.rate_limit import outbound
+
+logger = logging.getLogger(__name__)
+
+EXPIRED_TEXT = (
+    "<b>⛔ Seu plano venceu!</b>\n\n"
+    "Você foi removido do Grupo VIP. Renove agora para voltar."
+)
+
+
+class ExpiryScheduler:
+    """
+    Expira assinaturas no horário exato do vencimento.
+
+    O processo líder mantém em um min-heap as próximas EXPIRY_HEAP_SIZE
+    datas de término (índice parcial de assinaturas ativas) e dorme até a
+    primeira delas. Ao vencer, a assinatura é reservada com um UPDATE
+    condicional (renovações feitas nesse meio tempo não expiram) e o usuário
+    é removido do grupo e avisado, em paralelo e dentro dos limites do
+    Telegram. O heap é relido a cada EXPIRY_REFRESH_SECONDS ou quando esvazia.
+
+    A assinatura só é desativada depois da remoção: a reserva
+    (expiring_until, EXPIRY_CLAIM_LEASE_SECONDS) impede outra remoção
+    simultânea e, se a remoção for interrompida (deploy, troca de líder),
+    vence e a assinatura volta a ser expirada na próxima leitura. Remoções
+    que falham (sem permissão no grupo, erro do Telegram) são adiadas com
+    backoff exponencial até EXPIRY_RETRY_MAX_MINUTES; reservadas ou
+    adiadas, as assinaturas ficam fora do heap.
+    """
+
+    def __init__(self):
+        self._heap = []  # (término em epoch, subscription_id)
+        self._complete = False  # True se o heap contém todas as ativas
+        self._backlog = False  # True se a última leitura só trouxe vencidas
+        self._bots = {}  # token -> TgBot
+        self._tasks = set()
+        self._task = None
+
+    async def _refresh(self):
+        """Recarrega o heap com as próximas assinaturas a vencer."""
+        now = datetime.now()
+        async with read_session() as session:
+            result = await session.execute(
+                select(Subscription.id, Subscription.end_date)
+                .join(Bot, Bot.id == Subscription.bot_id)
+                .where(
+                    Subscription.is_active == True,
+                    Subscription.end_date != None,
+                    # Sem remoção em andamento ou adiada após falha
+                    or_(
+                        Subscription.expiring_until == None,
+                        Subscription.expiring_until <= now,
+                    ),
+                    # Bots em quarentena não conseguem remover ninguém: as
+                    # assinaturas vencem quando o token voltar
+                    Bot.token_invalid_at == None,
+                )
+                .order_by(Subscription.end_date)
+                .limit(settings.EXPIRY_HEAP_SIZE)
+            )
+            rows = result.all()
+
+        # Datas sem fuso (SQLite) foram gravadas com o horário local
+        self._heap = [(end_date.timestamp(), sub_id) for sub_id, end_date in rows]
+        heapq.heapify(self._heap)
+        self._complete = len(rows) < settings.EXPIRY_HEAP_SIZE
+        self._backlog = bool(self._heap) and max(self._heap)[0] <= time.time()
+
+    async def _claim(self, subscription_ids: list) -> tuple:
+        """
+        Reserva as assinaturas ainda ativas, vencidas e sem remoção em
+        andamento.
+
+        Returns:
+            Tupla (fim da reserva, linhas reservadas)
+        """
+        now = datetime.now()
+        lease_until = now + timedelta(seconds=settings.EXPIRY_CLAIM_LEASE_SECONDS)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Subscription)
+                .where(
+                    Subscription.id.in_(subscription_ids),
+                    Subscription.is_active == True,
+                    Subscription.end_date <= now,
+                    or_(
+                        Subscription.expiring_until == None,
+                        Subscription.expiring_until <= now,
+                    ),
+                    Subscription.bot_id.notin_(
+                        select(Bot.id).where(Bot.token_invalid_at != None)
+                    ),
+                )
+                .values(expiring_until=lease_until)
+                .returning(
+                    Subscription.id,
+                    Subscription.subscriber_id,
+                    Subscription.bot_id,
+                    Subscription.expiry_attempts,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            await session.commit()
+            return lease_until, rows
+
+    async def _settle(self, lease_until: datetime, rows: list) -> int:
+        """
+        Desativa as assinaturas removidas do grupo, enquanto a reserva ainda
+        é deste lote.
+
+        Returns:
+            Quantidade de assinaturas desativadas
+        """
+        if not rows:
+            return 0
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Subscription)
+                .where(
+                    Subscription.id.in_([row.id for row in rows]),
+                    Subscription.expiring_until == lease_until,
+                )
+                .values(is_active=False, expiring_until=None, expiry_attempts=0)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        # Público "assinantes ativos" das campanhas (ver CampaignService)
+        mark_write(*{("bot", row.bot_id) for row in rows})
+        return result.rowcount
+
+    async def _defer(self, lease_until: datetime, rows: list):
+        """
+        Adia as remoções que falharam: a reserva vira a espera da próxima
+        tentativa, com backoff exponencial.
+        """
+        if not rows:
+            return
+
+        groups = {}
+        for row in rows:
+            groups.setdefault((row.expiry_attempts or 0) + 1, []).append(row.id)
+
+        now = datetime.now()
+        async with AsyncSessionLocal() as session:
+            for attempts, ids in groups.items():
+                minutes = min(
+                    settings.EXPIRY_RETRY_MINUTES * 2 ** (attempts - 1),
+                    settings.EXPIRY_RETRY_MAX_MINUTES,
+                )
+                await session.execute(
+                    update(Subscription)
+                    .where(
+                        Subscription.id.in_(ids),
+                        Subscription.expiring_until == lease_until,
+                    )
+                    .values(
+                        expiring_until=now + timedelta(minutes=minutes),
+                        expiry_attempts=attempts,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+
+    async def _remove_member(self, tg_bot: TgBot, bot_id: int, group_id, user_id):
+        """
+        Remove o usuário do grupo (ban + unban) e avisa no privado, se ele
+        não bloqueou o bot.
+
+        Returns:
+            "removed", "unauthorized" (token rejeitado) ou "failed"
+        """
+        try:
+            if group_id:
+                await outbound.send(
+                    bot_id,
+                    None,
+                    lambda: tg_bot.ban_chat_member(chat_id=group_id, user_id=user_id),
+                )
+                await outbound.send(
+                    bot_id,
+                    None,
+                    lambda: tg_bot.unban_chat_member(chat_id=group_id, user_id=user_id),
+                )
+            if await SuppressionService.is_suppressed(bot_id, user_id):
+                return "removed"
+            await outbound.send(
+                bot_id,
+                user_id,
+                lambda: tg_bot.send_message(
+                    chat_id=user_id, text=EXPIRED_TEXT, parse_mode="HTML"
+                ),
+            )
+            return "removed"
+        except Forbidden:
+            # Removido do grupo, mas bloqueou o bot: sem aviso
+            await SuppressionService.suppress(bot_id, user_id)
+            return "removed"
+        except InvalidToken:
+            await TokenHealthService.quarantine(bot_id)
+            return "unauthorized"
+        except TelegramError as e:
+            logger.error(f"❌ Erro ao remover user {user_id}: {e}")
+            return "failed"
+
+    async def _expire(self, subscription_ids: list) -> dict:
+        """Processa um lote de assinaturas vencidas."""
+        summary = {"expired": 0, "failed": 0}
+        lease_until, rows = await self._claim(subscription_ids)
+        if not rows:
+            return summary
+
+        # Principal: bot ausente numa réplica atrasada deixaria a remoção
+        # para depois da reserva
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Bot.id, Bot.token, Bot.group_id).where(
+                    Bot.id.in_({row.bot_id for row in rows})
+                )
+            )
+            bots = {bot_id: (token, group_id) for bot_id, token, group_id in result}
+
+        removals = []
+        for row in rows:
+            if row.bot_id not in bots:
+                continue
+            token, group_id = bots[row.bot_id]
+            if token not in self._bots:
+                self._bots[token] = TgBot(token)
+            removals.append(
+                (
+                    row,
+                    self._remove_member(
+                        self._bots[token], row.bot_id, group_id, row.subscriber_id
+                    ),
+                )
+            )
+
+        results = await asyncio.gather(*[removal for _, removal in removals])
+        statuses = [(row, status) for (row, _), status in zip(removals, results)]
+        removed = [row for row, status in statuses if status == "removed"]
+        failed = [row for row, status in statuses if status == "failed"]
+        summary["expired"] = await self._settle(lease_until, removed)
+        # Token rejeitado: a reserva vence e o bot em quarentena fica fora do
+        # heap até o token voltar, sem gastar tentativas
+        await self._defer(lease_until, failed)
+        summary["failed"] = len(rows) - len(removed)
+        logger.info(
+            f"⛔ Expiração: {summary['expired']} assinaturas, "
+            f"{summary['failed']} falhas de remoção."
+        )
+        return summary
+
+    async def _run(self):
+        next_refresh = 0.0
+        while True:
+            delay = settings.LEADER_CHECK_SECONDS
+            try:
+                if not scheduler_leader.is_leader:
+                    self._heap = []
+                    next_refresh = 0.0
+                else:
+                    if time.monotonic() >= next_refresh:
+                        await self._refresh()
+                        next_refresh = time.monotonic() + settings.EXPIRY_REFRESH_SECONDS
+
+                    now = time.time()
+                    due = []
+                    while self._heap and self._heap[0][0] <= now:
+                        due.append(heapq.heappop(self._heap)[1])
+                    if due:
+                        # As remoções não atrasam os próximos vencimentos;
+                        # telemetria com o nome do antigo job periódico
+                        task = asyncio.create_task(
+                            JobRegistry.track(
+                                "expired_subscriptions", self._expire(due)
+                            )
+                        )
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+
+                        if not self._heap and not self._complete:
+                            # Havia mais assinaturas além do heap: relê agora,
+                            # ou, se a leitura só trouxe vencidas, depois que
+                            # o lote disparado as reservou (reservadas não
+                            # voltam ao heap)
+                            next_refresh = (
+                                time.monotonic() + settings.LEADER_CHECK_SECONDS
+                                if self._backlog
+                                else 0.0
+                            )
+
+                    delay = next_refresh - time.monotonic()
+                    if self._heap:
+                        delay = min(delay, self._heap[0][0] - time.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erro no agendador de expiração: {e}")
+
+            await asyncio.sleep(max(delay, 0.05))
+
+    async def start(self):
+        """Inicia o agendador em background (chamado no lifespan)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Encerra o agendador e as remoções em andamento."""
+        tasks = [self._task, *self._tasks] if self._task else list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+        await asyncio.gather(
+            *[bot.shutdown() for bot in self._bots.values()], return_exceptions=True
+        )
+        self._bots.clear()
+
+
+expiry_scheduler = ExpiryScheduler()
@@ -1,9 +1,10 @@
 from sqlalchemy.future import select
 from sqlalchemy import func, desc
-from src.database.base import AsyncSessionLocal
+from src.database.base import AsyncSessionLocal, read_session
 from src.database.models import (
     Transaction,
     TransactionType,
+    LedgerSnapshot,
     Withdrawal,
     WithdrawalStatus,
 )
@@ -33,14 +34,34 @@ class FinanceService:
         return round(final_fee, 2)
 
     @staticmethod
-    async def get_balance(user_id: int) -> float:
-        """Retorna o saldo atual do usuário."""
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(func.sum(Transaction.amount)).filter(
-                    Transaction.user_id == user_id
-                )
+    async def get_balance(user_id: int, use_primary: bool = False) -> float:
+        """
+        Retorna o saldo atual do usuário.
+
+        Soma os saldos consolidados dos períodos encerrados (ledger_snapshots)
+        com as transações das partições ainda abertas.
+
+        Args:
+            user_id: ID do usuário
+            use_primary: Força leitura no banco principal (validações de saque)
+        """
+        if use_primary:
+            session = AsyncSessionLocal()
+        else:
+            session = read_session(("user", user_id))
+
+        async with session:
+            live = (
+                select(func.coalesce(func.sum(Transaction.amount), 0))
+                .filter(Transaction.user_id == user_id)
+                .scalar_subquery()
             )
+            closed = (
+                select(func.coalesce(func.sum(LedgerSnapshot.balance), 0))
+                .filter(LedgerSnapshot.user_id == user_id)
+                .scalar_subquery()
+            )
+            result = await session.execute(select(live + closed))
             balance = result.scalar()
             return round(balance, 2) if balance else 0.00
 
@@ -53,7 +74,7 @@ class FinanceService:
             user_id: ID do usuário
             limit: Número máximo de transações a retornar
         """
-        async with AsyncSessionLocal() as session:
+        async with read_session(("user", user_id)) as session:
             result = await session.execute(
                 select(Transaction)
                 .filter(Transaction.user_id == user_id)
@@ -89,7 +110,7 @@ class FinanceService:
             )
 
         # Verificação de saldo
-        balance = await FinanceService.get_balance(user_id)
+        balance = await FinanceService.get_balance(user_id, use_primary=True)
         if balance < amount_gross:
             raise ValueError(
                 f"Saldo insuficiente. Você tem R$ {balance:.2f} e tentou retirar R$ {amount_gross:.2f}"
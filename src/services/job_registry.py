@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from sqlalchemy import delete
+from telegram import Bot as TgBot
+
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal
+from src.database.leader import scheduler_leader
+from src.database.models import JobRun
+from src.services.archive_service import ArchiveService
+from src.services.bot_deletion_service import BotDeletionService
+from src.services.jobs_service import JobsService
+from src.services.payout_service import PayoutService
+from src.services.token_health_service import TokenHealthService
+
+logger = logging.getLogger(__name__)
+
+# Chaves do resumo de um job que contam como erro na telemetria
+ERROR_KEYS = ("failed", "unauthorized", "stalled")
+
+
+class JobSpec(NamedTuple):
+    """
+    Configuração de um job periódico (tempos em segundos).
+
+    `items` são as chaves do resumo (dict) somadas como itens processados na
+    telemetria; vazio soma todas, para resumos em que cada item cai em
+    exatamente uma chave (ex: enviados/bloqueados/falhos).
+    """
+
+    name: str
+    func: Callable
+    interval: int
+    jitter: int
+    timeout: Optional[float]
+    misfire_grace: int
+    items: Tuple[str, ...] = ()
+
+
+def build_jobs(bot: TgBot) -> list:
+    """Jobs da plataforma; `bot` é o bot principal, usado para avisar usuários."""
+    return [
+        JobSpec("remarketing", JobsService.send_remarketing, 3600, 300, 3000, 600),
+        JobSpec(
+            "payouts",
+            lambda: PayoutService.process_approved(notify_bot=bot),
+            60,
+            10,
+            600,
+            30,
+        ),
+        # Também retoma exclusões interrompidas por um reinício
+        JobSpec(
+            "bot_purge",
+            lambda: BotDeletionService.purge_deleted_bots(notify_bot=bot),
+            600,
+            60,
+            3000,
+            120,
+        ),
+        JobSpec(
+            "token_probe",
+            TokenHealthService.probe,
+            settings.TOKEN_PROBE_SECONDS,
+            60,
+            300,
+            300,
+            items=("probed",),
+        ),
+        JobSpec(
+            "archival",
+            ArchiveService.run_archival,
+            86400,
+            1800,
+            7200,
+            3600,
+            items=("leads",),
+        ),
+        JobSpec("job_runs_prune", JobRegistry.prune_runs, 86400, 1800, 300, 3600),
+    ]
+
+
+def _engine_spec(name: str) -> JobSpec:
+    """Spec de telemetria de um motor contínuo (uma janela por registro)."""
+    return JobSpec(name, None, settings.JOB_RUNS_ENGINE_WINDOW_SECONDS, 0, None, 0)
+
+
+def _count(spec: JobSpec, result) -> tuple:
+    """Converte o retorno de um job em (itens, erros)."""
+    if isinstance(result, dict):
+        keys = spec.items or result.keys()
+        items = sum(result.get(key, 0) for key in keys)
+        errors = sum(result.get(key, 0) for key in ERROR_KEYS)
+        return items, errors
+    if isinstance(result, int):
+        return result, 0
+    return 0, 0
+
+
+class JobRegistry:
+    """
+    Registra os jobs periódicos no APScheduler.
+
+    Cada execução roda apenas no processo líder (ver scheduler_leader), com
+    timeout, e grava duração, itens e erros em job_runs. Execuções perdidas
+    (misfire) ou puladas por ainda haver uma em andamento também são
+    registradas: é o sinal de que o job não cabe mais no intervalo.
+
+    Os motores contínuos (DripEngine, ExpiryScheduler) disparam lotes fora
+    do APScheduler; cada lote passa por track e os lotes de uma janela de
+    JOB_RUNS_ENGINE_WINDOW_SECONDS viram um único registro em job_runs
+    (duração somada dos lotes, com interval = a janela).
+    """
+
+    _specs = {}
+    _windows = {}  # motor -> totais da janela em aberto
+
+    @staticmethod
+    async def _record(
+        spec: JobSpec,
+        started_at: datetime,
+        duration: float,
+        status: str,
+        items: int = 0,
+        errors: int = 0,
+        error: str = None,
+    ):
+        """Grava uma execução em job_runs (falhas aqui não afetam o job)."""
+        try:
+            async with AsyncSessionLocal() as session:
+                session.add(
+                    JobRun(
+                        job=spec.name,
+                        started_at=started_at,
+                        duration=duration,
+                        interval=spec.interval,
+                        items=items,
+                        errors=errors,
+                        status=status,
+                        error=error[:500] if error else None,
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"❌ Erro ao gravar telemetria do job {spec.name}: {e}")
+
+    @staticmethod
+    async def _execute(spec: JobSpec):
+        """Executa o job se este processo for o líder."""
+        if not scheduler_leader.is_leader:
+            return
+
+        started_at = datetime.now()
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(spec.func(), spec.timeout)
+        except asyncio.TimeoutError:
+            duration = time.monotonic() - started
+            logger.error(f"⏱ Job {spec.name} excedeu {spec.timeout}s e foi cancelado.")
+            await JobRegistry._record(
+                spec, started_at, duration, "timeout", errors=1, error="timeout"
+            )
+            return
+        except Exception as e:
+            duration = time.monotonic() - started
+            logger.error(f"❌ Job {spec.name} falhou: {e}")
+            await JobRegistry._record(
+                spec, started_at, duration, "error", errors=1, error=str(e)
+            )
+            return
+
+        duration = time.monotonic() - started
+        items, errors = _count(spec, result)
+        await JobRegistry._record(spec, started_at, duration, "ok", items, errors)
+
+    @staticmethod
+    async def track(name: str, coro):
+        """
+        Executa um lote de um motor contínuo e soma o resultado na janela de
+        telemetria do motor.
+
+        Returns:
+            O resultado do lote; None se ele falhou (o erro é registrado)
+        """
+        started = time.monotonic()
+        error = None
+        try:
+            result = await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Lote de {name} falhou: {e}")
+            result, error = None, str(e)
+
+        spec = _engine_spec(name)
+        window = JobRegistry._windows.setdefault(
+            name,
+            {
+                "started_at": datetime.now(),
+                "opened": started,
+                "duration": 0.0,
+                "items": 0,
+                "errors": 0,
+                "error": None,
+            },
+        )
+        items, errors = _count(spec, result)
+        window["duration"] += time.monotonic() - started
+        window["items"] += items
+        window["errors"] += errors + (1 if error else 0)
+        window["error"] = error or window["error"]
+
+        if time.monotonic() - window["opened"] >= spec.interval:
+            await JobRegistry._flush_window(spec)
+        return result
+
+    @staticmethod
+    async def _flush_window(spec: JobSpec):
+        """Grava a janela em aberto do motor como uma execução."""
+        window = JobRegistry._windows.pop(spec.name, None)
+        if window is None:
+            return
+        await JobRegistry._record(
+            spec,
+            window["started_at"],
+            window["duration"],
+            "error" if window["error"] else "ok",
+            window["items"],
+            window["errors"],
+            window["error"],
+        )
+
+    @staticmethod
+    async def flush_engines():
+        """Grava as janelas em aberto dos motores (chamado no shutdown)."""
+        for name in list(JobRegistry._windows):
+            await JobRegistry._flush_window(_engine_spec(name))
+
+    @staticmethod
+    def _on_event(event):
+        """Registra execuções perdidas ou puladas pelo APScheduler."""
+        spec = JobRegistry._specs.get(event.job_id)
+        if not spec or not scheduler_leader.is_leader:
+            return
+
+        status = "missed" if event.code == EVENT_JOB_MISSED else "skipped"
+        logger.warning(f"⚠️ Job {spec.name}: execução {status}.")
+        asyncio.get_running_loop().create_task(
+            JobRegistry._record(spec, datetime.now(), 0.0, status)
+        )
+
+    @staticmethod
+    def register(scheduler, bot: TgBot):
+        """Adiciona os jobs ao scheduler (chamado no lifespan, antes do start)."""
+        for spec in build_jobs(bot):
+            JobRegistry._specs[spec.name] = spec
+            scheduler.add_job(
+                JobRegistry._execute,
+                "interval",
+                args=[spec],
+                id=spec.name,
+                seconds=spec.interval,
+                jitter=spec.jitter,
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=spec.misfire_grace,
+                replace_existing=True,
+            )
+
+        scheduler.add_listener(
+            JobRegistry._on_event, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+        )
+
+    @staticmethod
+    async def prune_runs() -> int:
+        """Remove registros de job_runs mais antigos que a retenção."""
+        cutoff = datetime.now() - timedelta(days=settings.JOB_RUNS_RETENTION_DAYS)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(JobRun)
+                .where(JobRun.started_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            return result.rowcount
@@ -1,115 +1,150 @@
 import asyncio
 import random
 from datetime import datetime, timedelta
+from sqlalchemy import exists, or_, update
 from sqlalchemy.future import select
 from telegram import Bot as TgBot
-from telegram.error import TelegramError
 
-from src.database.base import AsyncSessionLocal
-from src.database.models import Subscription, Bot, Lead
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal, stream_chunks
+from src.database.models import Subscription, Bot, Lead, Suppression
+from src.services.token_health_service import TokenHealthService
+from src.utils.rate_limit import send_limited
 
 
 class JobsService:
     """Gerencia tarefas automáticas agendadas (cronjobs)."""
 
     @staticmethod
-    async def check_expired_subscriptions():
-        """
-        Verifica assinaturas vencidas, remove usuários dos grupos
-        e marca assinaturas como inativas.
-        """
-        async with AsyncSessionLocal() as session:
-            now = datetime.now()
-            query = (
-                select(Subscription)
-                .join(Bot)
-                .filter(Subscription.end_date < now, Subscription.is_active == True)
-            )
-            result = await session.execute(query)
-            expired_subs = result.scalars().all()
-
-            for sub in expired_subs:
-                bot = await session.get(Bot, sub.bot_id)
-                if not bot:
-                    continue
-
-                try:
-                    tg_bot = TgBot(bot.token)
-                    await tg_bot.ban_chat_member(
-                        chat_id=bot.group_id, user_id=sub.subscriber_id
-                    )
-                    await tg_bot.unban_chat_member(
-                        chat_id=bot.group_id, user_id=sub.subscriber_id
-                    )
-
-                    await tg_bot.send_message(
-                        chat_id=sub.subscriber_id,
-                        text="<b>⛔ Seu plano venceu!</b>\n\nVocê foi removido do Grupo VIP. Renove agora para voltar.",
-                        parse_mode="HTML",
-                    )
-                except TelegramError as e:
-                    print(f"Erro ao remover user {sub.subscriber_id}: {e}")
-
-                sub.is_active = False
-
-            if expired_subs:
-                await session.commit()
-
-    @staticmethod
-    async def send_remarketing():
+    async def send_remarketing() -> dict:
         """
         Envia mensagens de recuperação para leads sem assinatura ativa
         que não receberam remarketing nas últimas 24 horas.
-        """
-        async with AsyncSessionLocal() as session:
-            now = datetime.now()
-            limit_time = now - timedelta(hours=2)
-
-            query = (
-                select(Lead)
-                .where(
-                    Lead.created_at < limit_time,
-                    (Lead.last_remarketing_at == None)
-                    | (Lead.last_remarketing_at < (now - timedelta(hours=24))),
-                )
-                .limit(50)
-            )
 
-            result = await session.execute(query)
-            leads = result.scalars().all()
-
-            for lead in leads:
-                # Verifica se já possui assinatura ativa
-                sub_query = select(Subscription).where(
-                    Subscription.subscriber_id == lead.user_id,
-                    Subscription.bot_id == lead.bot_id,
-                    Subscription.is_active == True,
-                )
-                sub_res = await session.execute(sub_query)
-                if sub_res.scalars().first():
-                    continue
+        Uma única consulta (lead + bot, com anti-join nas assinaturas ativas),
+        lida em blocos; os envios de cada bloco rodam em paralelo dentro dos
+        limites do Telegram.
 
-                bot = await session.get(Bot, lead.bot_id)
-                if not bot or not bot.followups:
-                    continue
-
-                message_text = random.choice(bot.followups)
-
-                if not message_text.strip():
-                    continue
+        Envio feito ou recusado em definitivo (bloqueio, pedido inválido)
+        conta como o remarketing da janela. Falhas temporárias voltam na
+        próxima execução, até REMARKETING_MAX_ATTEMPTS seguidas; problemas
+        do bot (token rejeitado, fora do ar) não gastam tentativas.
 
-                try:
-                    tg_bot = TgBot(bot.token)
-                    await tg_bot.send_message(
-                        chat_id=lead.user_id, text=message_text, parse_mode="HTML"
+        Returns:
+            Dict com a contagem de envios por resultado
+        """
+        summary = {
+            "sent": 0,
+            "blocked": 0,
+            "suppressed": 0,
+            "rejected": 0,
+            "unauthorized": 0,
+            "deferred": 0,
+            "failed": 0,
+        }
+        now = datetime.now()
+        limit_time = now - timedelta(hours=2)
+
+        active_subscription = exists().where(
+            Subscription.subscriber_id == Lead.user_id,
+            Subscription.bot_id == Lead.bot_id,
+            Subscription.is_active == True,
+        )
+        suppressed = exists().where(
+            Suppression.bot_id == Lead.bot_id,
+            Suppression.user_id == Lead.user_id,
+        )
+        query = (
+            select(
+                Lead.id,
+                Lead.user_id,
+                Lead.bot_id,
+                Lead.remarketing_attempts,
+                Bot.token,
+                Bot.followups,
+            )
+            .join(Bot, Bot.id == Lead.bot_id)
+            .where(
+                Bot.is_active == True,
+                Bot.token_invalid_at == None,
+                Lead.created_at < limit_time,
+                or_(
+                    Lead.last_remarketing_at == None,
+                    Lead.last_remarketing_at < (now - timedelta(hours=24)),
+                ),
+                ~active_subscription,
+                ~suppressed,
+            )
+        )
+
+        bots = {}  # bot_id -> TgBot, reaproveitado durante a execução
+
+        try:
+            async for rows in stream_chunks(query, settings.JOB_CHUNK_SIZE):
+                sends = []
+                for row in rows:
+                    if not row.followups:
+                        continue
+
+                    message_text = random.choice(row.followups)
+                    if not message_text.strip():
+                        continue
+
+                    if row.bot_id not in bots:
+                        bots[row.bot_id] = TgBot(row.token)
+                    sends.append(
+                        (
+                            row,
+                            send_limited(
+                                bots[row.bot_id],
+                                row.bot_id,
+                                row.user_id,
+                                message_text,
+                            ),
+                        )
                     )
 
-                    lead.last_remarketing_at = now
+                if not sends:
+                    continue
 
-                except TelegramError as e:
-                    print(
-                        f"Erro Remarketing (Bot {bot.id} -> User {lead.user_id}): {e}"
-                    )
+                statuses = await asyncio.gather(*[send for _, send in sends])
+
+                # Agrupa as atualizações por valores gravados: um UPDATE por grupo
+                done = (("last_remarketing_at", now), ("remarketing_attempts", 0))
+                groups = {}
+                unauthorized = set()
+                for (row, _), status in zip(sends, statuses):
+                    summary[status] += 1
+                    if status in ("sent", "blocked", "rejected"):
+                        values = done
+                    elif status == "failed":
+                        attempts = (row.remarketing_attempts or 0) + 1
+                        if attempts >= settings.REMARKETING_MAX_ATTEMPTS:
+                            values = done
+                        else:
+                            values = (("remarketing_attempts", attempts),)
+                    else:
+                        if status == "unauthorized":
+                            unauthorized.add(row.bot_id)
+                        continue
+                    groups.setdefault(values, []).append(row.id)
+
+                for bot_id in unauthorized:
+                    await TokenHealthService.quarantine(bot_id)
+
+                if groups:
+                    async with AsyncSessionLocal() as session:
+                        for values, ids in groups.items():
+                            await session.execute(
+                                update(Lead)
+                                .where(Lead.id.in_(ids))
+                                .values(**dict(values))
+                                .execution_options(synchronize_session=False)
+                            )
+                        await session.commit()
+        finally:
+            await asyncio.gather(
+                *[bot.shutdown() for bot in bots.values()], return_exceptions=True
+            )
 
-            if leads:
-                await session.commit()
+        return summary
@@ -5,6 +5,10 @@ import hashlib
 from src.core.config import settings
 
 
+class TransientPaymentError(Exception):
+    """Falha temporária na API de pagamentos; a operação pode ser repetida."""
+
+
 class PaymentService:
     """Gerencia integração com API de pagamentos (GGPIX)."""
 
@@ -72,7 +76,11 @@ class PaymentService:
 
     @staticmethod
     async def send_pix_out(
-        amount: float, pix_key: str, pix_type: str, external_id: str
+        amount: float,
+        pix_key: str,
+        pix_type: str,
+        external_id: str,
+        client: httpx.AsyncClient = None,
     ):
         """
         Realiza transferência PIX (saque) via GGPIX.
@@ -81,13 +89,17 @@ class PaymentService:
             amount: Valor a transferir
             pix_key: Chave PIX do destinatário
             pix_type: Tipo da chave PIX
-            external_id: Identificador externo para controle
+            external_id: Identificador externo para controle (idempotência)
+            client: Cliente HTTP reaproveitado entre chamadas (opcional)
 
         Returns:
-            Dados da transferência ou None em caso de erro
+            Dados da transferência ou None em caso de recusa definitiva
+
+        Raises:
+            TransientPaymentError: Falha temporária (rede, 429 ou 5xx)
         """
         url = f"{settings.GGPIX_BASE_URL}/pix/out"
-        amount_cents = int(amount * 100)
+        amount_cents = int(round(amount * 100))
 
         payload = {
             "amountCents": amount_cents,
@@ -102,18 +114,28 @@ class PaymentService:
             "X-API-Key": settings.GGPIX_API_KEY,
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    url, json=payload, headers=headers, timeout=15
+        if client is None:
+            async with httpx.AsyncClient() as own_client:
+                return await PaymentService.send_pix_out(
+                    amount, pix_key, pix_type, external_id, client=own_client
                 )
-                if response.status_code == 201:
-                    return response.json()
-                print(f"Erro Pix Out: {response.text}")
-                return None
-            except Exception as e:
-                print(f"Erro Conexão Pix Out: {e}")
-                return None
+
+        try:
+            response = await client.post(
+                url, json=payload, headers=headers, timeout=15
+            )
+        except httpx.HTTPError as e:
+            raise TransientPaymentError(f"Erro Conexão Pix Out: {e}")
+
+        if response.status_code in (200, 201):
+            return response.json()
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientPaymentError(
+                f"Erro Pix Out ({response.status_code}): {response.text}"
+            )
+
+        print(f"Erro Pix Out: {response.text}")
+        return None
 
     @staticmethod
     def validate_webhook_signature(raw_body: bytes, signature: str) -> bool:
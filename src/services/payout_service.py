@@ -0,0 +1,315 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import and_, or_, update
+from sqlalchemy.future import select
+from telegram import Bot as TgBot
+from telegram.error import TelegramError
+
+from src.database.base import AsyncSessionLocal, mark_write
+from src.database.models import (
+    Withdrawal,
+    WithdrawalStatus,
+    Transaction,
+    TransactionType,
+)
+from src.services.payment_service import PaymentService, TransientPaymentError
+from src.utils.formatters import TextUtils
+from src.utils.rate_limit import MAIN_BOT, outbound
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tentativas imediatas por saque dentro de uma mesma execução
+INLINE_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+
+_run_lock = asyncio.Lock()
+
+
+class PayoutService:
+    """Processa saques aprovados automaticamente via Pix Out (GGPIX)."""
+
+    @staticmethod
+    def external_id_for(withdrawal_id: int) -> str:
+        """
+        Gera o identificador externo do saque.
+
+        É determinístico para que uma repetição (timeout, queda do processo)
+        nunca gere um segundo Pix para o mesmo saque.
+        """
+        return f"saque-{withdrawal_id}"
+
+    @staticmethod
+    async def approve(withdrawal_ids: list, admin_id: int) -> int:
+        """
+        Marca saques pendentes como aprovados para o pagamento automático.
+
+        Args:
+            withdrawal_ids: IDs dos saques, ou None para todos os pendentes
+            admin_id: ID do administrador que aprovou
+
+        Returns:
+            Quantidade de saques aprovados
+        """
+        async with AsyncSessionLocal() as session:
+            stmt = update(Withdrawal).where(
+                Withdrawal.status == WithdrawalStatus.PENDING,
+                Withdrawal.approved_at == None,
+            )
+            if withdrawal_ids is not None:
+                stmt = stmt.where(Withdrawal.id.in_(withdrawal_ids))
+
+            result = await session.execute(
+                stmt.values(approved_at=datetime.now(), approved_by=admin_id)
+                .returning(Withdrawal.user_id)
+                .execution_options(synchronize_session=False)
+            )
+            user_ids = result.scalars().all()
+            await session.commit()
+
+        mark_write(*{("user", user_id) for user_id in user_ids})
+        return len(user_ids)
+
+    @staticmethod
+    async def _claim_batch(limit: int, exclude: set) -> list:
+        """
+        Reserva um lote de saques aprovados, movendo-os para PROCESSING.
+
+        Também recupera saques presos em PROCESSING (processo caiu no meio
+        do envio). Saques em `exclude` já foram tentados nesta execução.
+        Usa SKIP LOCKED para que várias instâncias não disputem
+        as mesmas linhas.
+        """
+        now = datetime.now()
+        stale_cutoff = now - timedelta(minutes=settings.PAYOUT_STALE_MINUTES)
+
+        async with AsyncSessionLocal() as session:
+            query = (
+                select(Withdrawal)
+                .where(
+                    or_(
+                        and_(
+                            Withdrawal.status == WithdrawalStatus.PENDING,
+                            Withdrawal.approved_at != None,
+                        ),
+                        and_(
+                            Withdrawal.status == WithdrawalStatus.PROCESSING,
+                            Withdrawal.claimed_at < stale_cutoff,
+                        ),
+                    )
+                )
+                .where(Withdrawal.id.not_in(exclude))
+                .order_by(Withdrawal.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(query)
+            batch = result.scalars().all()
+
+            for withdrawal in batch:
+                withdrawal.status = WithdrawalStatus.PROCESSING
+                withdrawal.claimed_at = now
+                withdrawal.attempts = (withdrawal.attempts or 0) + 1
+
+            await session.commit()
+            return batch
+
+    @staticmethod
+    async def _send(
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        withdrawal: Withdrawal,
+    ):
+        """
+        Envia o Pix de um saque, repetindo falhas temporárias com backoff.
+
+        Returns:
+            Tupla (status, ggpix_id, erro) onde status é "paid", "failed" ou "retry"
+        """
+        external_id = PayoutService.external_id_for(withdrawal.id)
+        error = None
+
+        for attempt in range(INLINE_RETRIES):
+            try:
+                async with semaphore:
+                    response = await PaymentService.send_pix_out(
+                        amount=withdrawal.amount_requested,
+                        pix_key=withdrawal.pix_key,
+                        pix_type=withdrawal.pix_type or "CPF",
+                        external_id=external_id,
+                        client=client,
+                    )
+            except TransientPaymentError as e:
+                error = str(e)
+                # Espera fora do semáforo para não travar os demais envios
+                await asyncio.sleep(RETRY_BASE_DELAY * (2**attempt))
+                continue
+
+            if response is None:
+                return "failed", None, "Pix recusado pela GGPIX"
+
+            ggpix_id = response.get("id") or response.get("transactionId")
+            return "paid", str(ggpix_id) if ggpix_id else None, None
+
+        return "retry", None, error
+
+    @staticmethod
+    async def _settle(outcomes: list) -> list:
+        """
+        Grava o resultado de um lote em uma única transação.
+
+        Saques recusados pela GGPIX são marcados como FAILED e o valor é
+        estornado para a carteira. Os que esgotaram as tentativas sem resposta
+        definitiva também vão para FAILED, mas sem estorno automático.
+
+        Returns:
+            Lista de (withdrawal, status) para notificação
+        """
+        by_id = {withdrawal_id: rest for withdrawal_id, *rest in outcomes}
+        now = datetime.now()
+        settled = []
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Withdrawal).where(Withdrawal.id.in_(by_id.keys()))
+            )
+            for withdrawal in result.scalars().all():
+                status, ggpix_id, error = by_id[withdrawal.id]
+
+                if status == "retry" and (
+                    withdrawal.attempts >= settings.PAYOUT_MAX_ATTEMPTS
+                ):
+                    # Sem resposta definitiva o Pix pode ter saído: não estorna,
+                    # fica FAILED para conferência manual do admin.
+                    status = "stalled"
+
+                if status == "paid":
+                    withdrawal.status = WithdrawalStatus.PAID
+                    withdrawal.ggpix_id = ggpix_id
+                    withdrawal.processed_at = now
+                    withdrawal.last_error = None
+                elif status == "failed":
+                    withdrawal.status = WithdrawalStatus.FAILED
+                    withdrawal.processed_at = now
+                    withdrawal.last_error = error
+                    session.add(
+                        Transaction(
+                            user_id=withdrawal.user_id,
+                            type=TransactionType.SALE,
+                            description=f"Estorno Saque #{withdrawal.id} (Falha no Pix)",
+                            amount=withdrawal.amount_final,
+                        )
+                    )
+                elif status == "stalled":
+                    withdrawal.status = WithdrawalStatus.FAILED
+                    withdrawal.processed_at = now
+                    withdrawal.last_error = error
+                else:
+                    # Volta para a fila; será reservado novamente no próximo lote
+                    withdrawal.status = WithdrawalStatus.PENDING
+                    withdrawal.last_error = error
+
+                settled.append((withdrawal, status))
+
+            await session.commit()
+
+        return settled
+
+    @staticmethod
+    async def _notify(bot: TgBot, withdrawal: Withdrawal, status: str):
+        """Avisa o dono do saque sobre o resultado do pagamento."""
+        if status == "paid":
+            text = (
+                f"✅ <b>Saque Aprovado!</b>\n\n"
+                f"Seu saque de <b>{TextUtils.currency(withdrawal.amount_requested)}</b> foi processado.\n"
+                "O valor deve cair na sua conta em instantes."
+            )
+        elif status == "failed":
+            text = (
+                f"❌ <b>Falha no Saque</b>\n\n"
+                f"Não conseguimos enviar o Pix de {TextUtils.currency(withdrawal.amount_requested)}.\n"
+                "O valor foi estornado para sua carteira. Confira sua chave Pix."
+            )
+        else:
+            return
+
+        try:
+            await outbound.send(
+                MAIN_BOT,
+                withdrawal.user_id,
+                lambda: bot.send_message(
+                    chat_id=withdrawal.user_id, text=text, parse_mode="HTML"
+                ),
+            )
+        except TelegramError:
+            pass
+
+    @staticmethod
+    def is_running() -> bool:
+        """Indica se já há um lote de pagamentos em andamento neste processo."""
+        return _run_lock.locked()
+
+    @staticmethod
+    async def process_approved(notify_bot: TgBot = None) -> dict:
+        """
+        Paga todos os saques aprovados, em lotes, com concorrência limitada.
+
+        Args:
+            notify_bot: Bot usado para avisar os usuários (opcional)
+
+        Returns:
+            Dict com a contagem de saques por resultado, ou None se já havia
+            um lote em andamento (os aprovados entram nele ou no próximo)
+        """
+        # Uma execução por processo; outras instâncias são isoladas pelo SKIP LOCKED
+        if _run_lock.locked():
+            return None
+
+        summary = {"paid": 0, "failed": 0, "retry": 0, "stalled": 0}
+
+        async with _run_lock:
+            semaphore = asyncio.Semaphore(settings.PAYOUT_CONCURRENCY)
+            limits = httpx.Limits(max_connections=settings.PAYOUT_CONCURRENCY)
+            retried = set()
+
+            async with httpx.AsyncClient(limits=limits) as client:
+                while True:
+                    # Saques devolvidos à fila nesta execução ficam para a próxima
+                    batch = await PayoutService._claim_batch(
+                        settings.PAYOUT_BATCH_SIZE, retried
+                    )
+                    if not batch:
+                        break
+
+                    results = await asyncio.gather(
+                        *[
+                            PayoutService._send(client, semaphore, w)
+                            for w in batch
+                        ]
+                    )
+                    outcomes = [
+                        (w.id, *result) for w, result in zip(batch, results)
+                    ]
+                    settled = await PayoutService._settle(outcomes)
+
+                    for withdrawal, status in settled:
+                        summary[status] += 1
+                        if status == "retry":
+                            retried.add(withdrawal.id)
+
+                    if notify_bot:
+                        await asyncio.gather(
+                            *[
+                                PayoutService._notify(notify_bot, w, status)
+                                for w, status in settled
+                            ]
+                        )
+
+        logger.info(
+            f"💸 Payout: {summary['paid']} pagos, {summary['failed']} falhos, "
+            f"{summary['retry']} reenfileirados, {summary['stalled']} sem resposta."
+        )
+        return summary
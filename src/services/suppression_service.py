@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy import delete, text
+from sqlalchemy.future import select
+
+from src.core.config import settings
+from src.database.base import AsyncSessionLocal
+from src.database.models import Suppression
+from src.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# ON CONFLICT DO NOTHING: mesma sintaxe no Postgres e no SQLite
+SUPPRESS_SQL = text(
+    "INSERT INTO suppressions (bot_id, user_id) VALUES (:bot_id, :user_id) "
+    "ON CONFLICT (bot_id, user_id) DO NOTHING"
+)
+
+# bot_id -> array ordenado de user_ids. Não depende do InvalidationBus: as
+# escritas do próprio processo atualizam o array e as dos demais aparecem
+# em até SUPPRESSION_CACHE_SECONDS.
+_cache = TTLCache(settings.SUPPRESSION_CACHE_SECONDS)
+_cache.enabled = True
+_locks = {}  # bot_id -> Lock, evita cargas simultâneas do mesmo bot
+
+
+def _contains(users: array, user_id: int) -> bool:
+    i = bisect_left(users, user_id)
+    return i < len(users) and users[i] == user_id
+
+
+class SuppressionService:
+    """
+    Lista de supressão por bot: usuários que bloquearam o bot.
+
+    Todo envio ativo (follow-up, remarketing, avisos, campanhas) consulta a
+    lista antes de chamar a API. Cada bot fica em memória como um array
+    ordenado de inteiros de 64 bits (8 bytes por usuário, busca binária).
+    """
+
+    @staticmethod
+    async def _load(bot_id: int) -> array:
+        users = _cache.get(bot_id)
+        if users is not None:
+            return users
+
+        lock = _locks.setdefault(bot_id, asyncio.Lock())
+        async with lock:
+            users = _cache.get(bot_id)
+            if users is not None:
+                return users
+
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Suppression.user_id)
+                    .where(Suppression.bot_id == bot_id)
+                    .order_by(Suppression.user_id)
+                )
+                users = array("q", result.scalars())
+
+            _cache.set(bot_id, users)
+            _locks.pop(bot_id, None)
+            return users
+
+    @staticmethod
+    async def is_suppressed(bot_id: int, user_id: int) -> bool:
+        """True se o usuário bloqueou o bot."""
+        return _contains(await SuppressionService._load(bot_id), user_id)
+
+    @staticmethod
+    async def suppress(bot_id: int, user_id: int):
+        """Registra que o usuário bloqueou o bot (idempotente)."""
+        users = await SuppressionService._load(bot_id)
+        if _contains(users, user_id):
+            return
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(SUPPRESS_SQL, {"bot_id": bot_id, "user_id": user_id})
+            await session.commit()
+
+        # O array pode ter sido recarregado durante o INSERT
+        users = _cache.get(bot_id) or users
+        if not _contains(users, user_id):
+            users.insert(bisect_left(users, user_id), user_id)
+
+    @staticmethod
+    async def unsuppress(bot_id: int, user_id: int):
+        """
+        Remove o bloqueio quando o usuário volta a falar com o bot.
+
+        O DELETE roda sempre (é idempotente): o bloqueio pode ter sido
+        gravado por outro processo e ainda não estar no array deste.
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(Suppression).where(
+                    Suppression.bot_id == bot_id, Suppression.user_id == user_id
+                )
+            )
+            await session.commit()
+
+        users = _cache.get(bot_id)
+        if users is not None:
+            i = bisect_left(users, user_id)
+            if i < len(users) and users[i] == user_id:
+                del users[i]
+        if result.rowcount:
+            logger.info(f"🔓 User {user_id} desbloqueou o bot {bot_id}.")
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+
+from sqlalchemy import func, update
+from sqlalchemy.future import select
+from telegram import Bot as TgBot
+from telegram.error import InvalidToken, TelegramError
+
+from src.database.base import AsyncSessionLocal, mark_write
+from src.database.models import Bot
+from src.utils.rate_limit import MAIN_BOT, outbound
+
+logger = logging.getLogger(__name__)
+
+# Bot principal, usado para avisar os donos (definido no lifespan)
+_notify_bot = None
+
+QUARANTINE_TEXT = (
+    "<b>⚠️ Bot @{username} fora do ar</b>\n\n"
+    "O Telegram recusou o token do bot (ele foi revogado no @BotFather?).\n"
+    "Enquanto isso, envios, follow-ups e expirações deste bot ficam pausados.\n\n"
+    "Verificamos o token periodicamente: assim que voltar a funcionar, o bot "
+    "é reativado automaticamente."
+)
+
+RESTORED_TEXT = (
+    "<b>✅ Bot @{username} de volta</b>\n\n"
+    "O token voltou a ser aceito pelo Telegram e o bot foi reativado."
+)
+
+
+class TokenHealthService:
+    """
+    Quarentena de bots com token rejeitado pelo Telegram.
+
+    Qualquer InvalidToken (401/404 do Telegram) em runner, jobs ou envios
+    marca bots.token_invalid_at; bots marcados são ignorados em todo lugar
+    até o probe periódico confirmar que o token voltou a funcionar. O dono é
+    avisado nas duas transições.
+    """
+
+    @staticmethod
+    def set_notifier(bot: TgBot):
+        """Define o bot usado para avisar os donos."""
+        global _notify_bot
+        _notify_bot = bot
+
+    @staticmethod
+    async def _notify(owner_id: int, text: str):
+        if not _notify_bot:
+            return
+        try:
+            await outbound.send(
+                MAIN_BOT,
+                owner_id,
+                lambda: _notify_bot.send_message(
+                    chat_id=owner_id, text=text, parse_mode="HTML"
+                ),
+            )
+        except TelegramError as e:
+            logger.warning(f"⚠️ Não foi possível avisar o dono {owner_id}: {e}")
+
+    @staticmethod
+    async def quarantine(bot_id: int) -> bool:
+        """
+        Coloca o bot em quarentena (idempotente) e avisa o dono na primeira vez.
+
+        Returns:
+            True se o bot acabou de entrar em quarentena
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Bot)
+                .where(Bot.id == bot_id, Bot.token_invalid_at == None)
+                .values(token_invalid_at=func.now())
+                .returning(Bot.owner_id, Bot.username)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            await session.commit()
+
+        if not row:
+            return False
+
+        mark_write(("user", row.owner_id))
+        logger.warning(f"🔒 Bot {bot_id} em quarentena: token rejeitado.")
+        await TokenHealthService._notify(
+            row.owner_id, QUARANTINE_TEXT.format(username=row.username)
+        )
+        return True
+
+    @staticmethod
+    async def _check(token: str):
+        """True se o token funciona, False se foi rejeitado, None se indefinido."""
+        tg_bot = TgBot(token)
+        try:
+            await tg_bot.get_me()
+            return True
+        except InvalidToken:
+            return False
+        except TelegramError:
+            return None
+        finally:
+            await tg_bot.shutdown()
+
+    @staticmethod
+    async def probe() -> dict:
+        """
+        Testa o token dos bots em quarentena e reativa os que voltaram.
+
+        Returns:
+            Dict com bots testados e reativados
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Bot.id, Bot.token, Bot.owner_id, Bot.username).where(
+                    Bot.token_invalid_at != None, Bot.deleted_at == None
+                )
+            )
+            bots = result.all()
+
+        summary = {"probed": len(bots), "restored": 0}
+        checks = await asyncio.gather(
+            *[TokenHealthService._check(bot.token) for bot in bots]
+        )
+        for bot, ok in zip(bots, checks):
+            if not ok:
+                continue
+
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(Bot)
+                    .where(Bot.id == bot.id)
+                    .values(token_invalid_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+
+            mark_write(("user", bot.owner_id))
+            summary["restored"] += 1
+            logger.info(f"🔓 Bot {bot.id} saiu da quarentena.")
+            await TokenHealthService._notify(
+                bot.owner_id, RESTORED_TEXT.format(username=bot.username)
+            )
+
+        return summary
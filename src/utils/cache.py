@@ -0,0 +1,70 @@
+import time
+
+
+class TTLCache:
+    """
+    Cache em memória com expiração por tempo.
+
+    Só responde quando `enabled` é True: o InvalidationBus liga o cache
+    enquanto a conexão LISTEN está ativa, garantindo que nenhum worker sirva
+    dados que outro worker já alterou.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.enabled = False
+        self.generation = 0
+        self._data = {}
+
+    def get(self, key):
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        if not self.enabled:
+            return None
+
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, generation: int = None):
+        """
+        Armazena um valor, descartando o mais antigo se o cache estiver cheio.
+
+        Se `generation` for informado (lido antes da consulta ao banco) e
+        houve invalidação desde então, o valor é descartado por estar
+        possivelmente desatualizado.
+        """
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation:
+            return
+
+        if len(self._data) >= self.max_size and key not in self._data:
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def evict(self, key):
+        """Remove uma chave do cache."""
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def evict_where(self, predicate):
+        """Remove as entradas para as quais predicate(chave, valor) é verdadeiro."""
+        self.generation += 1
+        for key, (_, value) in list(self._data.items()):
+            if predicate(key, value):
+                del self._data[key]
+
+    def clear(self):
+        """Esvazia o cache."""
+        self.generation += 1
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
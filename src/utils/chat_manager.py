@@ -1,8 +1,16 @@
+import hashlib
+
 from telegram import Update, InlineKeyboardMarkup, Message
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
 
 
+def _view_hash(chat_id: int, text: str, reply_markup: InlineKeyboardMarkup) -> str:
+    """Assinatura estável (sobrevive a reinícios) do texto e do teclado da view."""
+    markup = reply_markup.to_json() if reply_markup else ""
+    return hashlib.sha1(f"{chat_id}\0{text}\0{markup}".encode()).hexdigest()[:16]
+
+
 class ChatManager:
     """Gerenciador de mensagens do bot, mantendo apenas uma mensagem visível por vez."""
 
@@ -12,9 +20,32 @@ class ChatManager:
         if update.message:
             try:
                 await update.message.delete()
+                # Sem a mensagem do usuário, a view anterior pode ser editada
+                context.user_message_cleared = True
             except Exception:
                 pass
 
+    @staticmethod
+    async def _edit(context, chat_id: int, message_id: int, text: str, reply_markup):
+        """
+        Edita a view no lugar.
+
+        Returns:
+            True se a mensagem ficou com o conteúdo pedido, False se não pôde
+            ser editada (apagada, antiga demais...)
+        """
+        try:
+            await context.bot.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=text,
+                reply_markup=reply_markup,
+                parse_mode="HTML",
+            )
+            return True
+        except BadRequest as e:
+            return "Message is not modified" in str(e)
+
     @staticmethod
     async def render_view(
         update: Update,
@@ -26,8 +57,12 @@ class ChatManager:
         Renderiza uma view garantindo que apenas uma mensagem do bot fique visível.
 
         Comportamento:
-        - Se for callback (clique em botão): edita a mensagem existente
-        - Se for novo comando ou falha na edição: apaga a anterior e envia nova
+        - Se o conteúdo é igual ao da última view renderizada na mesma
+          mensagem: nenhuma chamada à API
+        - Se for callback (clique em botão): edita a mensagem do botão
+        - Se for mensagem do usuário já apagada (clear_user_message) logo
+          abaixo da view anterior: edita a view anterior no lugar
+        - Nos demais casos ou se a edição falhar: apaga a anterior e envia nova
 
         Args:
             update: Objeto de atualização do Telegram
@@ -35,26 +70,37 @@ class ChatManager:
             text: Texto da mensagem
             reply_markup: Teclado inline (opcional)
         """
-        user_id = update.effective_user.id
         chat_id = update.effective_chat.id
 
         last_msg_id = context.user_data.get("last_bot_msg_id")
+        view_hash = _view_hash(chat_id, text, reply_markup)
 
-        # Caso 1: Callback (edição)
-        if update.callback_query:
-            try:
-                await update.callback_query.edit_message_text(
-                    text=text, reply_markup=reply_markup, parse_mode="HTML"
-                )
-                context.user_data["last_bot_msg_id"] = (
-                    update.callback_query.message.message_id
-                )
+        # Mensagem a editar: a do botão, ou a view anterior se ela ainda é a
+        # última do chat (IDs são sequenciais no chat privado)
+        target_id = None
+        if update.callback_query and update.callback_query.message:
+            target_id = update.callback_query.message.message_id
+        elif (
+            update.message
+            and last_msg_id
+            and getattr(context, "user_message_cleared", False)
+            and update.message.message_id == last_msg_id + 1
+        ):
+            target_id = last_msg_id
+
+        if target_id:
+            if target_id == last_msg_id and (
+                context.user_data.get("last_view_hash") == view_hash
+            ):
+                return
+
+            if await ChatManager._edit(
+                context, chat_id, target_id, text, reply_markup
+            ):
+                context.user_data["last_bot_msg_id"] = target_id
+                context.user_data["last_view_hash"] = view_hash
                 return
-            except BadRequest as e:
-                if "Message is not modified" in str(e):
-                    return
 
-        # Caso 2: Nova mensagem
         if last_msg_id:
             try:
                 await context.bot.delete_message(
@@ -68,3 +114,4 @@ class ChatManager:
         )
 
         context.user_data["last_bot_msg_id"] = sent_msg.message_id
+        context.user_data["last_view_hash"] = view_hash
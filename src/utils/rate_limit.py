@@ -0,0 +1,356 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import timedelta
+from enum import IntEnum
+
+from telegram.error import BadRequest, Forbidden, InvalidToken, RetryAfter
+
+from src.core.config import settings
+from src.services.suppression_service import SuppressionService
+
+logger = logging.getLogger(__name__)
+
+# Chave do bot principal no dispatcher (bots gerenciados usam o ID do banco)
+MAIN_BOT = "main"
+
+
+class TokenBucket:
+    """
+    Token bucket assíncrono: libera até `rate` operações por segundo, com
+    rajadas de até `capacity`. Quem chama acquire() espera na fila.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self):
+        """Aguarda até haver um token disponível e o consome."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Bloqueia o bucket (ex: flood control do Telegram) e zera os tokens."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    def is_idle(self) -> bool:
+        """True se o bucket está cheio e sem bloqueio (pode ser descartado)."""
+        now = time.monotonic()
+        self._refill(now)
+        return self._tokens >= self.capacity and now >= self._blocked_until
+
+
+class TelegramRateLimiter:
+    """
+    Limites de envio do Telegram: um bucket por token de bot (mensagens por
+    segundo no total) e um por chat daquele bot, com rajadas de até
+    `chat_burst` mensagens (ex: boas-vindas seguidas dos planos).
+
+    Bots com token rejeitado ficam fora do ar por `down_seconds`, para que os
+    envios restantes não sejam gastos com eles.
+    """
+
+    # Buckets de chat ociosos são descartados acima deste tamanho
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(
+        self,
+        bot_rate: float,
+        chat_rate: float,
+        chat_burst: float = 1,
+        down_seconds: float = 1800,
+    ):
+        self.bot_rate = bot_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.down_seconds = down_seconds
+        self._bots = {}
+        self._chats = {}
+        self._down = {}  # bot_key -> instante (monotonic) em que volta
+
+    def mark_down(self, bot_key):
+        """Tira o bot do ar por down_seconds (ex: token revogado)."""
+        self._down[bot_key] = time.monotonic() + self.down_seconds
+
+    def down_until(self, bot_key) -> float:
+        """Segundos até o bot voltar (0 se está no ar)."""
+        until = self._down.get(bot_key)
+        if until is None:
+            return 0.0
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            del self._down[bot_key]
+            return 0.0
+        return remaining
+
+    def bot_bucket(self, bot_key) -> TokenBucket:
+        bucket = self._bots.get(bot_key)
+        if bucket is None:
+            bucket = self._bots[bot_key] = TokenBucket(self.bot_rate)
+        return bucket
+
+    def chat_bucket(self, bot_key, chat_id) -> TokenBucket:
+        key = (bot_key, chat_id)
+        bucket = self._chats.get(key)
+        if bucket is None:
+            if len(self._chats) >= self.MAX_CHAT_BUCKETS:
+                for old_key, old in list(self._chats.items()):
+                    if old.is_idle():
+                        del self._chats[old_key]
+            bucket = self._chats[key] = TokenBucket(
+                self.chat_rate, capacity=self.chat_burst
+            )
+        return bucket
+
+
+class Priority(IntEnum):
+    """Classes de envio, da mais urgente para a menos urgente."""
+
+    PAYMENT = 0  # Entrega de acesso após pagamento
+    INTERACTIVE = 1  # Respostas a usuários e avisos
+    MARKETING = 2  # Follow-ups, remarketing e campanhas
+
+
+class _Lane:
+    """Fila de um bot: heap por prioridade e limite de envios simultâneos."""
+
+    def __init__(self, limit: float):
+        self.heap = []  # (priority, seq, chat_id, func, future, attempt)
+        self.limit = limit
+        self.active = 0
+        self.slot = asyncio.Event()
+        self.worker = None
+
+
+class OutboundDispatcher:
+    """
+    Fila central de envios para o Telegram, uma faixa por token de bot.
+
+    Cada faixa tem um worker que só retira o próximo envio depois de
+    conseguir um token do bucket do bot, então o envio mais prioritário na
+    hora (Priority) é sempre o próximo a sair: uma campanha com milhares de
+    mensagens enfileiradas não atrasa o link de acesso de quem acabou de
+    pagar. O limite por chat é respeitado na execução.
+
+    Em RetryAfter o bot inteiro é pausado pelo tempo pedido, o envio volta
+    para a fila com a mesma prioridade e a concorrência da faixa cai pela
+    metade; cada envio bem-sucedido a aumenta aos poucos (AIMD), até
+    TELEGRAM_BOT_CONCURRENCY. Um InvalidToken tira o bot do ar por
+    TELEGRAM_BOT_DOWN_SECONDS e os envios seguintes falham sem chamar a API.
+
+    Os limites valem por processo.
+    """
+
+    def __init__(
+        self,
+        bot_rate: float,
+        chat_rate: float,
+        chat_burst: float = 1,
+        max_retries: int = 3,
+        down_seconds: float = 1800,
+        concurrency: int = 20,
+    ):
+        self.limiter = TelegramRateLimiter(bot_rate, chat_rate, chat_burst, down_seconds)
+        self.max_retries = max_retries
+        self.concurrency = concurrency
+        self._lanes = {}
+        self._seq = itertools.count()
+        self._tasks = set()
+
+    def down_until(self, bot_key) -> float:
+        """Segundos até o bot voltar (0 se está no ar)."""
+        return self.limiter.down_until(bot_key)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _push(self, bot_key, lane: _Lane, job: tuple):
+        heapq.heappush(lane.heap, job)
+        if lane.worker is None:
+            lane.worker = self._spawn(self._work(bot_key, lane))
+
+    async def send(
+        self, bot_key, chat_id, func, priority: Priority = Priority.INTERACTIVE
+    ):
+        """
+        Enfileira func() (coroutine de chamada à API) e aguarda o resultado.
+
+        Args:
+            bot_key: ID do bot (MAIN_BOT para o bot principal)
+            chat_id: Chat de destino; None para chamadas sem mensagem
+                (ex: ban/unban), que respeitam só o limite do bot
+            func: Função sem argumentos que retorna a coroutine da chamada
+            priority: Classe do envio
+
+        Raises:
+            A exceção da chamada; RetryAfter depois de max_retries pausas
+        """
+        lane = self._lanes.get(bot_key)
+        if lane is None:
+            lane = self._lanes[bot_key] = _Lane(self.concurrency)
+
+        future = asyncio.get_running_loop().create_future()
+        self._push(bot_key, lane, (priority, next(self._seq), chat_id, func, future, 0))
+        return await future
+
+    async def _work(self, bot_key, lane: _Lane):
+        try:
+            bucket = self.limiter.bot_bucket(bot_key)
+            while lane.heap:
+                while lane.active >= int(lane.limit):
+                    lane.slot.clear()
+                    await lane.slot.wait()
+
+                # O token é obtido antes de escolher o envio: o que chegar
+                # durante a espera com prioridade maior passa na frente
+                await bucket.acquire()
+                while lane.heap and lane.heap[0][4].done():
+                    heapq.heappop(lane.heap)  # Quem pediu desistiu
+                if not lane.heap:
+                    break
+
+                lane.active += 1
+                self._spawn(self._run(bot_key, lane, heapq.heappop(lane.heap)))
+        finally:
+            lane.worker = None
+            if not lane.heap and not lane.active:
+                self._lanes.pop(bot_key, None)
+
+    async def _run(self, bot_key, lane: _Lane, job: tuple):
+        priority, seq, chat_id, func, future, attempt = job
+        try:
+            if self.limiter.down_until(bot_key):
+                raise InvalidToken(f"Bot {bot_key} fora do ar")
+            if chat_id is not None:
+                await self.limiter.chat_bucket(bot_key, chat_id).acquire()
+
+            result = await func()
+            lane.limit = min(self.concurrency, lane.limit + 1 / lane.limit)
+            if not future.done():
+                future.set_result(result)
+        except RetryAfter as e:
+            delay = e.retry_after
+            if isinstance(delay, timedelta):
+                delay = delay.total_seconds()
+            self.limiter.bot_bucket(bot_key).pause(delay)
+            lane.limit = max(1.0, lane.limit / 2)
+            logger.warning(
+                f"🐢 Flood control no bot {bot_key}: pausa de {delay}s, "
+                f"{int(lane.limit)} envios simultâneos."
+            )
+
+            if attempt < self.max_retries and not future.done():
+                self._push(
+                    bot_key, lane, (priority, seq, chat_id, func, future, attempt + 1)
+                )
+            elif not future.done():
+                future.set_exception(e)
+        except InvalidToken as e:
+            if not self.limiter.down_until(bot_key):
+                logger.warning(f"🔑 Token do bot {bot_key} rejeitado pelo Telegram.")
+                self.limiter.mark_down(bot_key)
+            if not future.done():
+                future.set_exception(e)
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            lane.active -= 1
+            lane.slot.set()
+            if not lane.heap and not lane.active and lane.worker is None:
+                self._lanes.pop(bot_key, None)
+
+    async def stop(self):
+        """Cancela os envios pendentes (chamado no shutdown)."""
+        for lane in self._lanes.values():
+            for job in lane.heap:
+                job[4].cancel()
+            lane.heap.clear()
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._lanes.clear()
+
+
+outbound = OutboundDispatcher(
+    settings.TELEGRAM_BOT_RATE,
+    settings.TELEGRAM_CHAT_RATE,
+    settings.TELEGRAM_CHAT_BURST,
+    settings.TELEGRAM_MAX_RETRIES,
+    settings.TELEGRAM_BOT_DOWN_SECONDS,
+    settings.TELEGRAM_BOT_CONCURRENCY,
+)
+
+
+async def send_limited(
+    bot, bot_key, chat_id, text: str, priority: Priority = Priority.MARKETING
+) -> str:
+    """
+    Envia uma mensagem HTML pelo dispatcher. `bot_key` é o ID do bot, usado
+    também na lista de supressão.
+
+    Returns:
+        "sent"; "blocked" (usuário bloqueou o bot); "rejected" (pedido
+        inválido, ex: chat inexistente, não adianta repetir); "unauthorized"
+        (token do bot revogado); "deferred" (bot fora do ar, nada enviado);
+        "suppressed" (usuário já bloqueou o bot antes, nada enviado); ou
+        "failed" (erro possivelmente temporário)
+    """
+    if await SuppressionService.is_suppressed(bot_key, chat_id):
+        return "suppressed"
+    if outbound.down_until(bot_key):
+        return "deferred"
+
+    try:
+        await outbound.send(
+            bot_key,
+            chat_id,
+            lambda: bot.send_message(chat_id=chat_id, text=text, parse_mode="HTML"),
+            priority,
+        )
+        return "sent"
+    except Forbidden:
+        logger.warning(f"🚫 User {chat_id} bloqueou o bot.")
+        await SuppressionService.suppress(bot_key, chat_id)
+        return "blocked"
+    except InvalidToken:
+        return "unauthorized"
+    except BadRequest as e:
+        logger.warning(f"⚠️ Envio recusado (User {chat_id}): {e}")
+        return "rejected"
+    except Exception as e:
+        logger.error(f"❌ Erro envio (User {chat_id}): {e}")
+        return "failed"
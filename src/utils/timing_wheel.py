@@ -0,0 +1,72 @@
+import math
+import time
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: agenda itens por chave em `slots` posições de
+    `tick` segundos. Agendar, reagendar e remover são O(1); advance() só
+    visita os slots dos ticks que passaram. Itens mais distantes que uma
+    volta completa ficam no slot até o tick certo (o tick absoluto é
+    guardado junto).
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 3600, start: float = None):
+        self.tick = tick
+        self._slots = [{} for _ in range(slots)]  # key -> (tick, item)
+        self._due = {}  # key -> tick
+        self._current = self._tick_of(time.time() if start is None else start)
+
+    def _tick_of(self, when: float) -> int:
+        return int(when // self.tick)
+
+    def add(self, key, when: float, item=None):
+        """Agenda (ou reagenda) `key` para o instante `when` (epoch, segundos)."""
+        # Arredonda para cima: o item nunca dispara antes do instante pedido
+        due = max(math.ceil(when / self.tick), self._current + 1)
+        old = self._due.get(key)
+        if old is not None:
+            self._slots[old % len(self._slots)].pop(key, None)
+
+        self._due[key] = due
+        self._slots[due % len(self._slots)][key] = (due, item)
+
+    def remove(self, key):
+        due = self._due.pop(key, None)
+        if due is not None:
+            self._slots[due % len(self._slots)].pop(key, None)
+
+    def advance(self, now: float = None) -> list:
+        """
+        Avança o relógio até `now` e retorna [(key, item)] vencidos.
+
+        Se o loop ficou parado por mais de uma volta, cada slot é visitado
+        uma única vez.
+        """
+        target = self._tick_of(time.time() if now is None else now)
+        if target <= self._current:
+            return []
+
+        expired = []
+        start = max(self._current + 1, target - len(self._slots) + 1)
+        for tick in range(start, target + 1):
+            slot = self._slots[tick % len(self._slots)]
+            for key, (due, item) in list(slot.items()):
+                if due <= target:
+                    del slot[key]
+                    del self._due[key]
+                    expired.append((key, item))
+
+        self._current = target
+        return expired
+
+    def clear(self):
+        for slot in self._slots:
+            slot.clear()
+        self._due.clear()
+
+    def __contains__(self, key) -> bool:
+        return key in self._due
+
+    def __len__(self) -> int:
+        return len(self._due)